@@ -18,71 +18,1297 @@
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 import re
 
+import atexit
+import gc
+import hashlib
 import json
+import mmap
 import os
+import pickle
 import sys
 import shutil
+import stat
+import struct
 import sysconfig
+import threading
+import time
+import weakref
 from copy import deepcopy
 from os.path import *
-from collections import MutableMapping
-from contextlib import suppress
-from filelock import FileLock
+from collections.abc import Mapping, MutableMapping
+from contextlib import suppress, contextmanager
+from filelock import FileLock, Timeout
+from functools import wraps
 from glob import glob
 from ovos_utils.json_helper import load_commented_json
+from ovos_utils import configuration as ovos_configuration
 from ovos_utils.configuration import read_mycroft_config, LocalConf
+from io import StringIO
+from tempfile import gettempdir
 from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.representer import RoundTripRepresenter
 from typing import Optional
 from neon_utils import LOG
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for configuration snapshots. Any method that would modify the dict raises a TypeError. Copies
+    and deep copies are returned as mutable builtin types.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only; use thaw() or copy.deepcopy() to get a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return self.thaw()
+
+    def __reduce__(self):
+        return dict, (self.thaw(),)
+
+    def thaw(self) -> dict:
+        """
+        Returns a mutable copy of this dict with any nested frozen values also converted to mutable types
+        """
+        return {k: _thaw(v) for k, v in self.items()}
+
+
+class FrozenList(list):
+    """
+    Read-only list used for configuration snapshots. Any method that would modify the list raises a TypeError. Copies
+    and deep copies are returned as mutable builtin types.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only; use thaw() or copy.deepcopy() to get a mutable copy")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return self.thaw()
+
+    def __reduce__(self):
+        return list, (self.thaw(),)
+
+    def thaw(self) -> list:
+        """
+        Returns a mutable copy of this list with any nested frozen values also converted to mutable types
+        """
+        return [_thaw(v) for v in self]
+
+
+RoundTripRepresenter.add_representer(FrozenDict, RoundTripRepresenter.represent_dict)
+RoundTripRepresenter.add_representer(FrozenList, RoundTripRepresenter.represent_list)
+
+
+_MISSING = object()
+
+
+def _freeze(value, previous=None):
+    """
+    Returns a frozen copy of value. Any part of value equal to the corresponding part of a previous frozen copy is
+    shared with it rather than copied, so unchanged sections of a snapshot are the same objects as in the last one.
+    Args:
+        value: dict, list, or scalar to freeze
+        previous: previous frozen copy of value to share unchanged objects with
+    Returns:
+        FrozenDict, FrozenList, or scalar equal to value
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, MutableMapping):
+        last = previous if isinstance(previous, FrozenDict) else None
+        unchanged = last is not None and len(last) == len(value)
+        frozen = dict()
+        for k, v in value.items():
+            old = last.get(k, _MISSING) if last is not None else _MISSING
+            frozen[k] = _freeze_item(v, old)
+            unchanged = unchanged and frozen[k] is old
+        return previous if unchanged else FrozenDict(frozen)
+    if isinstance(value, list):
+        last = previous if isinstance(previous, FrozenList) else None
+        unchanged = last is not None and len(last) == len(value)
+        frozen = list()
+        for i, v in enumerate(value):
+            old = last[i] if last is not None and i < len(last) else _MISSING
+            frozen.append(_freeze_item(v, old))
+            unchanged = unchanged and frozen[i] is old
+        return previous if unchanged else FrozenList(frozen)
+    return _freeze_item(value, _MISSING if previous is None else previous)
+
+
+def _freeze_item(value, previous):
+    """
+    Freezes a value in a dict or list, returning previous if it is equal to value
+    """
+    if isinstance(value, (MutableMapping, list)):
+        return _freeze(value, None if previous is _MISSING else previous)
+    if previous is value or (type(previous) is type(value) and previous == value):
+        return previous
+    return value
+
+
+def _thaw(value):
+    """
+    Returns a mutable copy of a frozen value
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value.thaw()
+    return value
+
+
+class LayeredConfig(Mapping):
+    """
+    Read-only view over several configuration dicts, like a ChainMap. Each key resolves to the value in the first layer
+    that contains it. Keys are indexed on first access, so building a view doesn't copy or merge any layers.
+    """
+    def __init__(self, *layers: Optional[Mapping], name: str = "config", log_missing: bool = False):
+        """
+        Args:
+            layers: dicts to look up keys in, highest priority first. Layers that are not dicts are ignored
+            name: name of this configuration for logging
+            log_missing: if True, log any keys found only in the last layer when the key index is built
+        """
+        self.layers = tuple(layer for layer in layers if isinstance(layer, Mapping))
+        self.name = name
+        self.log_missing = log_missing
+        self._index = None
+        self._sections = dict()
+        self._section_layers = dict()
+
+    def _get_index(self) -> dict:
+        """
+        Returns a dict of each key in this config to the index of the layer it resolves to
+        """
+        index = self._index
+        if index is None:
+            index = dict()
+            for i, layer in enumerate(self.layers):
+                for key in layer:
+                    index.setdefault(key, i)
+            if self.log_missing and len(self.layers) > 1:
+                missing = [k for k, i in index.items() if i == len(self.layers) - 1]
+                if missing:
+                    LOG.warning(f"Keys missing from Neon config! {self.name}: {missing}")
+            self._index = index
+        return index
+
+    def __getitem__(self, key):
+        return self.layers[self._get_index()[key]][key]
+
+    def __iter__(self):
+        return iter(self._get_index())
+
+    def __len__(self):
+        return len(self._get_index())
+
+    def __contains__(self, key):
+        return key in self._get_index()
+
+    def __repr__(self):
+        return f"LayeredConfig({self.name}, layers={len(self.layers)})"
+
+    def section(self, key: str, *layer_keys: str) -> "LayeredConfig":
+        """
+        Get a layered view of one section of this config. Views are reused as long as the section is the same object in
+        every layer, so only sections that changed are indexed again.
+        Args:
+            key: section key to look up in each layer
+            layer_keys: different keys to look up this section by in the second and later layers
+        Returns:
+            LayeredConfig of the section in each layer
+        """
+        keys = (key, *layer_keys)
+        layers = tuple(layer.get(keys[min(i, len(keys) - 1)]) for i, layer in enumerate(self.layers))
+        cached = self._sections.get(keys)
+        cached_layers = self._section_layers.get(keys, ())
+        if cached and len(cached_layers) == len(layers) and all(a is b for a, b in zip(cached_layers, layers)):
+            return cached
+        view = LayeredConfig(*layers, name=f"{self.name}.{key}", log_missing=self.log_missing)
+        self._sections[keys] = view
+        self._section_layers[keys] = layers
+        return view
+
+    def inherit_sections(self, other: "LayeredConfig"):
+        """
+        Reuse section views from a previous version of this config for any sections that are unchanged
+        Args:
+            other: previous LayeredConfig over the same configuration files
+        """
+        self._sections.update(other._sections)
+        self._section_layers.update(other._section_layers)
+
+    def freeze(self) -> FrozenDict:
+        """
+        Returns a read-only dict of the resolved keys and values in this config
+        """
+        return _freeze({k: self[k] for k in self})
+
+
+class ConfigWatcher:
+    """
+    Watches configuration files for changes made on disk and notifies registered callbacks. Uses inotify when the
+    optional `inotify_simple` package is available (Linux), otherwise polls file modification times from a background
+    thread.
+    """
+    def __init__(self, poll_interval: float = 1.0, use_inotify: bool = True):
+        self.poll_interval = poll_interval
+        self.generation = 0
+        self._callbacks = dict()  # file_path: list of callback refs
+        self._signatures = dict()  # file_path: (mtime, size) for polling
+        self._watch_descriptors = dict()  # directory: wd
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._inotify = None
+        self._flags = None
+        if use_inotify:
+            try:
+                from inotify_simple import INotify, flags
+                self._inotify = INotify()
+                self._flags = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE
+            except ImportError:
+                LOG.debug("inotify_simple not available, config watcher will poll for changes")
+            except OSError as e:
+                LOG.warning(f"inotify unavailable, config watcher will poll for changes: {e}")
+        self._thread = threading.Thread(target=self._inotify_loop if self._inotify else self._poll_loop,
+                                        name="ConfigWatcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def backend(self) -> str:
+        """
+        Returns: name of the backend used to detect changes ("inotify" or "polling")
+        """
+        return "inotify" if self._inotify else "polling"
+
+    def watch(self, file_path: str, callback: callable):
+        """
+        Registers a callback to be called when the specified file changes on disk. Bound methods are referenced weakly
+        so watched objects may still be garbage collected.
+        Args:
+            file_path: path to the file to watch
+            callback: method to call with the changed file_path
+        """
+        file_path = abspath(file_path)
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else lambda: callback
+        with self._lock:
+            self._callbacks.setdefault(file_path, list()).append(ref)
+            self._signatures.setdefault(file_path, _get_file_signature(file_path))
+            directory = dirname(file_path)
+            if self._inotify and directory not in self._watch_descriptors:
+                self._watch_descriptors[directory] = self._inotify.add_watch(directory, self._flags)
+
+    def unwatch(self, file_path: str, callback: Optional[callable] = None):
+        """
+        Removes a callback for the specified file, or all callbacks if no callback is specified
+        Args:
+            file_path: path to the watched file
+            callback: registered callback to remove
+        """
+        file_path = abspath(file_path)
+        with self._lock:
+            refs = self._callbacks.get(file_path, list())
+            if callback:
+                refs = [ref for ref in refs if ref() not in (None, callback)]
+            else:
+                refs = list()
+            if refs:
+                self._callbacks[file_path] = refs
+            else:
+                self._callbacks.pop(file_path, None)
+                self._signatures.pop(file_path, None)
+
+    def shutdown(self):
+        """
+        Stops the watcher thread and releases any inotify resources
+        """
+        self._stop_event.set()
+        if self._thread.is_alive() and self._thread != threading.current_thread():
+            self._thread.join(self.poll_interval + 1)
+        if self._inotify:
+            with suppress(OSError):
+                self._inotify.close()
+
+    def _notify(self, file_path: str):
+        with self._lock:
+            self.generation += 1
+            refs = self._callbacks.get(file_path, list())
+            callbacks = [ref() for ref in refs]
+            if any(c is None for c in callbacks):
+                self._callbacks[file_path] = [ref for ref, c in zip(refs, callbacks) if c is not None]
+        for callback in callbacks:
+            if callback:
+                try:
+                    callback(file_path)
+                except Exception as e:
+                    LOG.error(e)
+
+    def _inotify_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                events = self._inotify.read(timeout=int(self.poll_interval * 1000))
+            except OSError as e:
+                if not self._stop_event.is_set():
+                    LOG.error(e)
+                return
+            changed = set()
+            with self._lock:
+                directories = {wd: d for d, wd in self._watch_descriptors.items()}
+                for event in events:
+                    if event.wd in directories and event.name:
+                        file_path = join(directories[event.wd], event.name)
+                        if file_path in self._callbacks:
+                            changed.add(file_path)
+            for file_path in changed:
+                self._notify(file_path)
+
+    def _poll_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            with self._lock:
+                signatures = dict(self._signatures)
+            for file_path, signature in signatures.items():
+                new_signature = _get_file_signature(file_path)
+                if new_signature != signature:
+                    with self._lock:
+                        if file_path in self._signatures:
+                            self._signatures[file_path] = new_signature
+                    self._notify(file_path)
+
+
+class ConfigWriter:
+    """
+    Writes pending NGIConfig changes to disk from a background thread. Changes are written no later than `debounce`
+    seconds after the first change so bursts of updates result in a single write.
+    """
+    def __init__(self, debounce: float = 1.0):
+        self.debounce = debounce
+        self.stats = {"requested": 0, "written": 0, "max_queue_depth": 0,
+                      "last_flush_seconds": 0.0, "total_flush_seconds": 0.0}
+        self._pending = dict()  # config: deadline
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Returns: number of configurations with changes waiting to be written
+        """
+        return len(self._pending)
+
+    def is_scheduled(self, config) -> bool:
+        """
+        Checks if the passed configuration has changes waiting to be written
+        Args:
+            config: NGIConfig object to check
+        Returns:
+            True if config has a pending write scheduled
+        """
+        return config in self._pending
+
+    def schedule(self, config):
+        """
+        Schedules pending changes to the passed configuration to be written
+        Args:
+            config: NGIConfig object with changes to write
+        """
+        with self._condition:
+            self.stats["requested"] += 1
+            if config not in self._pending:
+                self._pending[config] = time.monotonic() + self.debounce
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._pending))
+                self._condition.notify()
+
+    def flush(self, config=None):
+        """
+        Immediately writes pending changes
+        Args:
+            config: NGIConfig object to write, else write all pending configurations
+        """
+        with self._condition:
+            if config:
+                to_write = [config] if self._pending.pop(config, None) else []
+            else:
+                to_write = list(self._pending.keys())
+                self._pending.clear()
+        self._write(to_write)
+
+    def shutdown(self):
+        """
+        Writes any pending changes and stops the writer thread
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread.is_alive() and self._thread != threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _write(self, configs: list):
+        if not configs:
+            return
+        start = time.monotonic()
+        for config in configs:
+            try:
+                with config._transaction_lock:
+                    if config._pending_write:
+                        config.write_changes()
+                        self.stats["written"] += 1
+            except Exception as e:
+                LOG.error(f"Failed to write {config.name}: {e}")
+        self.stats["last_flush_seconds"] = time.monotonic() - start
+        self.stats["total_flush_seconds"] += self.stats["last_flush_seconds"]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                due = [c for c, deadline in self._pending.items() if deadline <= now]
+                for config in due:
+                    self._pending.pop(config)
+                if not due:
+                    timeout = min(self._pending.values()) - now if self._pending else None
+                    self._condition.wait(timeout)
+                    continue
+            self._write(due)
+
+
+_SHARED_HEADER = struct.Struct("<4s4xQQ")  # magic, generation, payload length
+_SHARED_MAGIC = b"NCS1"
+_SHARED_INDEX_LENGTH = struct.Struct("<Q")
+_SHARED_READ_TIMEOUT = 1.0  # seconds a reader waits for a publish to complete before reading yml files instead
+
+
+def _check_private(st: os.stat_result, path: str):
+    """
+    Checks that a file or directory is owned by the current user and not accessible to other users
+    Args:
+        st: stat result for path
+        path: path that was checked, used in the exception message
+    Raises:
+        PermissionError if path is owned by another user or is accessible to other users
+    """
+    if not hasattr(os, "getuid"):
+        return
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not owned by the current user")
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(f"{path} is accessible to other users (mode {oct(stat.S_IMODE(st.st_mode))})")
+
+
+def _get_default_shared_config_file() -> str:
+    """
+    Get the default path of the file configuration is shared through. The file is kept in a directory only the current
+    user can access; $XDG_RUNTIME_DIR is used where it is set, else /dev/shm (or the temp directory where /dev/shm is
+    unavailable) so the file is only ever kept in memory.
+    Returns:
+        path to the shared configuration file for the current user
+    Raises:
+        PermissionError if the directory exists and is not private to the current user
+    """
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        shared_dir = join(os.environ["XDG_RUNTIME_DIR"], "neon")
+    else:
+        shared_dir = join("/dev/shm" if isdir("/dev/shm") else gettempdir(), f"neon-{uid}")
+    os.makedirs(shared_dir, mode=0o700, exist_ok=True)
+    st = os.lstat(shared_dir)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{shared_dir} is not a directory")
+    _check_private(st, shared_dir)
+    return join(shared_dir, "shared_config")
+
+
+def _open_shared_file(file_path: str, flags: int) -> int:
+    """
+    Opens a shared configuration file without following symlinks and checks that only the current user can access it
+    Args:
+        file_path: path to the shared file
+        flags: os.open flags
+    Returns:
+        file descriptor of the opened file
+    Raises:
+        PermissionError if the file is owned by another user or is accessible to other users
+    """
+    fd = os.open(file_path, flags | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        _check_private(os.fstat(fd), file_path)
+    except PermissionError:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _get_shared_key(path: str, name: str) -> str:
+    """
+    Get the key a configuration is published under
+    Args:
+        path: directory containing the configuration
+        name: configuration name
+    Returns:
+        absolute path to the configuration without the .yml extension
+    """
+    return abspath(join(path, name))
+
+
+class SharedConfigPublisher:
+    """
+    Publishes NGIConfig contents to a memory-mapped file so other processes can read configuration without watching and
+    parsing yml files themselves. Each top-level section is serialized to JSON separately and serialized again only when
+    it changes. A configuration with any value that doesn't survive a JSON round trip (i.e. dates, sets, or non-string
+    keys) is not published, so readers load it from its file instead.
+
+    Every publish increments a generation counter in the file header; an odd generation means a publish is in progress.
+    Only one publisher may use a file at a time.
+    """
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path or _get_default_shared_config_file()
+        self.stats = {"published": 0, "sections_serialized": 0, "sections_reused": 0, "unpublishable": 0,
+                      "last_publish_seconds": 0.0}
+        # key: {"generation", "snapshot", "sections": {section: (digest, blob)}}; generation is 0 while unpublished
+        self._entries = dict()
+        self._lock = threading.RLock()
+        self._fd = _open_shared_file(self.file_path, os.O_RDWR | os.O_CREAT)
+        if fcntl:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self._fd)
+                raise RuntimeError(f"{self.file_path} is already published by another process")
+        if os.fstat(self._fd).st_size < mmap.PAGESIZE:
+            os.ftruncate(self._fd, mmap.PAGESIZE)
+        self._map = mmap.mmap(self._fd, 0)
+        magic, generation, _ = _SHARED_HEADER.unpack_from(self._map)
+        # Continue from a previous publisher's generation so readers see the change
+        self._generation = generation + (generation & 1) if magic == _SHARED_MAGIC else 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns: generation of the most recent publish
+        """
+        return self._generation
+
+    def is_published(self, config) -> bool:
+        """
+        Checks if the passed configuration is published by this publisher
+        Args:
+            config: NGIConfig object to check
+        Returns:
+            True if changes to config are published
+        """
+        return _get_shared_key(config.path, config.name) in self._entries
+
+    def add(self, config):
+        """
+        Publishes the passed configuration now and whenever it changes
+        Args:
+            config: NGIConfig object to publish
+        """
+        with self._lock:
+            self._entries.setdefault(_get_shared_key(config.path, config.name),
+                                     {"generation": 0, "snapshot": None, "sections": dict()})
+            self.update(config)
+
+    def remove(self, config):
+        """
+        Stops publishing the passed configuration
+        Args:
+            config: NGIConfig object to remove
+        """
+        with self._lock:
+            if self._entries.pop(_get_shared_key(config.path, config.name), None):
+                self._write()
+
+    def update(self, config):
+        """
+        Publishes the current snapshot of the passed configuration if it has changed. Sections that are the same objects
+        as in the previously published snapshot are not serialized again.
+        Args:
+            config: NGIConfig object to publish
+        """
+        with self._lock:
+            entry = self._entries.get(_get_shared_key(config.path, config.name))
+            snapshot = config._snapshot
+            if entry is None or entry["snapshot"] is snapshot:
+                return
+            previous = entry["snapshot"] or dict()
+            sections = dict()
+            for section, value in snapshot.items():
+                if previous.get(section, _MISSING) is value and section in entry["sections"]:
+                    sections[section] = entry["sections"][section]
+                    self.stats["sections_reused"] += 1
+                    continue
+                blob = self._serialize(value)
+                if blob is None:
+                    LOG.warning(f"{config.name} section {section} can't be published as JSON; "
+                                f"other processes will read {config.file_path}")
+                    self.stats["unpublishable"] += 1
+                    sections = None
+                    break
+                sections[section] = (hashlib.blake2b(blob, digest_size=16).hexdigest(), blob)
+                self.stats["sections_serialized"] += 1
+            entry["snapshot"] = snapshot
+            if sections is None:
+                if entry["generation"]:
+                    entry["generation"] = 0
+                    entry["sections"] = dict()
+                    self._write()
+                return
+            if entry["generation"] and sections.keys() == entry["sections"].keys() and \
+                    all(sections[s][0] == entry["sections"][s][0] for s in sections):
+                return
+            entry["sections"] = sections
+            entry["generation"] = self._generation + 2
+            self._write()
+
+    @staticmethod
+    def _serialize(value) -> Optional[bytes]:
+        """
+        Serializes a configuration section to JSON
+        Args:
+            value: section value to serialize
+        Returns:
+            bytes JSON, None if value isn't read back unchanged from JSON
+        """
+        try:
+            blob = json.dumps(value)
+        except (TypeError, ValueError):
+            return None
+        if json.loads(blob) != value:
+            return None
+        return blob.encode("utf-8")
+
+    def _write(self):
+        """
+        Writes the index and all section data to the shared file
+        """
+        start = time.monotonic()
+        index = dict()
+        blobs = list()
+        offset = 0
+        for key, entry in self._entries.items():
+            if not entry["generation"]:
+                continue
+            index[key] = {"generation": entry["generation"], "sections": dict()}
+            for section, (digest, blob) in entry["sections"].items():
+                index[key]["sections"][section] = [offset, len(blob), digest]
+                blobs.append(blob)
+                offset += len(blob)
+        raw_index = json.dumps(index).encode("utf-8")
+        payload = b"".join([_SHARED_INDEX_LENGTH.pack(len(raw_index)), raw_index] + blobs)
+        required = _SHARED_HEADER.size + len(payload)
+        if required > len(self._map):
+            size = max(required, 2 * len(self._map))
+            os.ftruncate(self._fd, size + (-size % mmap.PAGESIZE))
+            self._map.close()
+            self._map = mmap.mmap(self._fd, 0)
+        # Readers retry while the generation is odd or if it changes while they read
+        _SHARED_HEADER.pack_into(self._map, 0, _SHARED_MAGIC, self._generation + 1, 0)
+        self._map[_SHARED_HEADER.size:required] = payload
+        self._generation += 2
+        _SHARED_HEADER.pack_into(self._map, 0, _SHARED_MAGIC, self._generation, len(payload))
+        self.stats["published"] += 1
+        self.stats["last_publish_seconds"] = time.monotonic() - start
+
+    def shutdown(self):
+        """
+        Stops publishing. Published data is left in place for readers until another publisher replaces it.
+        """
+        with self._lock:
+            if self._fd is None:
+                return
+            self._map.close()
+            os.close(self._fd)
+            self._fd = None
+            self._entries.clear()
+
+
+class SharedConfigReader:
+    """
+    Reads configuration published by a SharedConfigPublisher. Checking for changes reads the generation from the mapped
+    file without any system calls; the index is only read again after the generation changes and sections are only
+    parsed when requested. A file that other users can access is never read.
+    """
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path or _get_default_shared_config_file()
+        self._map = None
+        self._index = dict()
+        self._index_generation = 0
+        self._data_start = 0
+        self._stalled_generation = None  # odd generation left by a publisher that stopped while publishing
+
+    def _open(self) -> bool:
+        """
+        Maps the shared file if it exists
+        Returns:
+            True if the file is mapped
+        """
+        try:
+            fd = _open_shared_file(self.file_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            LOG.warning(f"Not reading shared configuration: {e}")
+            return False
+        try:
+            if os.fstat(fd).st_size < _SHARED_HEADER.size:
+                return False
+            if self._map:
+                self._map.close()
+            self._map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return True
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns: generation of the most recently published configuration, 0 if nothing is published
+        """
+        if not self._map and not self._open():
+            return 0
+        magic, generation, _ = _SHARED_HEADER.unpack_from(self._map)
+        if magic != _SHARED_MAGIC:
+            return 0
+        return generation & ~1
+
+    def _read(self, func: callable):
+        """
+        Calls func with the mapped file and published generation, repeating the call until it completes without a
+        publish happening at the same time. Gives up if a publish doesn't complete within _SHARED_READ_TIMEOUT, i.e. if
+        the publisher stopped while publishing.
+        Args:
+            func: callable accepting (mapped file, generation)
+        Returns:
+            value returned by func, None if nothing is published or the publish in progress didn't complete
+        """
+        if not self._map and not self._open():
+            return None
+        deadline = None
+        while True:
+            magic, generation, length = _SHARED_HEADER.unpack_from(self._map)
+            if magic != _SHARED_MAGIC or generation == self._stalled_generation:
+                return None
+            if generation & 1:
+                if deadline is None:
+                    deadline = time.monotonic() + _SHARED_READ_TIMEOUT
+                elif time.monotonic() > deadline:
+                    LOG.warning(f"Publish to {self.file_path} did not complete; reading configuration files instead")
+                    self._stalled_generation = generation
+                    return None
+                time.sleep(0)
+                continue
+            if _SHARED_HEADER.size + length > len(self._map):
+                # The publisher grew the file
+                self._open()
+                continue
+            try:
+                result = func(self._map, generation)
+            except Exception:
+                if _SHARED_HEADER.unpack_from(self._map)[1] == generation:
+                    raise
+                continue
+            if _SHARED_HEADER.unpack_from(self._map)[1] == generation:
+                return result
+
+    def _parse_index(self, shared: mmap.mmap, generation: int) -> dict:
+        """
+        Reads the index of published configurations if it has changed since it was last read
+        Args:
+            shared: mapped file
+            generation: currently published generation
+        Returns:
+            dict of configuration keys to their generation and section offsets
+        """
+        if generation != self._index_generation:
+            start = _SHARED_HEADER.size + _SHARED_INDEX_LENGTH.size
+            index_length, = _SHARED_INDEX_LENGTH.unpack_from(shared, _SHARED_HEADER.size)
+            self._index = json.loads(shared[start:start + index_length])
+            self._data_start = start + index_length
+            self._index_generation = generation
+        return self._index
+
+    def _get_index(self) -> dict:
+        """
+        Returns: the published index, read again only if the generation has changed
+        """
+        if self.generation != self._index_generation:
+            self._read(self._parse_index)
+        return self._index
+
+    def keys(self) -> list:
+        """
+        Returns: list of published configuration keys (configuration paths without the .yml extension)
+        """
+        return list(self._get_index().keys())
+
+    def read(self, key: str, generation: int = 0, digests: Optional[dict] = None) -> Optional[tuple]:
+        """
+        Reads a published configuration
+        Args:
+            key: published configuration key (configuration path without the .yml extension)
+            generation: generation of the configuration already read; sections are not read if it is unchanged
+            digests: dict of section names to digests of sections already read; these sections are not read again
+        Returns:
+            None if key is not published, else tuple of the configuration's generation, dict of section names to
+            digests, and dict of section names to values for sections that were read
+        """
+        digests = digests or dict()
+
+        def _read_entry(shared, published):
+            entry = self._parse_index(shared, published).get(key)
+            if entry is None or entry["generation"] == generation:
+                return entry, dict()
+            start = self._data_start
+            return entry, {section: shared[start + offset:start + offset + length]
+                           for section, (offset, length, digest) in entry["sections"].items()
+                           if digests.get(section) != digest}
+
+        entry, blobs = self._read(_read_entry) or (None, None)
+        if not entry:
+            return None
+        new_digests = {section: digest for section, (_, _, digest) in entry["sections"].items()}
+        return entry["generation"], new_digests, {section: json.loads(blob) for section, blob in blobs.items()}
+
+    def get(self, name: str, path: Optional[str] = None) -> Optional["SharedConfigView"]:
+        """
+        Get a read-only view of a published configuration. Sections are parsed the first time they are accessed.
+        Args:
+            name: configuration name (i.e. "ngi_local_conf")
+            path: directory containing the configuration, defaults to the configuration directory
+        Returns:
+            SharedConfigView of the configuration, None if it is not published
+        """
+        key = _get_shared_key(path or get_config_dir(), name)
+        if key not in self._get_index():
+            return None
+        return SharedConfigView(self, key)
+
+    def close(self):
+        """
+        Unmaps the shared file
+        """
+        if self._map:
+            self._map.close()
+            self._map = None
+        self._index = dict()
+        self._index_generation = 0
+        self._stalled_generation = None
+
+
+class SharedConfigView(Mapping):
+    """
+    Read-only view of a configuration published by a SharedConfigPublisher. Sections are read and frozen when first
+    accessed; if the configuration is republished, the view updates to the new contents.
+    """
+    def __init__(self, reader: SharedConfigReader, key: str):
+        self._reader = reader
+        self._key = key
+        self._generation = 0
+        self._digests = dict()
+        self._sections = dict()
+        self._refresh()
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns: generation of the configuration this view last read
+        """
+        return self._generation
+
+    def _update_digests(self, digests: dict):
+        # Keep sections that were not changed by a new publish
+        self._sections = {section: value for section, value in self._sections.items()
+                          if digests.get(section) == self._digests.get(section)}
+        self._digests = digests
+
+    def _refresh(self):
+        entry = self._reader._get_index().get(self._key)
+        if not entry or entry["generation"] == self._generation:
+            return
+        self._generation = entry["generation"]
+        self._update_digests({section: digest for section, (_, _, digest) in entry["sections"].items()})
+
+    def __getitem__(self, section):
+        self._refresh()
+        if section in self._sections:
+            return self._sections[section]
+        if section not in self._digests:
+            raise KeyError(section)
+        result = self._reader.read(self._key, digests={s: d for s, d in self._digests.items() if s != section})
+        if not result:
+            raise KeyError(section)
+        self._generation, digests, values = result
+        self._update_digests(digests)
+        for name, value in values.items():
+            self._sections[name] = _freeze(value)
+        if section not in self._sections:
+            raise KeyError(section)
+        return self._sections[section]
+
+    def __iter__(self):
+        self._refresh()
+        return iter(list(self._digests))
+
+    def __len__(self):
+        self._refresh()
+        return len(self._digests)
+
+
+_CONFIG_WATCHER: Optional[ConfigWatcher] = None
+_SHARED_CONFIG_PUBLISHER: Optional[SharedConfigPublisher] = None
+_SHARED_CONFIG_READER: Optional[SharedConfigReader] = None
+_CONFIG_WRITER: Optional[ConfigWriter] = None
+_DEFAULT_CONFIG_DIR = join(dirname(__file__), "default_configurations")
+
+
+def _get_config_cache_path(config_dir: str, name: str, extension: str) -> str:
+    """
+    Get a path in the user's cache directory for a file associated with a configuration (i.e. its lock or sidecar
+    cache), so nothing is written next to the yml file in configuration or package directories
+    Args:
+        config_dir: directory containing the configuration
+        name: configuration name
+        extension: file extension
+    Returns:
+        path unique to the configuration file in $XDG_CACHE_HOME/neon/config
+    """
+    cache_dir = join(os.environ.get("XDG_CACHE_HOME", expanduser("~/.cache")), "neon", "config")
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    digest = hashlib.blake2b(realpath(config_dir).encode("utf-8", "surrogateescape"), digest_size=8).hexdigest()
+    return join(cache_dir, f"{name}-{digest}.{extension}")
+
+
+def _synchronized(func):
+    """
+    Decorator for NGIConfig methods that change content so they wait for any transaction in another thread
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self._transaction_lock:
+            return func(self, *args, **kwargs)
+    return wrapper
+
 
 class NGIConfig:
     configuration_list = dict()
+    reload_stats = dict()
+    use_sidecar = True
+    _instances = weakref.WeakSet()
 
     def __init__(self, name, path=None, force_reload: bool = False):
         self.name = name
         self.path = path or get_config_dir()
         self.parser = YAML()
-        lock_filename = join(self.path, f".{self.name}.lock")
-        self.lock = FileLock(lock_filename, timeout=10)
+        self.lock = FileLock(_get_config_cache_path(self.path, self.name, "lock"), timeout=10)
+        self._sidecar_path = _get_config_cache_path(self.path, self.name, "cache")
         self._pending_write = False
+        self._disk_snapshot = None  # snapshot of content as last read from or written to disk
+        self._transaction_depth = 0
+        self._transaction_lock = threading.RLock()
+        self._content_hash = None
+        self._watched = False
+        self._stale = False
+        self._subscriptions = dict()
+        self._snapshot = FrozenDict()
+        self._shared_generation = 0
+        self._shared_entry_generation = 0
+        self._shared_digests = dict()
         self._content = dict()
         self._loaded = os.path.getmtime(self.file_path)
         if not force_reload and self.__repr__() in NGIConfig.configuration_list:
             cache = NGIConfig.configuration_list[self.__repr__()]
             cache.check_reload()
             self._content = cache.content
-        else:
+            # Instances share content, so they also share the lock held by transactions
+            self._transaction_lock = cache._transaction_lock
+            self._content_hash = cache._content_hash
+            self._snapshot = cache._snapshot
+            self._disk_snapshot = cache._disk_snapshot
+            self._shared_generation = cache._shared_generation
+            self._shared_entry_generation = cache._shared_entry_generation
+            self._shared_digests = cache._shared_digests
+        elif not (_SHARED_CONFIG_READER and self._check_shared_reload(_SHARED_CONFIG_READER)):
             self._content = self._load_yaml_file()
+            self._publish_snapshot()
+            self._disk_snapshot = self._snapshot
             NGIConfig.configuration_list[self.__repr__()] = self
+        NGIConfig._instances.add(self)
+        if _CONFIG_WATCHER:
+            self._start_watching(_CONFIG_WATCHER)
 
     @property
     def requires_reload(self):
+        if self._watched and not self._stale:
+            return False
         return self._loaded != os.path.getmtime(self.file_path)
 
     def check_reload(self):
-        if self._loaded != os.path.getmtime(self.file_path):
+        if _SHARED_CONFIG_READER and self._check_shared_reload(_SHARED_CONFIG_READER):
+            return
+        if self._watched and not self._stale:
+            return
+        if self._transaction_depth:
+            # Don't discard buffered changes; they are written when the transaction completes
+            return
+        file_path = self.file_path
+        self._stale = False
+        if self._loaded != os.path.getmtime(file_path):
+            if _CONFIG_WRITER and _CONFIG_WRITER.is_scheduled(self):
+                # Keep buffered changes, applied on top of the changes made on disk
+                with self._transaction_lock:
+                    self._merge_changes_from_disk()
+                return
             self.check_for_updates()
 
+    def _check_shared_reload(self, reader: SharedConfigReader) -> bool:
+        """
+        Reloads this configuration from a SharedConfigReader if it was published again since it was last read
+        Args:
+            reader: SharedConfigReader to read from
+        Returns:
+            True if this configuration is published, False if the file should be checked instead
+        """
+        generation = reader.generation
+        if not generation or generation == self._shared_generation:
+            return bool(generation and self._shared_entry_generation)
+        if self._transaction_depth or (_CONFIG_WRITER and _CONFIG_WRITER.is_scheduled(self)):
+            # Don't discard changes that haven't been written; check again on the next read
+            return bool(self._shared_entry_generation)
+        # Sections removed locally need to be read again
+        digests = {section: digest for section, digest in self._shared_digests.items() if section in self._content}
+        result = reader.read(_get_shared_key(self.path, self.name), self._shared_entry_generation, digests)
+        self._shared_generation = generation
+        if not result:
+            self._shared_entry_generation = 0
+            self._shared_digests = dict()
+            return False
+        entry_generation, digests, values = result
+        if entry_generation != self._shared_entry_generation:
+            start = time.monotonic()
+            old_content = self._content
+            self._content = {section: values[section] if section in values else old_content[section]
+                             for section in digests}
+            self._shared_entry_generation = entry_generation
+            self._shared_digests = digests
+            self._publish_snapshot()
+            self._disk_snapshot = self._snapshot
+            if self._subscriptions:
+                self._notify_subscribers(old_content, self._content)
+            self._record_reload(start)
+        return True
+
+    def _start_watching(self, watcher: ConfigWatcher):
+        """
+        Registers this configuration with a watcher so changes are detected without checking the file on every read
+        Args:
+            watcher: ConfigWatcher to register with
+        """
+        if self._watched:
+            return
+        watcher.watch(join(self.path, self.name + ".yml"), self._on_file_changed)
+        self._watched = True
+        # Catch any change made before the watch was registered
+        self._stale = True
+
+    def _on_file_changed(self, _):
+        self._stale = True
+        if self._subscriptions or (_SHARED_CONFIG_PUBLISHER and _SHARED_CONFIG_PUBLISHER.is_published(self)):
+            # Reload now so subscribers and other processes are notified without waiting for the next read
+            try:
+                self.check_reload()
+            except Exception as e:
+                LOG.error(f"Failed to reload {self.name}: {e}")
+
+    def subscribe(self, key: str, callback: callable):
+        """
+        Registers a callback to be notified when a configuration value changes on disk. Callbacks are called when this
+        configuration is reloaded; if a ConfigWatcher is enabled, this happens as soon as the change is detected.
+        Args:
+            key: dotted path to the value of interest (i.e. "speech.tts_language")
+            callback: called with (key, old_value, new_value) when the value at key or any value under it changes
+        """
+        self._subscriptions.setdefault(key, list()).append(callback)
+
+    def unsubscribe(self, key: str, callback: callable):
+        """
+        Removes a callback previously registered with subscribe
+        Args:
+            key: dotted path the callback was registered for
+            callback: callback to remove
+        """
+        callbacks = self._subscriptions.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscriptions.pop(key, None)
+
+    def _notify_subscribers(self, old_content: MutableMapping, new_content: MutableMapping):
+        """
+        Calls subscribed callbacks for any keys that differ between old_content and new_content
+        Args:
+            old_content: configuration content before reload
+            new_content: configuration content after reload
+        """
+        changed = get_changed_keys(old_content, new_content)
+        if not changed:
+            return
+        for key, callbacks in list(self._subscriptions.items()):
+            if not any(path == key or path.startswith(key + ".") or key.startswith(path + ".") for path in changed):
+                continue
+            old_value = _get_dotted_value(old_content, key)
+            new_value = _get_dotted_value(new_content, key)
+            for callback in list(callbacks):
+                try:
+                    callback(key, old_value, new_value)
+                except Exception as e:
+                    LOG.error(f"{self.name} subscriber for {key} failed: {e}")
+
     def write_changes(self):
         if self._pending_write:
+            if self._disk_snapshot is not None and self._loaded != os.path.getmtime(self.file_path):
+                self._merge_changes_from_disk()
+            self._write_yaml_file()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager to batch changes to this configuration. Changes made within the context are kept in memory and
+        written to disk once when the outermost transaction exits. If an exception is raised, buffered changes are
+        discarded and content is reloaded from disk.
+        """
+        # Changes from other threads wait for the transaction to complete so they aren't buffered or discarded with it
+        with self._transaction_lock:
+            self._transaction_depth += 1
+            completed = False
+            try:
+                yield self
+                completed = True
+            finally:
+                self._transaction_depth -= 1
+                if not self._transaction_depth and not completed:
+                    LOG.warning(f"Transaction failed, discarding changes to {self.name}")
+                    self._pending_write = False
+                    # Restore in place; other instances of this configuration share the same content
+                    content = self._load_yaml_file()
+                    self._content.clear()
+                    self._content.update(content)
+                    self._publish_snapshot()
+                    self._disk_snapshot = self._snapshot
+                elif not self._transaction_depth and self._pending_write:
+                    self._request_write()
+
+    def _request_write(self):
+        """
+        Writes changes to disk. Changes are left pending if a transaction is in progress, or scheduled for the
+        background writer if write-behind is enabled.
+        """
+        if self._transaction_depth:
+            self._pending_write = True
+        elif _CONFIG_WRITER:
+            self._schedule_write()
+        else:
             self._write_yaml_file()
 
+    def _schedule_write(self):
+        """
+        Schedules changes for the background writer
+        """
+        self._pending_write = True
+        self._publish_snapshot()
+        _CONFIG_WRITER.schedule(self)
+
+    def _merge_changes_from_disk(self):
+        """
+        Reloads content changed on disk by another process and applies changes waiting for the background writer on
+        top of it. Where both changed the same key, the pending value is kept and the conflict is logged.
+        """
+        start = time.monotonic()
+        base = self._disk_snapshot if self._disk_snapshot is not None else FrozenDict()
+        pending = self._content
+        local_changes = _get_changed_paths(base, pending)
+        content = self._load_yaml_file()
+        disk_changes = _get_changed_paths(base, content)
+        conflicts = [path for path in local_changes
+                     if any(path[:len(other)] == other or other[:len(path)] == path for other in disk_changes)]
+        if conflicts:
+            LOG.warning(f"{self.name} changed on disk with changes pending; keeping pending values for: "
+                        f"{['.'.join(str(key) for key in path) for path in conflicts]}")
+        # Pending changes are now relative to the content on disk
+        self._disk_snapshot = _freeze(content, base)
+        for path in local_changes:
+            _set_path_value(content, path, _get_path_value(pending, path))
+        self._content = content
+        self._pending_write = True
+        self._publish_snapshot()
+        if self._subscriptions:
+            self._notify_subscribers(pending, content)
+        self._record_reload(start)
+
+    @property
+    def snapshot(self) -> FrozenDict:
+        """
+        Returns a read-only copy of this configuration that is safe to read from any thread while it is being changed.
+        A new snapshot is published after each change; sections that did not change are the same objects in the old and
+        new snapshots.
+        """
+        self.check_reload()
+        return self._snapshot
+
+    def _publish_snapshot(self):
+        """
+        Replaces the current snapshot with a frozen copy of this configuration's content
+        """
+        with self._transaction_lock:
+            previous = self._snapshot
+            self._snapshot = _freeze(self._content, previous)
+            # Other instances are created from the cached instance, so it needs the current snapshot of shared content
+            cache = NGIConfig.configuration_list.get(self.__repr__())
+            if cache is not None and cache is not self and cache._content is self._content:
+                cache._snapshot = self._snapshot
+        if self._snapshot is not previous:
+            _config_changed()
+        if _SHARED_CONFIG_PUBLISHER:
+            _SHARED_CONFIG_PUBLISHER.update(self)
+
+    @_synchronized
     def populate(self, content, check_existing=False):
         if not check_existing:
             self.__add__(content)
             return
-        old_content = deepcopy(self._content)
-        self._content = dict_merge(content, self._content)  # to_change, one_with_all_keys
-        if old_content == self._content:
+        # Add keys from content without overwriting existing values
+        if not _dict_update_keys(self._content, content):
             LOG.warning(f"Update called with no change: {self.file_path}")
             return
-        self._write_yaml_file()
+        self._request_write()
 
     def remove_key(self, *key):
         for item in key:
             self.__sub__(item)
 
+    @_synchronized
     def make_equal_by_keys(self, other: MutableMapping, recursive: bool = True, depth: int = 1):
         """
         Adds and removes keys from this config such that it has the same keys as 'other'. Configuration values are
@@ -92,14 +1318,13 @@ class NGIConfig:
             recursive: flag to indicate configuration may be merged recursively
             depth: int depth to recurse (0 includes top-level keys only)
         """
-        old_content = deepcopy(self._content)
         if not recursive:
             depth = 0
-        self._content = dict_make_equal_keys(self._content, other, depth)
-        if old_content == self._content:
+        if not _dict_make_equal_keys(self._content, other, depth):
             return
-        self._write_yaml_file()
+        self._request_write()
 
+    @_synchronized
     def update_keys(self, other):
         """
         Adds keys to this config such that it has all keys in 'other'. Configuration values are
@@ -107,13 +1332,10 @@ class NGIConfig:
         Args:
             other: dict of keys and default values this should be added to this configuration
         """
-        old_content = deepcopy(self._content)
-        self._content = dict_update_keys(self._content, other)  # to_change, one_with_all_keys
-        if old_content == self._content:
+        if not _dict_update_keys(self._content, other):
             LOG.warning(f"Update called with no change: {self.file_path}")
             return
-
-        self._write_yaml_file()
+        self._request_write()
 
     @property
     def file_path(self):
@@ -122,6 +1344,9 @@ class NGIConfig:
         Returns: path to this configuration yml
         """
         file_path = join(self.path, self.name + ".yml")
+        if self._watched and not self._stale:
+            # The watcher will report the file as changed if it is removed
+            return file_path
         if not isfile(file_path):
             create_file(file_path)
             LOG.debug(f"New YAML created: {file_path}")
@@ -132,6 +1357,8 @@ class NGIConfig:
         Reloads updated configuration from disk. Used to reload changes when other instances modify a configuration
         Returns:Updated configuration.content
         """
+        start = time.monotonic()
+        old_content = self._content
         new_content = self._load_yaml_file()
         if new_content:
             LOG.debug(f"{self.name} Checked for Updates")
@@ -144,8 +1371,26 @@ class NGIConfig:
                 self._content = new_content
             else:
                 LOG.error("second attempt failed")
+        self._publish_snapshot()
+        self._disk_snapshot = self._snapshot
+        if self._subscriptions and self._content is not old_content:
+            self._notify_subscribers(old_content, self._content)
+        self._record_reload(start)
         return self._content
 
+    def _record_reload(self, start: float):
+        """
+        Updates reload statistics for this configuration
+        Args:
+            start: time.monotonic() value when the reload started
+        """
+        stats = NGIConfig.reload_stats.setdefault(self.name, {"count": 0, "total_seconds": 0.0,
+                                                             "last_seconds": 0.0})
+        stats["last_seconds"] = time.monotonic() - start
+        stats["total_seconds"] += stats["last_seconds"]
+        stats["count"] += 1
+
+    @_synchronized
     def update_yaml_file(self, header=None, sub_header=None, value="", multiple=False, final=False):
         """
         Called by class's children to update, create, or initiate a new parameter in the
@@ -169,7 +1414,6 @@ class NGIConfig:
                 before_change[header][sub_header] = value
             except KeyError:
                 before_change[header] = {sub_header: value}
-                return
         elif header and not sub_header:
             try:
                 before_change[header] = value
@@ -181,10 +1425,12 @@ class NGIConfig:
                 return
 
         if not multiple:
-            self._write_yaml_file()
+            self._request_write()
         else:
             LOG.debug("More than one change")
             self._pending_write = True
+            if not self._transaction_depth:
+                self._publish_snapshot()
 
     def export_to_json(self) -> str:
         """
@@ -195,6 +1441,7 @@ class NGIConfig:
         write_to_json(self._content, json_filename)
         return json_filename
 
+    @_synchronized
     def from_dict(self, pref_dict: dict):
         """
         Constructor to build this configuration object with the passed dict of data
@@ -206,9 +1453,10 @@ class NGIConfig:
         """
         self._content = pref_dict
 
-        self._write_yaml_file()
+        self._request_write()
         return self
 
+    @_synchronized
     def from_json(self, json_path: str):
         """
         Constructor to build this configuration object with the passed json file
@@ -220,7 +1468,7 @@ class NGIConfig:
         """
         self._content = load_commented_json(json_path)
 
-        self._write_yaml_file()
+        self._request_write()
         return self
 
     def _load_yaml_file(self) -> dict:
@@ -232,32 +1480,144 @@ class NGIConfig:
         """
         try:
             self._loaded = os.path.getmtime(self.file_path)
-            with self.lock:
-                with open(self.file_path, 'r') as f:
-                    return self.parser.load(f) or dict()
+            with self._read_lock():
+                with open(self.file_path, 'rb') as f:
+                    raw = f.read()
+            self._content_hash = _get_content_hash(raw)
+            if self.use_sidecar:
+                content = self._load_sidecar(raw)
+                if content is not None:
+                    return content
+            content = self.parser.load(raw.decode("utf-8")) or dict()
+            if self.use_sidecar:
+                self._write_sidecar(raw, content)
+            return content
         except FileNotFoundError as x:
             LOG.error(f"Configuration file not found error: {x}")
         except Exception as c:
             LOG.error(f"{self.file_path} Configuration file error: {c}")
         return dict()
 
+    @contextmanager
+    def _read_lock(self):
+        """
+        Context manager to hold a shared lock while reading this configuration. Readers only wait for writers, which
+        hold the exclusive FileLock on the same lock file. Falls back to the exclusive lock where fcntl is unavailable.
+        """
+        if not fcntl or self.lock.is_locked:
+            with self.lock:
+                yield
+            return
+        fd = os.open(self.lock.lock_file, os.O_RDWR | os.O_CREAT)
+        try:
+            timeout = time.monotonic() + self.lock.timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if time.monotonic() > timeout:
+                        raise Timeout(self.lock.lock_file)
+                    time.sleep(0.01)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
     def _write_yaml_file(self):
         """
-        Overwrites and/or updates the YML at the specified file_path.
+        Overwrites and/or updates the YML at the specified file_path. The file is written to a temporary file and
+        then moved into place so other processes read either the old or the new file. Nothing is written if the
+        serialized content is unchanged.
         """
+        self._publish_snapshot()
         try:
             with self.lock.acquire(30):
-                tmp_filename = join(self.path, self.name + ".tmp")
+                to_dump = self._content
+                if not isinstance(to_dump, CommentedMap):
+                    # Content loaded from the sidecar has no comments; apply it to the round-trip parsed file
+                    with open(self.file_path, 'r') as f:
+                        to_dump = _sync_round_trip(self.parser.load(f) or CommentedMap(), self._content)
+                stream = StringIO()
+                self.parser.dump(to_dump, stream)
+                raw = stream.getvalue().encode("utf-8")
+                content_hash = _get_content_hash(raw)
+                if content_hash == self._content_hash:
+                    LOG.debug(f"No changes to write for {self.name}")
+                    self._pending_write = False
+                    self._disk_snapshot = self._snapshot
+                    return
+                file_path = realpath(self.file_path)
+                tmp_filename = join(dirname(file_path), self.name + ".tmp")
                 LOG.debug(f"tmp_filename={tmp_filename}")
-                shutil.copy2(self.file_path, tmp_filename)
-                with open(self.file_path, 'w+') as f:
-                    self.parser.dump(self._content, f)
-                    LOG.debug(f"YAML updated {self.name}")
+                with open(tmp_filename, 'wb') as f:
+                    f.write(raw)
+                    f.flush()
+                    os.fsync(f.fileno())
+                shutil.copymode(file_path, tmp_filename)
+                os.replace(tmp_filename, file_path)
+                LOG.debug(f"YAML updated {self.name}")
                 self._loaded = os.path.getmtime(self.file_path)
+                self._content_hash = content_hash
                 self._pending_write = False
+                self._disk_snapshot = self._snapshot
+                if _SHARED_CONFIG_READER:
+                    # Anything published before this write is older than this content
+                    self._shared_generation = _SHARED_CONFIG_READER.generation
+                if self.use_sidecar:
+                    self._write_sidecar(raw, self._content)
         except FileNotFoundError as x:
             LOG.error(f"Configuration file not found error: {x}")
 
+    @property
+    def sidecar_path(self) -> str:
+        """
+        Returns the path to the binary cache of parsed content associated with this configuration
+        Returns: path to this configuration's sidecar cache
+        """
+        return self._sidecar_path
+
+    def _load_sidecar(self, raw: bytes) -> Optional[dict]:
+        """
+        Loads previously parsed content for the passed yml file contents if the sidecar cache is valid
+        Args:
+            raw: bytes contents of the yml file
+        Returns:
+            dict parsed content, None if there is no valid sidecar
+        """
+        try:
+            with open(self.sidecar_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get("size") == len(raw) and cached.get("hash") == _get_content_hash(raw):
+                return cached["content"]
+            LOG.debug(f"Sidecar cache outdated for {self.name}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            LOG.warning(f"Ignoring invalid sidecar cache {self.sidecar_path}: {e}")
+        return None
+
+    def _write_sidecar(self, raw: bytes, content: dict):
+        """
+        Writes parsed content for the passed yml file contents to the sidecar cache
+        Args:
+            raw: bytes contents of the yml file
+            content: dict parsed content of raw
+        """
+        cached = {"mtime": self._loaded,
+                  "size": len(raw),
+                  "hash": _get_content_hash(raw),
+                  "content": _to_plain_dict(content)}
+        tmp_path = f"{self.sidecar_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError as e:
+            LOG.debug(f"Unable to write sidecar cache for {self.name}: {e}")
+
     @property
     def content(self) -> dict:
         """
@@ -285,10 +1645,17 @@ class NGIConfig:
     def __contains__(self, item):
         return item in self._content
 
+    @_synchronized
     def __setitem__(self, key, value):
         LOG.info(f"Config changes pending write to disk!")
         self._pending_write = True
         self._content[key] = value
+        if self._transaction_depth:
+            return
+        if _CONFIG_WRITER:
+            self._schedule_write()
+        else:
+            self._publish_snapshot()
 
     def __repr__(self):
         return "NGIConfig('{}') \n {}".format(self.name, self.file_path)
@@ -296,6 +1663,7 @@ class NGIConfig:
     def __str__(self):
         return "{}: {}".format(self.file_path, json.dumps(self._content, indent=4))
 
+    @_synchronized
     def __add__(self, other):
         # with self.lock.acquire(30):
         if other:
@@ -310,8 +1678,9 @@ class NGIConfig:
                 self._content = to_update
         else:
             raise TypeError("__add__ expects an argument other than None")
-        self._write_yaml_file()
+        self._request_write()
 
+    @_synchronized
     def __sub__(self, *other):
         # with self.lock.acquire(30):
         if other:
@@ -333,9 +1702,395 @@ class NGIConfig:
                     raise TypeError("{} config is empty".format(self.name))
         else:
             raise TypeError("__sub__ expects an argument other than None")
-        self._write_yaml_file()
+        self._request_write()
 
 
+def enable_config_watcher(poll_interval: float = 1.0, use_inotify: bool = True) -> ConfigWatcher:
+    """
+    Starts watching configuration files for changes so NGIConfig reads no longer check the file on every access. Any
+    existing configuration objects are registered with the watcher.
+    Args:
+        poll_interval: seconds between checks when polling (also the inotify read timeout)
+        use_inotify: if True, use inotify when available instead of polling
+    Returns:
+        the active ConfigWatcher
+    """
+    global _CONFIG_WATCHER
+    if not _CONFIG_WATCHER:
+        _CONFIG_WATCHER = ConfigWatcher(poll_interval, use_inotify)
+        LOG.info(f"Started config watcher with backend={_CONFIG_WATCHER.backend}")
+        # Mycroft configuration isn't managed by NGIConfig, but still invalidates derived configurations
+        for file_path in _get_mycroft_config_files():
+            if isdir(dirname(file_path)):
+                _CONFIG_WATCHER.watch(file_path, lambda _: None)
+    for config in list(NGIConfig._instances):
+        config._start_watching(_CONFIG_WATCHER)
+    return _CONFIG_WATCHER
+
+
+def disable_config_watcher():
+    """
+    Stops any active config watcher. Configuration objects return to checking file modification times on read.
+    """
+    global _CONFIG_WATCHER
+    if not _CONFIG_WATCHER:
+        return
+    watcher = _CONFIG_WATCHER
+    _CONFIG_WATCHER = None
+    for config in list(NGIConfig._instances):
+        config._watched = False
+        config._stale = False
+    watcher.shutdown()
+
+
+def enable_write_behind(debounce: float = 1.0) -> ConfigWriter:
+    """
+    Starts writing NGIConfig changes to disk from a background thread instead of the thread making the change.
+    Pending changes are written after `debounce` seconds, when a conflicting change is found on disk, or at exit.
+    Args:
+        debounce: max seconds to wait after a change before writing to disk
+    Returns:
+        the active ConfigWriter
+    """
+    global _CONFIG_WRITER
+    if not _CONFIG_WRITER:
+        _CONFIG_WRITER = ConfigWriter(debounce)
+        atexit.register(_CONFIG_WRITER.shutdown)
+    _CONFIG_WRITER.debounce = debounce
+    return _CONFIG_WRITER
+
+
+def disable_write_behind():
+    """
+    Writes any pending NGIConfig changes and returns to writing changes synchronously
+    """
+    global _CONFIG_WRITER
+    if not _CONFIG_WRITER:
+        return
+    writer = _CONFIG_WRITER
+    _CONFIG_WRITER = None
+    atexit.unregister(writer.shutdown)
+    writer.shutdown()
+
+
+def enable_shared_config_publisher(file_path: Optional[str] = None,
+                                   names: tuple = ("ngi_local_conf", "ngi_user_info"),
+                                   path: Optional[str] = None, watch: bool = True) -> SharedConfigPublisher:
+    """
+    Starts publishing configuration to a memory-mapped file for other processes using enable_shared_config_reader.
+    Only one process should publish; it is normally the process that owns the configuration files.
+    Args:
+        file_path: file to publish to, defaults to a file in a directory private to the current user
+        names: names of the configurations to publish
+        path: directory containing the configurations, defaults to the configuration directory
+        watch: if True, enable the config watcher so changes made by other processes are published
+    Returns:
+        the active SharedConfigPublisher
+    """
+    global _SHARED_CONFIG_PUBLISHER
+    if not _SHARED_CONFIG_PUBLISHER:
+        _SHARED_CONFIG_PUBLISHER = SharedConfigPublisher(file_path)
+        atexit.register(_SHARED_CONFIG_PUBLISHER.shutdown)
+        LOG.info(f"Publishing configuration to {_SHARED_CONFIG_PUBLISHER.file_path}")
+    if watch:
+        enable_config_watcher()
+    for name in names:
+        _SHARED_CONFIG_PUBLISHER.add(NGIConfig(name, path))
+    return _SHARED_CONFIG_PUBLISHER
+
+
+def disable_shared_config_publisher():
+    """
+    Stops publishing configuration. Readers keep the last published configuration until another publisher starts.
+    """
+    global _SHARED_CONFIG_PUBLISHER
+    if not _SHARED_CONFIG_PUBLISHER:
+        return
+    publisher = _SHARED_CONFIG_PUBLISHER
+    _SHARED_CONFIG_PUBLISHER = None
+    atexit.unregister(publisher.shutdown)
+    publisher.shutdown()
+
+
+def enable_shared_config_reader(file_path: Optional[str] = None) -> SharedConfigReader:
+    """
+    Starts reading published configuration from a memory-mapped file. NGIConfig objects that are published only check
+    the shared generation on read and never read their yml files; other configurations are unaffected.
+    Args:
+        file_path: file published to by enable_shared_config_publisher, defaults to a file in a directory private to
+            the current user
+    Returns:
+        the active SharedConfigReader
+    """
+    global _SHARED_CONFIG_READER
+    if not _SHARED_CONFIG_READER:
+        _SHARED_CONFIG_READER = SharedConfigReader(file_path)
+    return _SHARED_CONFIG_READER
+
+
+def disable_shared_config_reader():
+    """
+    Stops reading published configuration; configuration objects return to checking their files for changes
+    """
+    global _SHARED_CONFIG_READER
+    if not _SHARED_CONFIG_READER:
+        return
+    reader = _SHARED_CONFIG_READER
+    _SHARED_CONFIG_READER = None
+    reader.close()
+    for config in list(NGIConfig._instances):
+        config._shared_generation = 0
+        config._shared_entry_generation = 0
+        config._shared_digests = dict()
+        # Content may have been published after the file was last read
+        config._loaded = None
+        config._stale = True
+
+
+def _reset_after_fork():
+    """
+    Drops the config watcher and background writer in a forked child process, since their threads only run in the
+    parent. Configuration objects in the child return to checking file modification times and writing synchronously.
+    A shared config publisher is closed so only the parent holds the shared file. Changes waiting for the parent's
+    background writer are left for the parent to write.
+    """
+    global _CONFIG_WATCHER, _CONFIG_WRITER, _SHARED_CONFIG_PUBLISHER
+    if _CONFIG_WRITER:
+        atexit.unregister(_CONFIG_WRITER.shutdown)
+    if _SHARED_CONFIG_PUBLISHER:
+        atexit.unregister(_SHARED_CONFIG_PUBLISHER.shutdown)
+        _SHARED_CONFIG_PUBLISHER._lock = threading.RLock()
+        _SHARED_CONFIG_PUBLISHER.shutdown()
+        _SHARED_CONFIG_PUBLISHER = None
+    _CONFIG_WATCHER = None
+    _CONFIG_WRITER = None
+    locks = dict()  # parent lock id: new lock, so instances that shared a lock still do
+    for config in list(NGIConfig._instances):
+        config._watched = False
+        config._stale = False
+        config._pending_write = False
+        config._transaction_lock = locks.setdefault(id(config._transaction_lock), threading.RLock())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_write_behind_stats() -> dict:
+    """
+    Get statistics for the background config writer
+    Returns:
+        dict of current `queue_depth`, `requested` and `written` counts, `max_queue_depth` and flush latency
+    """
+    if not _CONFIG_WRITER:
+        return dict()
+    return {**_CONFIG_WRITER.stats, "queue_depth": _CONFIG_WRITER.queue_depth}
+
+
+def get_config_reload_stats() -> dict:
+    """
+    Get statistics about configuration reloads from disk
+    Returns:
+        dict of config name to dict reload `count`, `total_seconds`, and `last_seconds`
+    """
+    return {name: dict(stats) for name, stats in NGIConfig.reload_stats.items()}
+
+
+def _get_file_signature(file_path: str) -> Optional[tuple]:
+    """
+    Get a signature used to determine if a file has changed
+    Args:
+        file_path: path to file
+    Returns:
+        tuple of file modification time and size, None if the file doesn't exist
+    """
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _get_content_hash(raw: bytes) -> str:
+    """
+    Get a hash of file contents used to validate cached data
+    Args:
+        raw: bytes file contents
+    Returns:
+        str hex digest of raw
+    """
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _to_plain_dict(content):
+    """
+    Converts round-trip parsed yml content into builtin Python types
+    Args:
+        content: parsed yml object
+    Returns:
+        content using only builtin dict, list, and scalar types
+    """
+    if isinstance(content, MutableMapping):
+        return {k: _to_plain_dict(v) for k, v in content.items()}
+    if isinstance(content, list):
+        return [_to_plain_dict(v) for v in content]
+    if isinstance(content, bool):
+        return bool(content)
+    for builtin in (str, int, float):
+        if isinstance(content, builtin):
+            return builtin(content)
+    return content
+
+
+def _sync_round_trip(round_trip: CommentedMap, content: MutableMapping) -> CommentedMap:
+    """
+    Updates round-trip parsed yml content in place to match content, preserving comments and formatting of any
+    unchanged values
+    Args:
+        round_trip: round-trip parsed yml content to update
+        content: dict of desired configuration values
+    Returns:
+        round_trip updated to match content
+    """
+    for key in list(round_trip.keys()):
+        if key not in content:
+            del round_trip[key]
+    for key, value in content.items():
+        if key not in round_trip:
+            round_trip[key] = value
+        elif isinstance(round_trip[key], CommentedMap) and isinstance(value, MutableMapping):
+            _sync_round_trip(round_trip[key], value)
+        elif round_trip[key] != value or isinstance(round_trip[key], bool) != isinstance(value, bool):
+            round_trip[key] = value
+    return round_trip
+
+
+_ENVIRONMENT_PROBES = {"key": None, "values": dict(), "file": None}
+
+
+def _get_environment_signature() -> str:
+    """
+    Get a hash of the interpreter, sys.path, and modification times of sys.path directories. This changes whenever
+    packages are installed or removed, so persisted environment probes are not reused after an install.
+    Returns:
+        str hex digest
+    """
+    signature = hashlib.blake2b(sys.executable.encode("utf-8"), digest_size=16)
+    for path in sys.path:
+        signature.update(b"\0" + path.encode("utf-8", "surrogateescape"))
+        if path:
+            with suppress(OSError):
+                signature.update(str(os.stat(path).st_mtime_ns).encode("utf-8"))
+    return signature.hexdigest()
+
+
+def _load_environment_cache():
+    """
+    Loads persisted environment probes if they were saved by this interpreter with the same sys.path
+    """
+    try:
+        with open(_ENVIRONMENT_PROBES["file"]) as f:
+            cached = json.load(f)
+        if cached.get("signature") == _get_environment_signature():
+            _ENVIRONMENT_PROBES["values"].update(cached.get("values", {}))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        LOG.warning(f"Invalid environment cache {_ENVIRONMENT_PROBES['file']}: {e}")
+
+
+def _save_environment_cache():
+    """
+    Persists environment probes for other processes using the same interpreter and sys.path
+    """
+    cache_file = _ENVIRONMENT_PROBES["file"]
+    try:
+        os.makedirs(dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"signature": _get_environment_signature(), "values": _ENVIRONMENT_PROBES["values"]}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        LOG.warning(f"Failed to save environment cache {cache_file}: {e}")
+
+
+def _cached_probe(func):
+    """
+    Decorator to compute an environment probe once per process. Probes are computed again if sys.executable or sys.path
+    change, and are persisted if enable_environment_cache_file has been called.
+    """
+    @wraps(func)
+    def wrapper():
+        key = (sys.executable, tuple(sys.path))
+        values = _ENVIRONMENT_PROBES["values"]
+        if _ENVIRONMENT_PROBES["key"] != key:
+            _ENVIRONMENT_PROBES["key"] = key
+            values.clear()
+            if _ENVIRONMENT_PROBES["file"]:
+                _load_environment_cache()
+        if func.__name__ not in values:
+            values[func.__name__] = func()
+            if _ENVIRONMENT_PROBES["file"]:
+                _save_environment_cache()
+        return values[func.__name__]
+    return wrapper
+
+
+def enable_environment_cache_file(cache_file: Optional[str] = None) -> str:
+    """
+    Persists environment probes (i.e. get_config_dir, is_neon_core) to a file so they are shared by processes using
+    the same interpreter. Saved probes are ignored if sys.path changes or packages are installed or removed.
+    Args:
+        cache_file: path to cache file (default $XDG_CACHE_HOME/neon/environment_probes.json)
+    Returns:
+        path to the cache file
+    """
+    cache_file = cache_file or join(os.environ.get("XDG_CACHE_HOME", expanduser("~/.cache")), "neon",
+                                    "environment_probes.json")
+    _ENVIRONMENT_PROBES["file"] = cache_file
+    _ENVIRONMENT_PROBES["key"] = None
+    return cache_file
+
+
+def disable_environment_cache_file():
+    """
+    Stops persisting environment probes. Probes are still cached in this process.
+    """
+    _ENVIRONMENT_PROBES["file"] = None
+
+
+def clear_environment_cache():
+    """
+    Clears cached environment probes so they are computed again on next access
+    """
+    _ENVIRONMENT_PROBES["key"] = None
+    _ENVIRONMENT_PROBES["values"].clear()
+    _CONFIG_SOURCE_FILES.clear()
+    if _ENVIRONMENT_PROBES["file"]:
+        with suppress(FileNotFoundError):
+            os.remove(_ENVIRONMENT_PROBES["file"])
+
+
+@_cached_probe
+def _get_mycroft_config_files() -> list:
+    """
+    Get every file read_mycroft_config or the packaged fallback may read the Mycroft configuration from
+    Returns:
+        list of paths to default, system, user, and fallback mycroft.conf files
+    """
+    files = [getattr(ovos_configuration, "MYCROFT_SYSTEM_CONFIG", "/etc/mycroft/mycroft.conf"),
+             getattr(ovos_configuration, "MYCROFT_OLD_USER_CONFIG", expanduser("~/.mycroft/mycroft.conf")),
+             getattr(ovos_configuration, "MYCROFT_XDG_USER_CONFIG",
+                     join(os.environ.get("XDG_CONFIG_HOME", expanduser("~/.config")), "mycroft", "mycroft.conf")),
+             join(_DEFAULT_CONFIG_DIR, "mycroft.conf")]
+    with suppress(Exception):
+        core_root = ovos_configuration.search_mycroft_core_location()
+        if core_root:
+            files.append(ovos_configuration.MYCROFT_DEFAULT_CONFIG.replace("{ROOT_PATH}", core_root))
+    return list(dict.fromkeys(files))
+
+
+@_cached_probe
 def get_config_dir():
     """
     Get a default directory in which to find configuration files
@@ -403,14 +2158,26 @@ def dict_merge(dct_to_change: MutableMapping, merge_dct: MutableMapping) -> Muta
         merge_dct: dict with keys and new values to add to dct_to_change
     Returns: dict of merged preferences
     """
+    _dict_merge(dct_to_change, merge_dct)
+    return dct_to_change
+
+
+def _dict_merge(dct_to_change: MutableMapping, merge_dct: MutableMapping) -> int:
+    """
+    Merges merge_dct into dct_to_change in place (see dict_merge)
+    Returns: number of values added or changed in dct_to_change
+    """
     if not isinstance(dct_to_change, MutableMapping) or not isinstance(merge_dct, MutableMapping):
         raise AttributeError("merge_recursive_dicts expects two dict objects as args")
+    changes = 0
     for key, value in merge_dct.items():
         if isinstance(dct_to_change.get(key), dict) and isinstance(value, MutableMapping):
-            dct_to_change[key] = dict_merge(dct_to_change[key], value)
+            changes += _dict_merge(dct_to_change[key], value)
         else:
+            if key not in dct_to_change or dct_to_change[key] != value:
+                changes += 1
             dct_to_change[key] = value
-    return dct_to_change
+    return changes
 
 
 def dict_make_equal_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping,
@@ -425,21 +2192,33 @@ def dict_make_equal_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping
         cur_depth: Current depth relative to top-level config (0-indexed)
     Returns: dct_to_change with any keys not in keys_dct removed and any new keys added with default values
 
+    """
+    _dict_make_equal_keys(dct_to_change, keys_dct, max_depth, cur_depth)
+    return dct_to_change
+
+
+def _dict_make_equal_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping,
+                          max_depth: int = 1, cur_depth: int = 0) -> int:
+    """
+    Adds and removes keys from dct_to_change in place (see dict_make_equal_keys)
+    Returns: number of keys added to or removed from dct_to_change
     """
     if not isinstance(dct_to_change, MutableMapping) or not isinstance(keys_dct, MutableMapping):
         raise AttributeError("merge_recursive_dicts expects two dict objects as args")
+    changes = 0
     for key in list(dct_to_change.keys()):
         if isinstance(keys_dct.get(key), dict) and isinstance(dct_to_change[key], MutableMapping):
             if max_depth > cur_depth:
-                dct_to_change[key] = dict_make_equal_keys(dct_to_change[key], keys_dct[key], max_depth, cur_depth + 1)
+                changes += _dict_make_equal_keys(dct_to_change[key], keys_dct[key], max_depth, cur_depth + 1)
         elif key not in keys_dct.keys():
             dct_to_change.pop(key)
             LOG.warning(f"Removing '{key}' from dict!")
-            # del dct_to_change[key]
+            changes += 1
     for key, value in keys_dct.items():
         if key not in dct_to_change.keys():
             dct_to_change[key] = value
-    return dct_to_change
+            changes += 1
+    return changes
 
 
 def dict_update_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping) -> MutableMapping:
@@ -452,16 +2231,114 @@ def dict_update_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping) ->
 
     Returns: dct_to_change with any new keys in keys_dict added with default values
 
+    """
+    _dict_update_keys(dct_to_change, keys_dct)
+    return dct_to_change
+
+
+def _dict_update_keys(dct_to_change: MutableMapping, keys_dct: MutableMapping) -> int:
+    """
+    Adds keys to dct_to_change in place (see dict_update_keys). Existing values that are not dicts are left unchanged.
+    Returns: number of keys added to dct_to_change
     """
     if not isinstance(dct_to_change, MutableMapping) or not isinstance(keys_dct, MutableMapping):
         raise AttributeError("merge_recursive_dicts expects two dict objects as args")
+    changes = 0
     for key, value in list(keys_dct.items()):
-        if isinstance(keys_dct.get(key), dict) and isinstance(value, MutableMapping):
-            dct_to_change[key] = dict_update_keys(dct_to_change.get(key, {}), keys_dct[key])
-        else:
-            if key not in dct_to_change.keys():
-                dct_to_change[key] = value
-    return dct_to_change
+        if isinstance(value, dict):
+            if key not in dct_to_change:
+                dct_to_change[key] = dict()
+                changes += 1
+            elif not isinstance(dct_to_change[key], MutableMapping):
+                continue
+            changes += _dict_update_keys(dct_to_change[key], value)
+        elif key not in dct_to_change.keys():
+            dct_to_change[key] = value
+            changes += 1
+    return changes
+
+
+def get_changed_keys(old: MutableMapping, new: MutableMapping, prefix: str = "") -> list:
+    """
+    Compares two dicts and returns the dotted paths to values that were added, removed, or changed
+    Args:
+        old: original dict
+        new: updated dict
+        prefix: dotted path of the passed dicts (used for recursion)
+    Returns:
+        list of dotted paths that differ between old and new
+    """
+    changed = list()
+    for key in set(old.keys()) | set(new.keys()):
+        path = f"{prefix}{key}"
+        if key not in old or key not in new:
+            changed.append(path)
+        elif isinstance(old[key], MutableMapping) and isinstance(new[key], MutableMapping):
+            changed.extend(get_changed_keys(old[key], new[key], f"{path}."))
+        elif old[key] != new[key]:
+            changed.append(path)
+    return changed
+
+
+def _get_changed_paths(old: MutableMapping, new: MutableMapping, path: tuple = ()) -> list:
+    """
+    Compares two dicts and returns key paths to values that were added, removed, or changed
+    Args:
+        old: original dict
+        new: updated dict
+        path: key path of the passed dicts (used for recursion)
+    Returns:
+        list of tuple key paths that differ between old and new
+    """
+    changed = list()
+    for key in set(old.keys()) | set(new.keys()):
+        if key not in old or key not in new:
+            changed.append(path + (key,))
+        elif isinstance(old[key], MutableMapping) and isinstance(new[key], MutableMapping):
+            changed.extend(_get_changed_paths(old[key], new[key], path + (key,)))
+        elif old[key] != new[key]:
+            changed.append(path + (key,))
+    return changed
+
+
+def _get_path_value(content: MutableMapping, path: tuple):
+    """
+    Gets the value at a key path in a dict, or _MISSING if the path doesn't exist
+    """
+    value = content
+    for key in path:
+        if not isinstance(value, MutableMapping) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _set_path_value(content: MutableMapping, path: tuple, value):
+    """
+    Sets the value at a key path in a dict, creating parent dicts as needed; removes the key if value is _MISSING
+    """
+    for key in path[:-1]:
+        if not isinstance(content.get(key), MutableMapping):
+            if value is _MISSING:
+                return
+            content[key] = dict()
+        content = content[key]
+    if value is _MISSING:
+        content.pop(path[-1], None)
+    else:
+        content[path[-1]] = value
+
+
+def _get_dotted_value(content: MutableMapping, key: str):
+    """
+    Gets the value at a dotted path in a dict, or None if the path doesn't exist
+    """
+    value = content
+    for part in key.split("."):
+        if not isinstance(value, MutableMapping) or part not in value:
+            return None
+        value = value[part]
+    return value
 
 
 def write_to_json(preference_dict: MutableMapping, output_path: str):
@@ -477,34 +2354,252 @@ def write_to_json(preference_dict: MutableMapping, output_path: str):
         json.dump(preference_dict, out, indent=4)
 
 
-def get_neon_lang_config() -> dict:
+def parse_skill_default_settings(skill_meta: Optional[MutableMapping]) -> dict:
     """
-    Get a language config for language utilities
+    Get default skill settings from skill metadata
+    Args:
+        skill_meta: parsed contents of a skill's settingsmeta.yml or settingsmeta.json
     Returns:
-        dict of config params used by Language Detector and Translator modules
+        dict of setting names to default values
+    """
+    default = {"__mycroft_skill_firstrun": True}
+    if not skill_meta:
+        return default
+    LOG.debug(skill_meta["skillMetadata"]["sections"])
+    for section in skill_meta["skillMetadata"]["sections"]:
+        for pref in section.get("fields", []):
+            if not pref.get("name"):
+                LOG.debug(f"non-data skill meta: {pref}")
+            else:
+                if pref.get("value") == "true":
+                    value = True
+                elif pref.get("value") == "false":
+                    value = False
+                elif isinstance(pref.get("value"), CommentedMap):
+                    value = dict(pref.get("value"))
+                else:
+                    value = pref.get("value")
+                default[pref["name"]] = value
+    return default
+
+
+class SkillSettingsCache:
+    """
+    Caches the default settings parsed from a skill's settingsmeta file and the state of the skill's settings file after
+    it was last updated with those defaults, so unchanged skills skip parsing and updating settings when they are loaded
+    again. The cache is kept in the user's cache directory since skill directories may be read-only.
+    """
+    def __init__(self, skill_dir: str):
+        self.skill_dir = skill_dir
+        self.cache_path = _get_config_cache_path(skill_dir, "settingsmeta", "cache")
+        self.from_cache = False
+        self._cache = self._load()
+
+    @property
+    def settingsmeta_path(self) -> Optional[str]:
+        """
+        Returns: path to the skill's settingsmeta file, None if the skill has no settingsmeta
+        """
+        for name in ("settingsmeta.yml", "settingsmeta.json"):
+            file_path = join(self.skill_dir, name)
+            if isfile(file_path):
+                return file_path
+        return None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            LOG.warning(f"Ignoring invalid settings cache {self.cache_path}: {e}")
+        return dict()
+
+    def _save(self):
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self._cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            LOG.debug(f"Unable to write settings cache for {self.skill_dir}: {e}")
+
+    def get_defaults(self) -> dict:
+        """
+        Get default settings from the skill's settingsmeta. Cached defaults are used if the settingsmeta file has the
+        same modification time or the same contents as when they were parsed.
+        Returns:
+            dict of setting names to default values
+        """
+        meta_path = self.settingsmeta_path
+        signature = _get_file_signature(meta_path) if meta_path else None
+        cached = self._cache.get("meta")
+        if cached and cached["path"] == meta_path and cached["signature"] == signature:
+            self.from_cache = True
+            return cached["defaults"]
+        raw = None
+        if meta_path:
+            with open(meta_path, 'rb') as f:
+                raw = f.read()
+        content_hash = _get_content_hash(raw) if raw is not None else None
+        if cached and cached["path"] == meta_path and cached["hash"] == content_hash:
+            # File was touched without changing
+            cached["signature"] = signature
+            self._save()
+            self.from_cache = True
+            return cached["defaults"]
+
+        if not meta_path:
+            skill_meta = None
+        elif meta_path.endswith(".json"):
+            skill_meta = json.loads(raw)
+        else:
+            skill_meta = YAML().load(raw.decode("utf-8"))
+        defaults = _to_plain_dict(parse_skill_default_settings(skill_meta))
+        self._cache = {"meta": {"path": meta_path, "signature": signature, "hash": content_hash,
+                                "defaults": defaults}}
+        self._save()
+        self.from_cache = False
+        return defaults
+
+    def is_reconciled(self, settings_path: str) -> bool:
+        """
+        Checks if the settings file was updated with the current defaults and has not been changed since
+        Args:
+            settings_path: path to the skill's settings file
+        Returns:
+            True if the settings file does not need to be updated with default settings
+        """
+        return self.from_cache and self._cache.get("settings") == (settings_path, _get_file_signature(settings_path))
+
+    def set_reconciled(self, settings_path: str):
+        """
+        Records that the settings file was updated with the current defaults
+        Args:
+            settings_path: path to the skill's settings file
+        """
+        self._cache["settings"] = (settings_path, _get_file_signature(settings_path))
+        self._save()
+
+
+_CONFIG_CACHE = dict()
+_CONFIG_CACHE_STATS = {"hits": 0, "misses": 0}
+_MYCROFT_SNAPSHOT = dict()
+_LAYERED_CONFIGS = dict()
+_CONFIG_SOURCE_FILES = dict()  # path: files derived configurations are built from
+_CONFIG_CHANGE_LOCK = threading.Lock()
+_CONFIG_CHANGES = 0  # incremented whenever an NGIConfig in this process changes
+
+
+def _config_changed():
+    """
+    Records a change to configuration in this process so memoized configurations are rebuilt on next access, even
+    before the change is written to disk or noticed by a config watcher.
+    """
+    global _CONFIG_CHANGES
+    with _CONFIG_CHANGE_LOCK:
+        _CONFIG_CHANGES += 1
+
+
+def _get_config_cache_signature(path: Optional[str] = None) -> tuple:
+    """
+    Get a signature for the configuration files that derived configurations are built from. If a config watcher is
+    active, its generation counter is used instead of checking each file. Changes made in this process are always
+    included, so a process sees its own writes without waiting for them to reach disk or the watcher.
+    Args:
+        path: optional path to yml configuration files
+    Returns:
+        tuple that changes whenever any source configuration changes
     """
-    core_config = get_neon_local_config()
-    language_config = deepcopy(get_neon_user_config().content.get("speech", {}))
-    language_config["internal"] = language_config.get("internal", "en-us")
-    language_config["user"] = language_config.get("stt_language", "en-us")
-    language_config["boost"] = False
-    language_config["detection_module"] = core_config.get("stt", {}).get("detection_module")
-    language_config["translation_module"] = core_config.get("stt", {}).get("translation_module")
+    if _CONFIG_WATCHER:
+        return _CONFIG_CHANGES, _CONFIG_WATCHER.backend, _CONFIG_WATCHER.generation
+    files = _CONFIG_SOURCE_FILES.get(path)
+    if files is None:
+        config_dir = path or get_config_dir()
+        files = (join(config_dir, "ngi_local_conf.yml"), join(config_dir, "ngi_user_info.yml"),
+                 join(_DEFAULT_CONFIG_DIR, "default_core_conf.yml"),
+                 join(_DEFAULT_CONFIG_DIR, "default_user_conf.yml")) + tuple(_get_mycroft_config_files())
+        _CONFIG_SOURCE_FILES[path] = files
+    return (_CONFIG_CHANGES,) + tuple(_get_file_signature(f) for f in files)
+
+
+def _cached_config(func):
+    """
+    Decorator to memoize a derived configuration until any of its source files change. A function's `path` arg is
+    used to determine which configuration files to check.
+
+    The decorated function returns a mutable copy of the memoized configuration on every call. Its `snapshot` attribute
+    returns the memoized configuration itself as a read-only FrozenDict shared by all callers, without copying it.
+    """
+    @wraps(func)
+    def snapshot(*args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        path = kwargs.get("path", args[0] if args and isinstance(args[0], str) else None)
+        signature = _get_config_cache_signature(path)
+        cached = _CONFIG_CACHE.get(key)
+        if cached and cached[0] == signature:
+            _CONFIG_CACHE_STATS["hits"] += 1
+            return cached[1]
+        _CONFIG_CACHE_STATS["misses"] += 1
+        result = func(*args, **kwargs)
+        # Building a config may migrate and write its source files
+        _CONFIG_CACHE[key] = (_get_config_cache_signature(path), result)
+        return result
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return _thaw(snapshot(*args, **kwargs))
+    wrapper.snapshot = snapshot
+    return wrapper
+
+
+def get_config_cache_stats() -> dict:
+    """
+    Get statistics for memoized configurations
+    Returns:
+        dict of cache `hits`, `misses`, and number of cached `entries`
+    """
+    return {**_CONFIG_CACHE_STATS, "entries": len(_CONFIG_CACHE)}
 
-    merged_language = {**_safe_mycroft_config().get("language", {}), **language_config}
-    if merged_language.keys() != language_config.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged_language.keys()}")
 
-    return merged_language
+def clear_config_cache():
+    """
+    Clears all memoized configurations so they are rebuilt on next access
+    """
+    _CONFIG_CACHE.clear()
+    _MYCROFT_SNAPSHOT.clear()
+    _LAYERED_CONFIGS.clear()
+    _CONFIG_SOURCE_FILES.clear()
 
 
+@_cached_config
+def get_neon_lang_config() -> dict:
+    """
+    Get a language config for language utilities
+    Returns:
+        dict of config params used by Language Detector and Translator modules
+    """
+    core_config = get_neon_local_config.snapshot()
+    speech = get_neon_user_config().snapshot.get("speech", {})
+    language_config = {"internal": speech.get("internal", "en-us"),
+                       "user": speech.get("stt_language", "en-us"),
+                       "boost": False,
+                       "detection_module": core_config.get("stt", {}).get("detection_module"),
+                       "translation_module": core_config.get("stt", {}).get("translation_module"),
+                       "translation_cache": core_config.get("stt", {}).get("translation_cache")}
+    return LayeredConfig(language_config, speech, _get_mycroft_snapshot().get("language"),
+                         name="language", log_missing=True).freeze()
+
+
+@_cached_config
 def get_neon_cli_config() -> dict:
     """
     Get a configuration dict for the neon_cli
     Returns:
         dict of config params used by the neon_cli
     """
-    local_config = NGIConfig("ngi_local_conf").content
+    local_config = NGIConfig("ngi_local_conf").snapshot
     wake_words_enabled = local_config.get("interface", {}).get("wake_word_enabled", True)
     try:
         neon_core_version = os.path.basename(glob(local_config['dirVars']['ngiDir'] +
@@ -513,9 +2608,9 @@ def get_neon_cli_config() -> dict:
         LOG.error(e)
         neon_core_version = "Unknown"
     log_dir = local_config.get("dirVars", {}).get("logsDir", "/var/log/mycroft")
-    return {"neon_core_version": neon_core_version,
-            "wake_words_enabled": wake_words_enabled,
-            "log_dir": log_dir}
+    return _freeze({"neon_core_version": neon_core_version,
+                    "wake_words_enabled": wake_words_enabled,
+                    "log_dir": log_dir})
 
 
 def get_neon_tts_config() -> dict:
@@ -524,129 +2619,158 @@ def get_neon_tts_config() -> dict:
     Returns:
     dict of TTS-related configuration
     """
-    return get_neon_local_config()["tts"]
+    return _thaw(get_neon_local_config.snapshot()["tts"])
 
 
+@_cached_config
 def get_neon_speech_config() -> dict:
     """
     Get a configuration dict for listener. Merge any values from Mycroft config if missing from Neon.
     Returns:
         dict of config params used for listener in neon_speech
     """
-    mycroft = _safe_mycroft_config()
-    local_config = get_neon_local_config()
-
-    neon_listener_config = deepcopy(local_config.get("listener", {}))
-    neon_listener_config["wake_word_enabled"] = local_config["interface"].get("wake_word_enabled", True)
-    neon_listener_config["save_utterances"] = local_config["prefFlags"].get("saveAudio", False)
-    neon_listener_config["confirm_listening"] = local_config["interface"].get("confirm_listening", True)
-    neon_listener_config["record_utterances"] = neon_listener_config["save_utterances"]
-    neon_listener_config["record_wake_words"] = neon_listener_config["save_utterances"]
-    merged_listener = {**mycroft.get("listener", {}), **neon_listener_config}
-    if merged_listener.keys() != neon_listener_config.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged_listener.keys()}")
+    config = _get_neon_layers()
+    local_config, mycroft = config.layers
+    save_utterances = local_config["prefFlags"].get("saveAudio", False)
+    listener_config = {"wake_word_enabled": local_config["interface"].get("wake_word_enabled", True),
+                       "save_utterances": save_utterances,
+                       "confirm_listening": local_config["interface"].get("confirm_listening", True),
+                       "record_utterances": save_utterances,
+                       "record_wake_words": save_utterances}
+    merged_listener = LayeredConfig(listener_config, *config.section("listener").layers,
+                                    name="neon.listener", log_missing=True)
 
     lang = mycroft.get("language", {}).get("internal", "en-us")  # core_lang
 
-    neon_stt_config = local_config.get("stt", {})
-    merged_stt_config = {**mycroft.get("stt", {}), **neon_stt_config}
-    if merged_stt_config.keys() != neon_stt_config.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged_stt_config.keys()}")
-
     hotword_config = local_config.get("hotwords") or mycroft.get("hotwords")
     if hotword_config != local_config.get("hotwords"):
         LOG.warning(f"Neon hotword config missing! {hotword_config}")
 
-    neon_audio_parser_config = local_config.get("audio_parsers", {})
-    merged_audio_parser_config = {**mycroft.get("audio_parsers", {}), **neon_audio_parser_config}
-    if merged_audio_parser_config.keys() != neon_audio_parser_config.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged_audio_parser_config.keys()}")
-
-    return {"listener": merged_listener,
-            "hotwords": hotword_config,
-            "audio_parsers": merged_audio_parser_config,
-            "lang": lang,
-            "stt": merged_stt_config,
-            "metric_upload": local_config["prefFlags"].get("metrics", False),
-            "remote_server": local_config.get("remoteVars", {}).get("remoteHost", "64.34.186.120"),
-            "data_dir": os.path.expanduser(local_config.get("dirVars", {}).get("rootDir") or "~/.local/share/neon"),
-            "keys": {}  # TODO: Read from somewhere DM
-            }
+    return _freeze({"listener": merged_listener.freeze(),
+                    "hotwords": hotword_config,
+                    "audio_parsers": config.section("audio_parsers").freeze(),
+                    "lang": lang,
+                    "stt": config.section("stt").freeze(),
+                    "metric_upload": local_config["prefFlags"].get("metrics", False),
+                    "remote_server": local_config.get("remoteVars", {}).get("remoteHost", "64.34.186.120"),
+                    "data_dir": os.path.expanduser(local_config.get("dirVars", {}).get("rootDir") or
+                                                   "~/.local/share/neon"),
+                    "keys": {}  # TODO: Read from somewhere DM
+                    })
 
 
+@_cached_config
 def get_neon_bus_config() -> dict:
     """
     Get a configuration dict for the messagebus. Merge any values from Mycroft config if missing from Neon.
     Returns:
         dict of config params used for a messagebus client
     """
-    mycroft = _safe_mycroft_config().get("websocket", {})
-    neon = get_neon_local_config().get("websocket", {})
-    merged = {**mycroft, **neon}
-    if merged.keys() != neon.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged.keys()}")
-    return merged
+    return _get_neon_layers().section("websocket").freeze()
 
 
+@_cached_config
 def get_neon_audio_config() -> dict:
     """
     Get a configuration dict for the audio module. Merge any values from Mycroft config if missing from Neon.
     Returns:
         dict of config params used for the Audio module
     """
-    mycroft = _safe_mycroft_config().get("Audio", {})
-    neon = get_neon_local_config().get("audioService", {})
-    merged = {**mycroft, **neon}
-    if merged.keys() != neon.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged.keys()}")
-    return merged
+    return _get_neon_layers().section("audioService", "Audio").freeze()
 
 
+@_cached_config
 def get_neon_api_config() -> dict:
     """
     Get a configuration dict for the api module. Merge any values from Mycroft config if missing from Neon.
     Returns:
         dict of config params used for the Mycroft API module
     """
-    core_config = get_neon_local_config()
-    api_config = deepcopy(core_config.get("api"))
-    api_config["metrics"] = core_config["prefFlags"].get("metrics", False)
-    mycroft = _safe_mycroft_config().get("server", {})
-    merged = {**mycroft, **api_config}
-    if merged.keys() != api_config.keys():
-        LOG.warning(f"Keys missing from Neon config! {merged.keys()}")
-    return merged
+    config = _get_neon_layers()
+    api_config = config.section("api", "server")
+    metrics = {"metrics": config.layers[0]["prefFlags"].get("metrics", False)}
+    return LayeredConfig(metrics, *api_config.layers, name=api_config.name, log_missing=True).freeze()
 
 
+@_cached_config
 def get_neon_skills_config() -> dict:
     """
     Get a configuration dict for the skills module. Merge any values from Mycroft config if missing from Neon.
     Returns:
         dict of config params used for the Mycroft Skills module
     """
-    core_config = get_neon_local_config()
-    mycroft_config = _safe_mycroft_config()
-    neon_skills = deepcopy(core_config.get("skills", {}))
-    neon_skills["directory"] = core_config["dirVars"].get("skillsDir")
-    skills_config = {**neon_skills, **mycroft_config.get("skills", {})}
+    core_config, mycroft_config = _get_neon_layers().layers
+    neon_skills = {"directory": core_config["dirVars"].get("skillsDir")}
     # neon_skills["neon_token"]  # TODO: GetPrivateKeys
-    return skills_config
+    return LayeredConfig(mycroft_config.get("skills"), neon_skills, core_config.get("skills"), name="skills").freeze()
 
 
+@_cached_config
 def get_neon_client_config() -> dict:
-    core_config = get_neon_local_config()
+    core_config = get_neon_local_config.snapshot()
     server_addr = core_config.get("remoteVars", {}).get("remoteHost", "167.172.112.7")
     if server_addr == "64.34.186.92":
         LOG.warning(f"Depreciated call to host: {server_addr}")
         server_addr = "167.172.112.7"
-    return {"server_addr": server_addr,
-            "devVars": core_config["devVars"],
-            "remoteVars": core_config["remoteVars"]}
+    return _freeze({"server_addr": server_addr,
+                    "devVars": core_config["devVars"],
+                    "remoteVars": core_config["remoteVars"]})
+
+
+_CONFIG_SCHEMA_KEY = "schema_version"
+_CONFIG_SCHEMA_VERSION = 0
+_CONFIG_MIGRATIONS = dict()
+
+
+def _config_migration(version: int):
+    """
+    Decorator to register a configuration migration. Migrations are called with (user_config, local_config) in order of
+    version when either configuration file records an older schema version.
+    Args:
+        version: schema version this migration updates configuration to
+    """
+    def wrapper(func):
+        global _CONFIG_SCHEMA_VERSION
+        if version in _CONFIG_MIGRATIONS:
+            raise ValueError(f"Config migration {version} already registered")
+        _CONFIG_MIGRATIONS[version] = func
+        _CONFIG_SCHEMA_VERSION = max(_CONFIG_SCHEMA_VERSION, version)
+        return func
+    return wrapper
+
+
+def _get_schema_version(config: NGIConfig) -> int:
+    """
+    Get the schema version recorded in a configuration file
+    Args:
+        config: configuration to check
+    Returns:
+        int schema version (0 if not recorded)
+    """
+    return config.get(_CONFIG_SCHEMA_KEY) or 0
+
+
+def _migrate_configs(user_config: NGIConfig, local_config: NGIConfig):
+    """
+    Applies any migrations newer than the schema version of either configuration and records the current schema version
+    in both configurations
+    Args:
+        user_config: user configuration object
+        local_config: local configuration object
+    """
+    applied = min(_get_schema_version(user_config), _get_schema_version(local_config))
+    for version in sorted(v for v in _CONFIG_MIGRATIONS if v > applied):
+        LOG.info(f"Applying config migration {version}: {_CONFIG_MIGRATIONS[version].__name__}")
+        _CONFIG_MIGRATIONS[version](user_config, local_config)
+    for config in (user_config, local_config):
+        if _get_schema_version(config) != _CONFIG_SCHEMA_VERSION:
+            config.update_yaml_file(_CONFIG_SCHEMA_KEY, value=_CONFIG_SCHEMA_VERSION)
 
 
+@_config_migration(1)
 def _move_config_sections(user_config, local_config):
     """
-    Temporary method to handle one-time migration of user_config params to local_config
+    Migration of user_config params to local_config
     Args:
         user_config (NGIConfig): user configuration object
         local_config (NGIConfig): local configuration object
@@ -680,6 +2804,41 @@ def _safe_mycroft_config() -> dict:
     return mycroft
 
 
+def _get_mycroft_snapshot() -> FrozenDict:
+    """
+    Get a read-only copy of the Mycroft configuration that is only reloaded when a mycroft.conf file changes
+    Returns:
+        FrozenDict mycroft configuration
+    """
+    signature = tuple(_get_file_signature(f) for f in _get_mycroft_config_files())
+    if _MYCROFT_SNAPSHOT.get("signature") != signature or "snapshot" not in _MYCROFT_SNAPSHOT:
+        _MYCROFT_SNAPSHOT["snapshot"] = _freeze(_safe_mycroft_config(), _MYCROFT_SNAPSHOT.get("snapshot"))
+        _MYCROFT_SNAPSHOT["signature"] = signature
+    return _MYCROFT_SNAPSHOT["snapshot"]
+
+
+def _get_neon_layers(path: Optional[str] = None) -> LayeredConfig:
+    """
+    Get a layered view of the Neon local configuration over the Mycroft configuration. Section views are reused until
+    that section changes in either configuration.
+    Args:
+        path: optional path to yml configuration files
+    Returns:
+        LayeredConfig of local config and Mycroft config
+    """
+    local = get_neon_local_config.snapshot(path)
+    mycroft = _get_mycroft_snapshot()
+    last = _LAYERED_CONFIGS.get(path)
+    if last and last.layers[0] is local and last.layers[1] is mycroft:
+        return last
+    layered = LayeredConfig(local, mycroft, name="neon", log_missing=True)
+    if last:
+        layered.inherit_sections(last)
+    _LAYERED_CONFIGS[path] = layered
+    return layered
+
+
+@_cached_config
 def get_neon_user_config(path: Optional[str] = None) -> NGIConfig:
     """
     Returns a dict user configuration and handles any migration of configuration values to local config from user config
@@ -689,18 +2848,18 @@ def get_neon_user_config(path: Optional[str] = None) -> NGIConfig:
         NGIConfig
     """
     user_config = NGIConfig("ngi_user_info", path)
-    default_user_config = NGIConfig("default_user_conf",
-                                    os.path.join(os.path.dirname(__file__), "default_configurations"))
+    default_user_config = NGIConfig("default_user_conf", _DEFAULT_CONFIG_DIR)
     if len(user_config.content) == 0:
         LOG.info("Created Empty User Config!")
         user_config.populate(default_user_config.content)
-    local_config = NGIConfig("ngi_local_conf", path)
-    _move_config_sections(user_config, local_config)
+    if _get_schema_version(user_config) < _CONFIG_SCHEMA_VERSION:
+        _migrate_configs(user_config, NGIConfig("ngi_local_conf", path))
     user_config.make_equal_by_keys(default_user_config.content)
     LOG.info(f"Loaded user config from {user_config.file_path}")
     return user_config
 
 
+@_cached_config
 def get_neon_local_config(path: Optional[str] = None):
     """
     Returns a dict local configuration and handles any
@@ -711,17 +2870,16 @@ def get_neon_local_config(path: Optional[str] = None):
         dict of local configuration
     """
     local_config = NGIConfig("ngi_local_conf", path)
-    default_local_config = NGIConfig("default_core_conf",
-                                     os.path.join(os.path.dirname(__file__), "default_configurations"))
+    default_local_config = NGIConfig("default_core_conf", _DEFAULT_CONFIG_DIR)
     if len(local_config.content) == 0:
         LOG.info(f"Created Empty Local Config at {local_config.path}")
         local_config.populate(default_local_config.content)
         # TODO: Update from Mycroft config DM
-    user_config = NGIConfig("ngi_user_info", path)
-    _move_config_sections(user_config, local_config)
+    if _get_schema_version(local_config) < _CONFIG_SCHEMA_VERSION:
+        _migrate_configs(NGIConfig("ngi_user_info", path), local_config)
     local_config.make_equal_by_keys(default_local_config.content)
     LOG.info(f"Loaded local config from {local_config.file_path}")
-    return dict(local_config.content)
+    return local_config.snapshot
 
 
 def get_neon_device_type() -> str:
@@ -730,9 +2888,7 @@ def get_neon_device_type() -> str:
     Returns:
         str device type
     """
-    import platform
-    import importlib.util
-    local_config = get_neon_local_config()
+    local_config = get_neon_local_config.snapshot()
     config_dev = local_config["devVars"].get("devType", "")
     if "pi" in config_dev:
         return "pi"
@@ -740,6 +2896,18 @@ def get_neon_device_type() -> str:
         return "server"
     if config_dev != "generic":
         return config_dev
+    return _get_environment_device_type()
+
+
+@_cached_probe
+def _get_environment_device_type() -> str:
+    """
+    Determines device type from the platform and installed packages
+    Returns:
+        str device type
+    """
+    import platform
+    import importlib.util
     if "arm" in platform.machine():
         return "pi"
     if importlib.util.find_spec("neon-core-client"):
@@ -749,6 +2917,7 @@ def get_neon_device_type() -> str:
     return "desktop"
 
 
+@_cached_probe
 def is_neon_core() -> bool:
     """
     Checks for neon-specific packages to determine if this is a Neon Core or a Mycroft Core
@@ -765,17 +2934,17 @@ def is_neon_core() -> bool:
     return False
 
 
+@_cached_config
 def get_mycroft_compatible_config(mycroft_only=False):
-    # TODO: This is kinda slow, should probably be depreciated DM
     default_config = _safe_mycroft_config()
     if mycroft_only or not is_neon_core():
-        return default_config
-    speech = get_neon_speech_config()
+        return _freeze(default_config)
+    speech = get_neon_speech_config.snapshot()
     user = get_neon_user_config()
-    local = get_neon_local_config()
+    local = get_neon_local_config.snapshot()
 
     default_config["lang"] = "en-us"
-    default_config["language"] = get_neon_lang_config()
+    default_config["language"] = get_neon_lang_config.snapshot()
     default_config["keys"] = {}  # TODO: Get keys DM
     # default_config["text_parsers"]  TODO
     default_config["audio_parsers"] = speech["audio_parsers"]
@@ -784,12 +2953,12 @@ def get_mycroft_compatible_config(mycroft_only=False):
     default_config["date_format"] = user["units"]["date"]
     default_config["opt_in"] = local["prefFlags"]["metrics"]
     default_config["confirm_listening"] = local["interface"]["confirm_listening"]
-    default_config["sounds"] = {**default_config.get("sounds", {}), **local.get("sounds", {})}
+    default_config["sounds"] = _get_neon_layers().section("sounds").freeze()
     default_config["data_dir"] = local["dirVars"]["rootDir"]
-    default_config["skills"] = get_neon_skills_config()
-    default_config["server"] = get_neon_api_config()
-    default_config["websocket"] = get_neon_bus_config()
-    default_config["gui_websocket"] = {**default_config.get("gui_websocket", {}), **local["gui"]}
+    default_config["skills"] = get_neon_skills_config.snapshot()
+    default_config["server"] = get_neon_api_config.snapshot()
+    default_config["websocket"] = get_neon_bus_config.snapshot()
+    default_config["gui_websocket"] = _get_neon_layers().section("gui", "gui_websocket").freeze()
     default_config["listener"] = speech["listener"]
     # default_config["precise"]
     default_config["hotwords"] = speech["hotwords"]
@@ -797,7 +2966,64 @@ def get_mycroft_compatible_config(mycroft_only=False):
     default_config["session"] = local["session"]
     default_config["stt"] = speech["stt"]
     default_config["tts"] = local["tts"]
-    default_config["Audio"] = get_neon_audio_config()
+    default_config["Audio"] = get_neon_audio_config.snapshot()
     # default_config["Display"]
 
-    return default_config
+    return _freeze(default_config)
+
+
+def warm_config_cache(path: Optional[str] = None, freeze_gc: bool = False) -> dict:
+    """
+    Loads all Neon and Mycroft configurations and builds every derived configuration. Call this in a parent process
+    before forking skill processes so children use the already parsed configurations instead of loading them again.
+    Args:
+        path: optional path to yml configuration files. Derived configurations are always built from the default
+            configuration directory, so only the local and user configurations are loaded from another path.
+        freeze_gc: if True, move all tracked objects to the permanent generation with gc.freeze() so garbage
+            collection in child processes doesn't copy memory shared with the parent. Objects frozen this way are
+            never collected, so only use this immediately before forking.
+    Returns:
+        dict of configuration name to seconds taken to load it
+    """
+    timings = dict()
+    loaders = (("config_dir", get_config_dir),
+               ("neon_core", is_neon_core),
+               ("local", lambda: get_neon_local_config.snapshot(path)),
+               ("user", lambda: get_neon_user_config(path)),
+               ("mycroft", _get_mycroft_snapshot))
+    derived = (("lang", get_neon_lang_config.snapshot),
+               ("cli", get_neon_cli_config.snapshot),
+               ("speech", get_neon_speech_config.snapshot),
+               ("bus", get_neon_bus_config.snapshot),
+               ("audio", get_neon_audio_config.snapshot),
+               ("api", get_neon_api_config.snapshot),
+               ("skills", get_neon_skills_config.snapshot),
+               ("client", get_neon_client_config.snapshot),
+               ("device_type", get_neon_device_type),
+               ("mycroft_compatible", get_mycroft_compatible_config.snapshot))
+    if path is None:
+        loaders += derived
+    for _ in range(2):
+        signature = _get_config_cache_signature(path)
+        for name, loader in loaders:
+            start = time.monotonic()
+            try:
+                loader()
+            except Exception as e:
+                LOG.error(f"Failed to load {name} config: {e}")
+            timings.setdefault(name, time.monotonic() - start)
+        # Loading may migrate and write configuration; reload anything built before those changes
+        if _get_config_cache_signature(path) == signature:
+            break
+    plain_content = dict()
+    for config in list(NGIConfig._instances):
+        if isinstance(config._content, CommentedMap):
+            # Round-trip types carry comment and formatting data that children don't need to read. Instances sharing
+            # content keep sharing the converted content.
+            if id(config._content) not in plain_content:
+                plain_content[id(config._content)] = _to_plain_dict(config._content)
+            config._content = plain_content[id(config._content)]
+    if freeze_gc and hasattr(gc, "freeze"):
+        gc.collect()
+        gc.freeze()
+    return timings
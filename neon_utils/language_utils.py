@@ -17,10 +17,33 @@
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
+import multiprocessing
 import os
+import re
+import sys
+import threading
+import time
 import boto3
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, List
 from neon_utils.logger import LOG
-from neon_utils.configuration_utils import get_neon_lang_config, NGIConfig, get_neon_tts_config
+from neon_utils.configuration_utils import get_neon_lang_config, NGIConfig, get_neon_tts_config, \
+    get_neon_local_config
+
+# ProcessPoolExecutor accepts mp_context from Python 3.7; forking a process with running threads can deadlock
+_SPAWN_POOL_SUPPORTED = sys.version_info >= (3, 7)
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def get_language_dir(base_path, lang="en-us"):
@@ -48,7 +71,92 @@ def get_language_dir(base_path, lang="en-us"):
     return os.path.join(base_path, lang)
 
 
+def normalize_text(text: str) -> str:
+    """
+    Normalizes whitespace in text used as a cache key
+    Args:
+        text: string to normalize
+    Returns:
+        text with leading and trailing whitespace removed and other whitespace collapsed to single spaces
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+_boto3_clients = dict()  # (service, aws_access_key_id, aws_secret_access_key, region): client
+_boto3_lock = threading.Lock()
+
+
+def get_boto3_client(service: str, keys: dict):
+    """
+    Get a boto3 client shared by every caller in this process using the same credentials. boto3 clients are
+    thread-safe, so only one session and client is built per service and set of credentials.
+    Args:
+        service: AWS service name (i.e. 'translate', 'comprehend')
+        keys: dict containing `aws_access_key_id`, `aws_secret_access_key` and `region`
+    Returns:
+        boto3 client for the requested service
+    """
+    key = (service, keys["aws_access_key_id"], keys["aws_secret_access_key"], keys["region"])
+    client = _boto3_clients.get(key)
+    if client is None:
+        with _boto3_lock:
+            client = _boto3_clients.get(key)
+            if client is None:
+                client = boto3.Session(aws_access_key_id=keys["aws_access_key_id"],
+                                       aws_secret_access_key=keys["aws_secret_access_key"],
+                                       region_name=keys["region"]).client(service)
+                _boto3_clients[key] = client
+    return client
+
+
+class DetectionResult:
+    """
+    Columnar language detection results for a batch of texts. `langs` holds the top language of each text and
+    `probs` holds one row per text with one column per language in `languages`; languages a backend did not return
+    for a text have probability 0.
+    """
+    def __init__(self, probs: List[dict], default_language: str):
+        """
+        Args:
+            probs: detect_probs result for each text
+            default_language: language reported for texts with no detection result
+        """
+        self.languages = sorted({lang for text_probs in probs for lang in text_probs})
+        columns = {lang: idx for idx, lang in enumerate(self.languages)}
+        self.langs = []
+        self.probs = []
+        for text_probs in probs:
+            row = [0.0] * len(self.languages)
+            for lang, prob in text_probs.items():
+                row[columns[lang]] = prob
+            self.probs.append(row)
+            self.langs.append(max(text_probs, key=text_probs.get) if text_probs else default_language)
+
+    def __len__(self):
+        return len(self.langs)
+
+    def to_numpy(self) -> tuple:
+        """
+        Returns: `langs` as an array of str and `probs` as a float matrix of shape (texts, languages)
+        """
+        if np is None:
+            raise ImportError("Run pip install numpy")
+        return np.array(self.langs, dtype=str), np.array(self.probs, dtype=float).reshape(len(self.langs),
+                                                                                           len(self.languages))
+
+
+def _detect_probs_chunk(module: str, texts: List[str]) -> List[dict]:
+    """
+    Process pool worker for LanguageDetector.detect_probs_batch
+    """
+    detector = DetectorFactory.get_shared(module)
+    return [detector.detect_probs(text) for text in texts]
+
+
 class LanguageDetector:
+    # Local detectors that are CPU-bound and can be rebuilt in worker processes by DetectorFactory
+    batch_processes = False
+
     def __init__(self):
         self.config = get_neon_lang_config()
         self.default_language = self.config["user"].split("-")[0]
@@ -63,8 +171,65 @@ class LanguageDetector:
     def detect_probs(self, text):
         return {self.detect(text): 1}
 
+    def detect_batch(self, texts: List[str], processes: int = 1, chunk_size: int = 256) -> List[str]:
+        """
+        Detects the language of each string in a list
+        Args:
+            texts: strings to detect the language of
+            processes: max worker processes for local detectors, 1 to detect in this process. Workers are spawned
+                rather than forked, so they don't inherit locks held by this process's threads; on Python 3.6, which
+                can't spawn pool workers, texts are always detected in this process.
+            chunk_size: number of strings sent to a worker process at a time
+        Returns:
+            detected language of each string, in the same order as `texts`
+        """
+        return self.detect_probs_batch(texts, processes, chunk_size).langs
+
+    def detect_probs_batch(self, texts: List[str], processes: int = 1,
+                           chunk_size: int = 256) -> DetectionResult:
+        """
+        Gets language probabilities for each string in a list. Local detectors split large batches into chunks run on
+        a process pool; remote detectors use their batch endpoints where available.
+        Args:
+            texts: strings to detect the language of
+            processes: max worker processes for local detectors, 1 to detect in this process. Workers are spawned
+                rather than forked, so they don't inherit locks held by this process's threads; on Python 3.6, which
+                can't spawn pool workers, texts are always detected in this process.
+            chunk_size: number of strings sent to a worker process at a time
+        Returns:
+            DetectionResult with a row for each string, in the same order as `texts`
+        """
+        return DetectionResult(self._detect_probs_list(texts, processes, chunk_size), self.default_language)
+
+    def _detect_probs_list(self, texts: List[str], processes: int = 1, chunk_size: int = 256) -> List[dict]:
+        module = self._get_module_name()
+        processes = min(processes or 1, -(-len(texts) // chunk_size))
+        if not self.batch_processes or not module or processes < 2 or not _SPAWN_POOL_SUPPORTED:
+            return self._detect_probs_many(texts)
+        chunks = [texts[idx:idx + chunk_size] for idx in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = executor.map(_detect_probs_chunk, [module] * len(chunks), chunks)
+            return [probs for chunk in results for probs in chunk]
+
+    def _detect_probs_many(self, texts: List[str]) -> List[dict]:
+        """
+        Gets language probabilities for a list of strings in this process; backends with a batch endpoint override this
+        """
+        return [self.detect_probs(text) for text in texts]
+
+    def _get_module_name(self) -> Optional[str]:
+        for module, clazz in DetectorFactory.CLASSES.items():
+            if type(self) is clazz:
+                return module
+        return None
+
 
 class LanguageTranslator:
+    # Texts are joined with `batch_delimiter` into requests of up to `max_request_chars`; None disables packing
+    batch_delimiter = "\n"
+    max_request_chars = 5000
+    max_batch_workers = 4
+
     def __init__(self):
         self.config = get_neon_lang_config()
         self.boost = self.config["boost"]
@@ -74,6 +239,72 @@ class LanguageTranslator:
     def translate(self, text, target=None, source=None):
         return text
 
+    def translate_batch(self, texts: List[str], target: Optional[str] = None,
+                        source: Optional[str] = None) -> List[str]:
+        """
+        Translates a list of strings. Duplicate strings are only translated once and unique strings are packed into as
+        few backend requests as `max_request_chars` allows; requests run concurrently on up to `max_batch_workers`
+        threads.
+        Args:
+            texts: strings to translate
+            target: language to translate to
+            source: language of the strings, defaults to the backend's default
+        Returns:
+            translations in the same order as `texts`, with leading and trailing whitespace removed
+        """
+        if not texts:
+            return []
+        unique = list(dict.fromkeys(texts))
+        requests = self._pack_requests(unique)
+        if len(requests) == 1:
+            translated = [self._translate_request(requests[0], target, source)]
+        else:
+            with ThreadPoolExecutor(min(self.max_batch_workers, len(requests))) as executor:
+                translated = list(executor.map(lambda request: self._translate_request(request, target, source),
+                                               requests))
+        translations = dict()
+        for request, results in zip(requests, translated):
+            translations.update(zip(request, results))
+        return [translations[text] for text in texts]
+
+    def _pack_requests(self, texts: List[str]) -> List[List[str]]:
+        """
+        Groups texts into backend requests; texts containing the delimiter are sent on their own
+        """
+        requests = []
+        current, length = [], 0
+        for text in texts:
+            if not self.batch_delimiter or self.batch_delimiter in text:
+                requests.append([text])
+                continue
+            if current and length + len(self.batch_delimiter) + len(text) > self.max_request_chars:
+                requests.append(current)
+                current, length = [], 0
+            length += len(text) + (len(self.batch_delimiter) if current else 0)
+            current.append(text)
+        if current:
+            requests.append(current)
+        return requests
+
+    def _translate_request(self, texts: List[str], target: Optional[str], source: Optional[str]) -> List[str]:
+        if len(texts) == 1:
+            results = [self._translate_one(texts[0], target, source)]
+        else:
+            translated = self._translate_one(self.batch_delimiter.join(texts), target, source)
+            results = translated.split(self.batch_delimiter) if translated else []
+            if len(results) != len(texts):
+                LOG.warning(f"Packed translation returned {len(results)} of {len(texts)} strings, "
+                            f"translating separately")
+                results = [self._translate_one(text, target, source) for text in texts]
+        # Backends may add whitespace around the delimiter; strip every result so it doesn't depend on packing
+        return [result.strip() if isinstance(result, str) else result for result in results]
+
+    def _translate_one(self, text: str, target: Optional[str], source: Optional[str]) -> str:
+        if source:
+            return self.translate(text, target, source)
+        # Let the backend apply its own default source language
+        return self.translate(text, target)
+
 
 class GoogleDetector(LanguageDetector):
     def __init__(self):
@@ -90,8 +321,15 @@ class GoogleDetector(LanguageDetector):
         lang = self._detect(text, True)
         return {lang["lang_code"]: lang["conf"]}
 
+    def _detect_probs_many(self, texts):
+        # No batch endpoint; requests are I/O bound so run them concurrently
+        with ThreadPoolExecutor(4) as executor:
+            return list(executor.map(self.detect_probs, texts))
+
 
 class FastLangDetector(LanguageDetector):
+    batch_processes = True
+
     def __init__(self):
         super().__init__()
         try:
@@ -109,6 +347,8 @@ class FastLangDetector(LanguageDetector):
 
 
 class LangDetectDetector(LanguageDetector):
+    batch_processes = True
+
     def __init__(self):
         super().__init__()
         try:
@@ -148,9 +388,7 @@ class AmazonTranslator(LanguageTranslator):
         # TODO: Replace private key function DM
         # self.keys = get_private_keys()["amazon"]
         self.keys = get_neon_tts_config()["amazon"]
-        self.client = boto3.Session(aws_access_key_id=self.keys["aws_access_key_id"],
-                                    aws_secret_access_key=self.keys["aws_secret_access_key"],
-                                    region_name=self.keys["region"]).client('translate')
+        self.client = get_boto3_client('translate', self.keys)
 
     def translate(self, text, target=None, source="auto"):
         target = target or self.internal_language
@@ -169,10 +407,7 @@ class AmazonDetector(LanguageDetector):
         # TODO: Replace private key funciton DM
         # self.keys = get_private_keys()["amazon"]
         self.keys = get_neon_tts_config()["amazon"]
-
-        self.client = boto3.Session(aws_access_key_id=self.keys["aws_access_key_id"],
-                                    aws_secret_access_key=self.keys["aws_secret_access_key"],
-                                    region_name=self.keys["region"]).client('comprehend')
+        self.client = get_boto3_client('comprehend', self.keys)
 
     def detect(self, text):
         response = self.client.detect_dominant_language(
@@ -189,8 +424,23 @@ class AmazonDetector(LanguageDetector):
             langs[lang["LanguageCode"]] = lang["Score"]
         return langs
 
+    def _detect_probs_many(self, texts):
+        # BatchDetectDominantLanguage accepts up to 25 documents per request
+        results = [dict() for _ in texts]
+        for start in range(0, len(texts), 25):
+            response = self.client.batch_detect_dominant_language(TextList=texts[start:start + 25])
+            for result in response["ResultList"]:
+                results[start + result["Index"]] = {lang["LanguageCode"]: lang["Score"]
+                                                    for lang in result["Languages"]}
+            for error in response["ErrorList"]:
+                LOG.warning(f"Language detection failed for {texts[start + error['Index']]}: "
+                            f"{error.get('ErrorMessage')}")
+        return results
+
 
 class MyMemoryTranslator(LanguageTranslator):
+    batch_delimiter = None
+
     def __init__(self):
         super().__init__()
 
@@ -203,6 +453,433 @@ class MyMemoryTranslator(LanguageTranslator):
         return translated
 
 
+class CachingTranslator(LanguageTranslator):
+    """
+    Translation memory in front of another LanguageTranslator. Translations are kept in an in-memory LRU and, if a
+    cache file is given, in a sqlite database shared between processes, so repeated strings are only sent to the
+    backend once. Text is matched after normalizing whitespace. Expired translations and the oldest translations over
+    `max_entries` are removed from the database when it is opened and after every `prune_interval` stored translations.
+    """
+    prune_interval = 1000
+
+    def __init__(self, translator: LanguageTranslator, cache_file: Optional[str] = None, max_size: int = 4096,
+                 ttl: float = 30 * 24 * 3600, max_entries: int = 100000):
+        """
+        Args:
+            translator: LanguageTranslator to translate cache misses with
+            cache_file: path to a sqlite database to persist translations to, None to only cache in memory
+            max_size: max number of translations to keep in memory
+            ttl: seconds a translation may be used after it was received from the backend, 0 to never expire
+            max_entries: max number of translations to keep in the database, 0 for no limit
+        """
+        # Intentionally not calling LanguageTranslator.__init__; settings come from the wrapped translator
+        self.translator = translator
+        self.config = translator.config
+        self.boost = translator.boost
+        self.default_language = translator.default_language
+        self.internal_language = translator.internal_language
+        self.backend = type(translator).__name__
+        self.cache_file = cache_file
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stored_since_prune = 0
+        self._memory = OrderedDict()  # key: (translation, created)
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "backend_seconds": 0.0,
+                       "seconds_saved": 0.0}
+        self._db = None
+        if cache_file:
+            if sqlite3:
+                self._db = self._open_database(cache_file)
+                self.prune()
+            else:
+                LOG.warning("sqlite3 is not available, translations will only be cached in memory")
+
+    @staticmethod
+    def _open_database(cache_file: str):
+        os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+        db = sqlite3.connect(cache_file, timeout=10, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS translations (backend TEXT, source TEXT, target TEXT, text TEXT, "
+                   "translation TEXT, created REAL, PRIMARY KEY (backend, source, target, text))")
+        db.execute("CREATE INDEX IF NOT EXISTS translations_created ON translations (created)")
+        return db
+
+    def prune(self) -> int:
+        """
+        Removes expired translations and, if there are more than `max_entries`, the oldest translations from the
+        persistent cache
+        Returns:
+            number of translations removed
+        """
+        with self._lock:
+            self._stored_since_prune = 0
+            if not self._db:
+                return 0
+            removed = 0
+            if self.ttl:
+                removed += self._db.execute("DELETE FROM translations WHERE created < ?",
+                                            (time.time() - self.ttl,)).rowcount
+            if self.max_entries:
+                removed += self._db.execute("DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations "
+                                            "ORDER BY created DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                                            (self.max_entries,)).rowcount
+            return removed
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalizes text so strings differing only in whitespace share a cache entry
+        Args:
+            text: string to normalize
+        Returns:
+            text with leading and trailing whitespace removed and other whitespace collapsed to single spaces
+        """
+        return normalize_text(text)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns: dict of `memory_hits`, `disk_hits`, `misses`, `hit_rate`, `seconds_saved` (estimated from the average
+            backend latency), `memory_bytes`, `memory_entries` and `disk_bytes`
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            stats["hit_rate"] = hits / (hits + stats["misses"]) if hits + stats["misses"] else 0.0
+            stats["memory_bytes"] = self._memory_bytes
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_bytes"] = sum(os.path.getsize(self.cache_file + suffix) for suffix in ("", "-wal")
+                                  if self._db and os.path.isfile(self.cache_file + suffix))
+        return stats
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and created + self.ttl < time.time()
+
+    def _remember(self, key: tuple, translation: str, created: float):
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old:
+                self._memory_bytes -= len(key[3]) + len(old[0])
+            self._memory[key] = (translation, created)
+            self._memory_bytes += len(key[3]) + len(translation)
+            while len(self._memory) > self.max_size:
+                old_key, (old_translation, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_key[3]) + len(old_translation)
+
+    def _get_cached(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and not self._expired(cached[1]):
+                self._memory.move_to_end(key)
+                self._record_hit("memory_hits")
+                return cached[0]
+            if not self._db:
+                return None
+            row = self._db.execute("SELECT translation, created FROM translations WHERE backend=? AND source=? AND "
+                                   "target=? AND text=?", key).fetchone()
+            if not row:
+                return None
+            if self._expired(row[1]):
+                self._db.execute("DELETE FROM translations WHERE backend=? AND source=? AND target=? AND text=?", key)
+                return None
+            self._remember(key, row[0], row[1])
+            self._record_hit("disk_hits")
+            return row[0]
+
+    def _record_hit(self, tier: str):
+        self._stats[tier] += 1
+        if self._stats["misses"]:
+            self._stats["seconds_saved"] += self._stats["backend_seconds"] / self._stats["misses"]
+
+    def translate(self, text, target=None, source=None):
+        target = target or self.internal_language
+        key = (self.backend, source or "", target, self.normalize(text))
+        translation = self._get_cached(key)
+        if translation is not None:
+            return translation
+        start = time.monotonic()
+        translation = self.translator._translate_one(text, target, source)
+        self._store({key: translation}, time.monotonic() - start)
+        return translation
+
+    def translate_batch(self, texts, target=None, source=None):
+        target = target or self.internal_language
+        keys = [(self.backend, source or "", target, self.normalize(text)) for text in texts]
+        translations = dict()
+        misses = dict()  # key: text sent to the backend
+        for key, text in zip(keys, texts):
+            if key in translations or key in misses:
+                continue
+            translation = self._get_cached(key)
+            if translation is None:
+                misses[key] = text
+            else:
+                translations[key] = translation
+        if misses:
+            start = time.monotonic()
+            translated = self.translator.translate_batch(list(misses.values()), target, source)
+            translated = dict(zip(misses.keys(), translated))
+            self._store(translated, time.monotonic() - start)
+            translations.update(translated)
+        return [translations[key] for key in keys]
+
+    def _store(self, translations: dict, backend_seconds: float):
+        created = time.time()
+        with self._lock:
+            self._stats["misses"] += len(translations)
+            self._stats["backend_seconds"] += backend_seconds
+            translations = [(key, translation) for key, translation in translations.items()
+                            if translation is not None]
+            for key, translation in translations:
+                self._remember(key, translation, created)
+            if self._db and translations:
+                self._db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                                     [(*key, translation, created) for key, translation in translations])
+                self._stored_since_prune += len(translations)
+                if self._stored_since_prune >= self.prune_interval:
+                    self.prune()
+
+    def warm(self, file_path: str, target: Optional[str] = None, source: Optional[str] = None) -> int:
+        """
+        Translates known strings so they are cached before they are needed. Strings that are already cached are not
+        sent to the backend.
+        Args:
+            file_path: text file with one string per line; blank lines and lines starting with '#' are skipped
+            target: language to translate to, defaults to the internal language
+            source: language of the strings, defaults to the backend's default
+        Returns:
+            number of strings that were sent to the backend
+        """
+        misses = self._stats["misses"]
+        with open(file_path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        try:
+            self.translate_batch([line for line in lines if line and not line.startswith("#")], target, source)
+        except Exception as e:
+            LOG.error(f"Failed to warm translations from {file_path}: {e}")
+        return self._stats["misses"] - misses
+
+    def clear(self):
+        """
+        Removes all cached translations
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db:
+                self._db.execute("DELETE FROM translations")
+
+    def close(self):
+        """
+        Closes the persistent cache; translations are still cached in memory
+        """
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+
+class CascadeDetector(LanguageDetector):
+    """
+    Language detector that runs a list of detectors in order, cheapest first. Text is only passed to the next detector
+    when the current top result is below `threshold` confidence or the text is shorter than `min_length`; the last
+    detector's result is always accepted. Results at or above `threshold` are memoized per normalized text.
+    """
+    def __init__(self, stages: Optional[list] = None, threshold: float = 0.5, min_length: int = 10,
+                 cache_size: int = 4096):
+        """
+        Args:
+            stages: detectors or DetectorFactory module names to run in order; named detectors are shared and built
+                on first use
+            threshold: minimum top-1 probability to accept a result without escalating
+            min_length: minimum normalized text length to accept a result without escalating
+            cache_size: max number of memoized results
+        """
+        super().__init__()
+        self.stages = list(stages or ["fastlang", "detect", "google"])
+        self.threshold = threshold
+        self.min_length = min_length
+        self.cache_size = cache_size
+        self._detectors = dict()  # stage index: LanguageDetector
+        self._memo = OrderedDict()  # normalized text: probabilities
+        self._lock = threading.Lock()
+        self.stage_names = []
+        for idx, stage in enumerate(self.stages):
+            name = stage if isinstance(stage, str) else type(stage).__name__
+            self.stage_names.append(name if name not in self.stage_names else f"{name}_{idx}")
+        self._stats = {"detections": 0, "memo_hits": 0,
+                       "stages": {name: {"runs": 0, "accepted": 0, "errors": 0} for name in self.stage_names}}
+
+    def _get_detector(self, idx: int) -> LanguageDetector:
+        detector = self._detectors.get(idx)
+        if detector is None:
+            stage = self.stages[idx]
+            detector = DetectorFactory.get_shared(stage) if isinstance(stage, str) else stage
+            self._detectors[idx] = detector
+        return detector
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns: dict of `detections`, `memo_hits`, `memo_hit_ratio` and per-stage (keyed by `stage_names`) `runs`,
+            `accepted`, `errors`, `hit_ratio` (accepted / runs) and `resolved_ratio` (accepted / detections not
+            answered from the memo)
+        """
+        with self._lock:
+            stats = {"detections": self._stats["detections"], "memo_hits": self._stats["memo_hits"],
+                     "stages": {name: dict(stage) for name, stage in self._stats["stages"].items()}}
+        detections = stats["detections"]
+        resolved = detections - stats["memo_hits"]
+        stats["memo_hit_ratio"] = stats["memo_hits"] / detections if detections else 0.0
+        for stage in stats["stages"].values():
+            stage["hit_ratio"] = stage["accepted"] / stage["runs"] if stage["runs"] else 0.0
+            stage["resolved_ratio"] = stage["accepted"] / resolved if resolved else 0.0
+        return stats
+
+    def detect(self, text):
+        probs = self.detect_probs(text)
+        return max(probs, key=probs.get) if probs else self.default_language
+
+    def detect_probs(self, text):
+        key = normalize_text(text)
+        with self._lock:
+            probs = self._memo.get(key)
+            if probs is not None:
+                self._memo.move_to_end(key)
+                self._stats["detections"] += 1
+                self._stats["memo_hits"] += 1
+                return dict(probs)
+        return self._detect_probs_list([text], 1)[0]
+
+    def _detect_probs_list(self, texts, processes=1, chunk_size=256):
+        """
+        Runs each stage on the batch of texts not yet answered by the memo or an earlier stage
+        """
+        keys = [normalize_text(text) for text in texts]
+        results = dict()  # normalized text: probabilities
+        with self._lock:
+            for key in keys:
+                probs = self._memo.get(key)
+                if probs is not None:
+                    self._memo.move_to_end(key)
+                    results[key] = probs
+        pending = [key for key in dict.fromkeys(keys) if key not in results]
+        with self._lock:
+            self._stats["detections"] += len(keys)
+            self._stats["memo_hits"] += len(keys) - len(pending)
+
+        best = {key: (dict(), None) for key in pending}  # normalized text: (probabilities, stage name)
+        accepted = {name: 0 for name in self.stage_names}
+        confident = []  # normalized texts with a result above the threshold; only these are memoized
+        for idx, name in enumerate(self.stage_names):
+            if not pending:
+                break
+            stage_stats = self._stats["stages"][name]
+            with self._lock:
+                stage_stats["runs"] += len(pending)
+            try:
+                stage_probs = self._get_detector(idx)._detect_probs_list(pending, processes, chunk_size)
+            except Exception as e:
+                with self._lock:
+                    stage_stats["errors"] += len(pending)
+                LOG.error(f"{name} language detection failed: {e}")
+                continue
+            escalate = []
+            for key, probs in zip(pending, stage_probs):
+                if not probs:
+                    escalate.append(key)
+                    continue
+                top = max(probs.values())
+                if top >= self.threshold and len(key) >= self.min_length or idx == len(self.stages) - 1:
+                    results[key] = probs
+                    accepted[name] += 1
+                    if top >= self.threshold:
+                        confident.append(key)
+                    continue
+                if not best[key][0] or top > max(best[key][0].values()):
+                    best[key] = (probs, name)
+                escalate.append(key)
+            pending = escalate
+        # Every stage failed, had no result or was not confident enough; use the best available result
+        for key in pending:
+            results[key], name = best[key]
+            if name:
+                accepted[name] += 1
+
+        with self._lock:
+            for name, count in accepted.items():
+                self._stats["stages"][name]["accepted"] += count
+            # Failed, empty and low confidence results are detected again in case a stage does better next time
+            for key in confident:
+                self._memo[key] = results[key]
+            while len(self._memo) > self.cache_size:
+                self._memo.popitem(last=False)
+        return [dict(results[key]) for key in keys]
+
+
+_shared_backends = dict()  # (kind, module, credentials, ...): LanguageDetector or LanguageTranslator
+_shared_backends_lock = threading.Lock()
+_shared_backends_generation = 0  # incremented each time shared backends are cleared
+
+
+def _get_credentials_key(module: str) -> Optional[tuple]:
+    """
+    Get the credentials a backend module is built with so backends using different credentials aren't shared
+    """
+    if module == "amazon":
+        keys = get_neon_tts_config()["amazon"]
+        return keys.get("aws_access_key_id", ""), keys.get("aws_secret_access_key", ""), keys.get("region")
+    return None
+
+
+def _get_shared_backend(key: tuple, create):
+    backend = _shared_backends.get(key)
+    if backend is None:
+        with _shared_backends_lock:
+            backend = _shared_backends.get(key)
+            if backend is None:
+                backend = create()
+                _shared_backends[key] = backend
+    return backend
+
+
+def get_shared_backends_generation() -> int:
+    """
+    Get the current generation of shared detectors and translators. Callers that keep a shared backend should get it
+    again when the generation changes.
+    Returns:
+        number of times shared backends have been cleared
+    """
+    return _shared_backends_generation
+
+
+def clear_shared_language_backends():
+    """
+    Removes all shared detectors and translators so the next request builds new ones (i.e. after credentials change).
+    Removed backends are not closed since callers may still be using them; a CachingTranslator's database is closed when
+    it is no longer referenced.
+    """
+    global _shared_backends_generation
+    with _shared_backends_lock:
+        _shared_backends.clear()
+        _shared_backends_generation += 1
+    with _boto3_lock:
+        _boto3_clients.clear()
+
+
+def get_translation_cache_file() -> str:
+    """
+    Get the default location of the persistent translation cache
+    Returns:
+        path to the translation cache database in the configured cache directory
+    """
+    cache_dir = get_neon_local_config().get("dirVars", {}).get("cacheDir") or "~/.local/share/neon/cache"
+    return os.path.join(os.path.expanduser(cache_dir), "translations.sqlite")
+
+
 class TranslatorFactory:
     CLASSES = {
         "google": GoogleTranslator,
@@ -211,7 +888,42 @@ class TranslatorFactory:
     }
 
     @staticmethod
-    def create(module=None):
+    def create(module=None, cache: bool = False):
+        """
+        Creates a translator
+        Args:
+            module: translation module to use
+            cache: if True, wrap the translator in a CachingTranslator. Translations are only persisted to the
+                configured cache directory if `stt.translation_cache.persist` is enabled in the local configuration.
+        Returns:
+            LanguageTranslator object
+        """
+        translator = TranslatorFactory._create(TranslatorFactory._get_module(module))
+        if cache:
+            cache_config = get_neon_lang_config().get("translation_cache") or dict()
+            return CachingTranslator(translator,
+                                     get_translation_cache_file() if cache_config.get("persist") else None,
+                                     ttl=cache_config.get("max_age_days", 30) * 24 * 3600,
+                                     max_entries=cache_config.get("max_entries", 100000))
+        return translator
+
+    @staticmethod
+    def get_shared(module=None, cache: bool = False):
+        """
+        Get a translator shared by every caller in this process requesting the same module, credentials and caching.
+        The translator is built on the first request.
+        Args:
+            module: translation module to use
+            cache: if True, get a CachingTranslator (see `create`)
+        Returns:
+            LanguageTranslator object
+        """
+        module = TranslatorFactory._get_module(module)
+        return _get_shared_backend(("translator", module, _get_credentials_key(module), cache),
+                                   lambda: TranslatorFactory.create(module, cache))
+
+    @staticmethod
+    def _get_module(module=None):
         module = module or "amazon"
         config = get_neon_lang_config()
         module = module or config.get("translation_module", "google")
@@ -220,6 +932,10 @@ class TranslatorFactory:
                 and get_neon_tts_config()["amazon"].get("aws_access_key_id", "") == "":
             LOG.warning("Amazon credentials not available")
             module = "google"
+        return module
+
+    @staticmethod
+    def _create(module):
         try:
             clazz = TranslatorFactory.CLASSES.get(module)
             return clazz()
@@ -240,7 +956,8 @@ class DetectorFactory:
         "amazon": AmazonDetector,
         "google": GoogleDetector,
         "fastlang": FastLangDetector,
-        "detect": LangDetectDetector
+        "detect": LangDetectDetector,
+        "cascade": CascadeDetector
     }
 
     @staticmethod
@@ -261,3 +978,17 @@ class DetectorFactory:
                 return FastLangDetector()
             else:
                 raise
+
+    @staticmethod
+    def get_shared(module=None):
+        """
+        Get a language detector shared by every caller in this process requesting the same module and credentials.
+        The detector is built on the first request.
+        Args:
+            module: detection module to use
+        Returns:
+            LanguageDetector object
+        """
+        module = module or "fastlang"
+        return _get_shared_backend(("detector", module, _get_credentials_key(module)),
+                                   lambda: DetectorFactory.create(module))
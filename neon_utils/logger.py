@@ -17,6 +17,25 @@
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
+import sys
+
 from ovos_utils.log import LOG
 
 LOG.name = "neon-utils"
+
+_DEPRECATION_SITES = set()
+
+
+def log_deprecation(message: str, depth: int = 1):
+    """
+    Logs a deprecation warning once for each place the deprecated code is called from
+    Args:
+        message: warning to log
+        depth: number of frames above the function calling this to report as the call site (1 for its caller)
+    """
+    frame = sys._getframe(depth + 1)
+    site = (frame.f_code.co_filename, frame.f_lineno, message)
+    if site in _DEPRECATION_SITES:
+        return
+    _DEPRECATION_SITES.add(site)
+    LOG.warning(f"{message} (called from {frame.f_code.co_filename}:{frame.f_lineno})")
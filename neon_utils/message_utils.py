@@ -16,9 +16,16 @@
 # Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
-from typing import Optional
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Optional, Mapping
 
 from mycroft_bus_client import Message
+from neon_utils.logger import LOG
+
+_MISSING = object()
 
 
 def request_from_mobile(message: Message) -> bool:
@@ -47,3 +54,303 @@ def get_message_user(message: Message) -> Optional[str]:
     if not hasattr(message, "context"):
         raise AttributeError(type(message))
     return message.context.get("username")
+
+
+class ProfileCache:
+    """
+    Bounded cache of user profiles for servers. Profiles are added from messages that include `nick_profiles` so later
+    messages for the same user only need to include the username and, optionally, a `profile_version`. The least
+    recently used profile is removed when the cache is full and profiles expire `ttl` seconds after they are added.
+    """
+    def __init__(self, max_size: int = 128, ttl: float = 300.0):
+        """
+        Args:
+            max_size: maximum number of profiles to keep
+            ttl: seconds a profile is kept after being added, 0 to keep profiles until removed or evicted
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "expired": 0, "removed": 0}
+        self._profiles = OrderedDict()  # nick: (profile, version, expiration)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, nick):
+        return nick in self._profiles
+
+    def get(self, nick: str, version=None) -> Optional[dict]:
+        """
+        Get a cached profile
+        Args:
+            nick: username to get the profile for
+            version: required profile version, None to accept any cached version
+        Returns:
+            cached profile, None if there is no current profile for nick
+        """
+        with self._lock:
+            cached = self._profiles.get(nick)
+            if cached:
+                profile, cached_version, expiration = cached
+                if expiration and expiration < time.monotonic():
+                    del self._profiles[nick]
+                    self.stats["expired"] += 1
+                elif version is None or version == cached_version:
+                    self._profiles.move_to_end(nick)
+                    self.stats["hits"] += 1
+                    return profile
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, nick: str, profile: dict, version=None):
+        """
+        Adds or replaces a cached profile
+        Args:
+            nick: username the profile belongs to
+            profile: user profile
+            version: version of profile, if known
+        """
+        with self._lock:
+            cached = self._profiles.get(nick)
+            if cached and cached[0] is profile and cached[1] == version:
+                # Same profile from another message; don't extend its expiration
+                self._profiles.move_to_end(nick)
+                return
+            self._profiles[nick] = (profile, version, time.monotonic() + self.ttl if self.ttl else None)
+            self._profiles.move_to_end(nick)
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def remove(self, nick: str):
+        """
+        Removes a profile from the cache
+        Args:
+            nick: username to remove
+        """
+        with self._lock:
+            if self._profiles.pop(nick, None):
+                self.stats["removed"] += 1
+
+    def clear(self):
+        """
+        Removes all profiles from the cache
+        """
+        with self._lock:
+            self._profiles.clear()
+
+
+class ProfileUpdateCoalescer:
+    """
+    Merges profile updates for the same user and sends them together. Updates are sent `window` seconds after the first
+    pending update for a user, or sooner if flushed, so several changes made while handling a request result in a single
+    update. One coalescer can be shared by all skills in a process.
+    """
+    def __init__(self, send: Optional[callable] = None, window: float = 0.5):
+        """
+        Args:
+            send: called with (nick, changes, message) to send merged changes for a user, unless `add` is passed another
+            window: max seconds to wait after an update before sending it
+        """
+        self.send = send
+        self.window = window
+        self.stats = {"requested": 0, "sent": 0, "saved": 0}
+        self._pending = dict()  # nick: [deadline, changes, message, send]
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = None
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Returns: number of users with updates waiting to be sent
+        """
+        return len(self._pending)
+
+    def add(self, nick: str, changes: dict, message: Optional[Message] = None, send: Optional[callable] = None):
+        """
+        Adds changes to the pending update for a user. Values replace pending values with the same key; dict values are
+        merged one level deep so changes to different skills' settings are kept.
+        Args:
+            nick: user to update
+            changes: dict of changed values
+            message: Message associated with the change; the most recent message is passed to `send`
+            send: callable to send the merged changes with instead of this coalescer's `send`; the most recent is used
+        """
+        with self._condition:
+            self.stats["requested"] += 1
+            pending = self._pending.get(nick)
+            if pending:
+                self.stats["saved"] += 1
+                for key, value in changes.items():
+                    if isinstance(value, dict) and isinstance(pending[1].get(key), dict):
+                        pending[1][key] = {**pending[1][key], **value}
+                    else:
+                        pending[1][key] = value
+                pending[2] = message or pending[2]
+                pending[3] = send or pending[3]
+                return
+            self._pending[nick] = [time.monotonic() + self.window, dict(changes), message, send]
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name="ProfileUpdateCoalescer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self, nick: Optional[str] = None):
+        """
+        Immediately sends pending updates
+        Args:
+            nick: user to send updates for, else send all pending updates
+        """
+        with self._condition:
+            if nick is None:
+                due = list(self._pending.items())
+                self._pending.clear()
+            elif nick in self._pending:
+                due = [(nick, self._pending.pop(nick))]
+            else:
+                return
+        self._send(due)
+
+    def shutdown(self):
+        """
+        Sends any pending updates and stops the background thread
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread and self._thread.is_alive() and self._thread != threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _send(self, due: list):
+        for nick, (_, changes, message, send) in due:
+            try:
+                (send or self.send)(nick, changes, message)
+                self.stats["sent"] += 1
+            except Exception as e:
+                LOG.error(f"Failed to send profile update for {nick}: {e}")
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                due = [(nick, pending) for nick, pending in self._pending.items() if pending[0] <= now]
+                for nick, _ in due:
+                    self._pending.pop(nick)
+                if not due:
+                    timeout = min(p[0] for p in self._pending.values()) - now if self._pending else None
+                    self._condition.wait(timeout)
+                    continue
+            self._send(due)
+
+
+class UserProfileView:
+    """
+    User preferences for a single message. The user and their profile are looked up once and each section is resolved
+    the first time it is requested, so repeated preference lookups while handling a message are dictionary reads.
+    """
+    __slots__ = ("user_config", "server", "resolved", "_context", "_data", "_has_message", "_profile_cache", "_nick",
+                 "_profile")
+
+    def __init__(self, message: Optional[Message], user_config: Optional[Mapping] = None, server: bool = False,
+                 profile_cache: Optional[ProfileCache] = None):
+        """
+        Args:
+            message: Message associated with request
+            user_config: local user configuration, used when not running as a server or no message is given
+            server: if True, preferences are read from the profiles included in the message context
+            profile_cache: ProfileCache to add profiles to, and to read profiles from if the message has none
+        """
+        self._context = getattr(message, "context", None) if message else None
+        self._data = getattr(message, "data", None) if message else None
+        self._has_message = bool(message)
+        self.user_config = user_config
+        self.server = server
+        self._profile_cache = profile_cache
+        self._nick = _MISSING
+        self._profile = _MISSING
+        self.resolved = dict()  # section: preferences for sections already resolved
+
+    def matches(self, user_config: Optional[Mapping], server: bool) -> bool:
+        """
+        Checks if this view was created with the passed configuration
+        Args:
+            user_config: local user configuration
+            server: True if preferences are read from message profiles
+        Returns:
+            True if this view resolves preferences the same way as a new view with the passed arguments
+        """
+        return self.user_config is user_config and self.server == server
+
+    @property
+    def nick(self) -> Optional[str]:
+        """
+        Returns: username associated with the message, None if there is no message
+        """
+        if self._nick is _MISSING:
+            self._nick = self._context.get("username") if self._has_message else None
+        return self._nick
+
+    @property
+    def profile(self) -> Optional[dict]:
+        """
+        Returns: the user's full profile when running as a server, None if it can't be found
+        """
+        if not self.server or not self._has_message or not self.nick:
+            return None
+        if self._profile is _MISSING:
+            self._profile = self._get_profile()
+            if self._profile is not None:
+                # Every section is resolved by the same profile, so later lookups are all dict reads
+                self.resolved.update(self._profile)
+        return self._profile
+
+    def get_section(self, section: str, default=None):
+        """
+        Get a section of the user's preferences
+        Args:
+            section: profile section to get (i.e. "speech")
+            default: value to return if the section can't be resolved
+        Returns:
+            dict preferences for section
+        """
+        try:
+            return self.resolved[section]
+        except KeyError:
+            pass
+        try:
+            value = self._resolve(section)
+        except Exception as x:
+            LOG.error(x)
+            value = _MISSING
+        if value is _MISSING:
+            return default
+        self.resolved[section] = value
+        return value
+
+    def _resolve(self, section: str):
+        if not self.server:
+            return self.user_config[section]
+        if not self._has_message or not self.nick:
+            LOG.warning("No message given!")
+            return self.user_config[section]
+        profile = self.profile
+        if profile is None:
+            LOG.error(f"Unable to get user settings! message={self._data}")
+            return _MISSING
+        return profile[section]
+
+    def _get_profile(self) -> Optional[dict]:
+        version = self._context.get("profile_version")
+        if self._context.get("nick_profiles"):
+            profile = self._context["nick_profiles"][self.nick]
+            if self._profile_cache is not None:
+                self._profile_cache.put(self.nick, profile, version)
+            return profile
+        if self._profile_cache is not None:
+            return self._profile_cache.get(self.nick, version)
+        return None
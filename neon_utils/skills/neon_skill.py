@@ -17,25 +17,30 @@
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
+import atexit
 import pathlib
 import pickle
 import json
 import time
 import os
+import threading
 
+from collections import ChainMap
+from collections.abc import MutableMapping
 from copy import deepcopy
 # from mycroft_bus_client.message import Message, dig_for_message
 from neon_utils.file_utils import get_most_recent_file_in_dir
-from ruamel.yaml.comments import CommentedMap
 from typing import Optional
 from dateutil.tz import gettz
 from ovos_utils import ensure_mycroft_import
 from neon_utils import create_signal, check_for_signal, wait_while_speaking
-from neon_utils.configuration_utils import NGIConfig
+from neon_utils.configuration_utils import NGIConfig, SkillSettingsCache
 from neon_utils.location_utils import to_system_time
-from neon_utils.language_utils import get_neon_lang_config, DetectorFactory, TranslatorFactory
-from neon_utils.logger import LOG
-from neon_utils.message_utils import request_from_mobile, get_message_user
+from neon_utils.language_utils import get_neon_lang_config, get_shared_backends_generation, DetectorFactory, \
+    TranslatorFactory
+from neon_utils.logger import LOG, log_deprecation
+from neon_utils.message_utils import request_from_mobile, get_message_user, ProfileCache, ProfileUpdateCoalescer, \
+    UserProfileView
 
 LOG.name = "neon-skill"
 ensure_mycroft_import()
@@ -44,23 +49,42 @@ from mycroft.skills.mycroft_skill.mycroft_skill import MycroftSkill
 
 
 class NeonSkill(MycroftSkill):
+    init_stats = dict()
+    profile_cache: Optional[ProfileCache] = None
+    profile_updates: Optional[ProfileUpdateCoalescer] = None
+    _profile_updates_lock = threading.Lock()
+    _profile_updates_bus = None
+
     def __init__(self, name=None, bus=None, use_settings=True):
+        init_start = time.monotonic()
         self.user_config = NGIConfig("ngi_user_info")
         self.local_config = NGIConfig("ngi_local_conf")
 
         self.ngi_settings: Optional[NGIConfig] = None
+        self._checked_overrides = dict()  # nick: user settings checked for missing keys
+        self._pending_settings_updates = dict()  # nick: message
+        self._settings_update_lock = threading.Lock()
+        self._settings_update_timer: Optional[threading.Timer] = None
+        self.skill_settings_update_delay = 1.0
+        self.profile_update_window = 0.5
+        # Lang support; shared backends are looked up on first use
+        self._language_config = None
+        self._lang_detector = None
+        self._lang_detector_generation = None  # shared backends generation, None if set explicitly
+        self._translator = None
+        self._translator_generation = None
 
         super(NeonSkill, self).__init__(name, bus, use_settings)
 
-        self.cache_loc = self.configuration_available.get('dirVars', {}).get('cacheDir',
-                                                                             os.path.expanduser("~/.neon/cache"))
+        local_config = self.local_config.snapshot
+        self.cache_loc = local_config.get('dirVars', {}).get('cacheDir', os.path.expanduser("~/.neon/cache"))
 
         # TODO: Depreciate these references, signal use is discouraged DM
         self.create_signal = create_signal
         self.check_for_signal = check_for_signal
 
         self.sys_tz = gettz()
-        self.gui_enabled = self.configuration_available.get("prefFlags", {}).get("guiEvents", False)
+        self.gui_enabled = local_config.get("prefFlags", {}).get("guiEvents", False)
 
         if use_settings:
             self.settings = {}
@@ -76,9 +100,13 @@ class NeonSkill(MycroftSkill):
         # A server is a device that hosts the core and skills to serve clients,
         # but that a user will not interact with directly.
         # A server will likely serve multiple users and devices concurrently.
-        if self.configuration_available.get("devVars", {}).get("devType", "generic") == "server":
+        if local_config.get("devVars", {}).get("devType", "generic") == "server":
             self.server = True
             self.default_intent_timeout = 90
+            if NeonSkill.profile_cache is None:
+                cache_config = self.local_config.content.get("skills", {}).get("profile_cache", {})
+                NeonSkill.profile_cache = ProfileCache(cache_config.get("max_size", 128),
+                                                       cache_config.get("ttl", 300))
         else:
             self.server = False
             self.default_intent_timeout = 60
@@ -86,77 +114,170 @@ class NeonSkill(MycroftSkill):
         self.neon_core = True
         self.actions_to_confirm = dict()
 
-        try:
-            # Lang support
-            self.language_config = get_neon_lang_config()
-            self.lang_detector = DetectorFactory.create()  # Default fastlang
-            self.translator = TranslatorFactory.create()  # Default Amazon
-        except Exception as e:
-            LOG.error(e)
-            self.language_config, self.language_detector, self.translator = None, None, None
+        stats = NeonSkill.init_stats.setdefault(self.name, dict())
+        stats["init_seconds"] = time.monotonic() - init_start
+        LOG.debug(f"{self.name} initialized in {stats['init_seconds']}s")
+
+    @property
+    def language_config(self):
+        if self._language_config is None:
+            try:
+                self._language_config = get_neon_lang_config()
+            except Exception as e:
+                LOG.error(e)
+        return self._language_config
+
+    @language_config.setter
+    def language_config(self, config):
+        self._language_config = config
+
+    @property
+    def lang_detector(self):
+        """
+        Language detector shared with other skills in this process; built on first use and replaced if shared backends
+        are cleared
+        """
+        generation = get_shared_backends_generation()
+        if self._lang_detector is None or self._lang_detector_generation not in (None, generation):
+            try:
+                self._lang_detector = DetectorFactory.get_shared()  # Default fastlang
+                self._lang_detector_generation = generation
+            except Exception as e:
+                LOG.error(e)
+        return self._lang_detector
+
+    @lang_detector.setter
+    def lang_detector(self, detector):
+        self._lang_detector = detector
+        self._lang_detector_generation = None
+
+    @property
+    def translator(self):
+        """
+        Caching translator shared with other skills in this process; built on first use and replaced if shared backends
+        are cleared
+        """
+        generation = get_shared_backends_generation()
+        if self._translator is None or self._translator_generation not in (None, generation):
+            try:
+                self._translator = TranslatorFactory.get_shared(cache=True)  # Default Amazon
+                self._translator_generation = generation
+            except Exception as e:
+                LOG.error(e)
+        return self._translator
+
+    @translator.setter
+    def translator(self, translator):
+        self._translator = translator
+        self._translator_generation = None
 
     @property
     def user_info_available(self):
-        LOG.warning("This reference is deprecated, use self.preference_x methods for user preferences")
-        return self.user_config.content
+        log_deprecation("This reference is deprecated, use self.preference_x methods for user preferences")
+        return self.user_config.snapshot
 
     @property
     def configuration_available(self):
-        LOG.warning("This reference is deprecated, use self.local_config directly")
-        return self.local_config.content
+        log_deprecation("This reference is deprecated, use self.local_config directly")
+        return self.local_config.snapshot
 
     def init_settings(self):
         """
         Initializes yml-based skill config settings, updating from default dict as necessary for added parameters
         """
-        if os.path.isfile(os.path.join(self.root_dir, "settingsmeta.yml")):
-            skill_meta = NGIConfig("settingsmeta", self.root_dir).content
-        elif os.path.isfile(os.path.join(self.root_dir, "settingsmeta.json")):
-            with open(os.path.join(self.root_dir, "settingsmeta.json")) as f:
-                skill_meta = json.load(f)
-        else:
-            skill_meta = None
-
-        # Load defaults from settingsmeta
-        default = {"__mycroft_skill_firstrun": True}
-        if skill_meta:
-            # LOG.info(skill_meta)
-            LOG.info(skill_meta["skillMetadata"]["sections"])
-            for section in skill_meta["skillMetadata"]["sections"]:
-                for pref in section.get("fields", []):
-                    if not pref.get("name"):
-                        LOG.debug(f"non-data skill meta: {pref}")
-                    else:
-                        if pref.get("value") == "true":
-                            value = True
-                        elif pref.get("value") == "false":
-                            value = False
-                        elif isinstance(pref.get("value"), CommentedMap):
-                            value = dict(pref.get("value"))
-                        else:
-                            value = pref.get("value")
-                        default[pref["name"]] = value
+        start = time.monotonic()
+        settings_cache = SkillSettingsCache(self.root_dir)
+        default = settings_cache.get_defaults()
 
         # Load or init configuration
         self.ngi_settings = NGIConfig(self.name, self.root_dir)
 
         # Load any new or updated keys
-        try:
-            LOG.debug(self.ngi_settings.content)
-            LOG.debug(default)
-            if self.ngi_settings.content and len(self.ngi_settings.content.keys()) > 0 and len(default.keys()) > 0:
-                self.ngi_settings.make_equal_by_keys(default, recursive=False)
-            elif len(default.keys()) > 0:
-                LOG.info("No settings to load, use default")
+        if settings_cache.is_reconciled(self.ngi_settings.file_path):
+            LOG.debug(f"{self.name} settings are up to date")
+        else:
+            try:
+                LOG.debug(self.ngi_settings.content)
+                LOG.debug(default)
+                if self.ngi_settings.content and len(self.ngi_settings.content.keys()) > 0 and len(default.keys()) > 0:
+                    self.ngi_settings.make_equal_by_keys(default, recursive=False)
+                elif len(default.keys()) > 0:
+                    LOG.info("No settings to load, use default")
+                    self.ngi_settings.populate(default)
+            except Exception as e:
+                LOG.error(e)
                 self.ngi_settings.populate(default)
-        except Exception as e:
-            LOG.error(e)
-            self.ngi_settings.populate(default)
+            settings_cache.set_reconciled(self.ngi_settings.file_path)
 
         # Make sure settings is initialized as a dictionary
         if self.ngi_settings.content:
             self.settings = self.ngi_settings.content  # Uses the default self.settings object for skills compat
         LOG.debug(f"loaded settings={self.settings}")
+        NeonSkill.init_stats.setdefault(self.name, dict()).update(settings_seconds=time.monotonic() - start,
+                                                                  settings_cached=settings_cache.from_cache)
+
+    def bind(self, bus):
+        if bus:
+            super().bind(bus)
+            self.add_event("neon.remove_cache_entry", self._handle_remove_cache_entry)
+            with NeonSkill._profile_updates_lock:
+                if NeonSkill._profile_updates_bus is not bus:
+                    # Handled once per process rather than by every skill
+                    bus.on("mycroft.skill.handler.complete", NeonSkill._handle_handler_complete)
+                    NeonSkill._profile_updates_bus = bus
+
+    @staticmethod
+    def _handle_remove_cache_entry(message):
+        """
+        Removes a user's cached profile when it is changed
+        :param message: Message with the `nick` of the changed profile
+        """
+        if NeonSkill.profile_cache is not None and message.data.get("nick"):
+            NeonSkill.profile_cache.remove(message.data["nick"])
+
+    @staticmethod
+    def _handle_handler_complete(message):
+        """
+        Sends pending profile updates for the user whose request was just handled
+        :param message: Message emitted when a skill handler completes
+        """
+        nick = message.context.get("username")
+        if NeonSkill.profile_updates is not None and nick:
+            NeonSkill.profile_updates.flush(nick)
+
+    def get_profile_view(self, message=None) -> UserProfileView:
+        """
+        Get the user profile view for a message. The view is created on first use and attached to the message so later
+        preference lookups with the same message reuse it.
+        :param message: Message associated with request
+        :return: UserProfileView for the message's user
+        """
+        view = getattr(message, "_profile_view", None)
+        if view is None or not view.matches(self.user_config, self.server):
+            view = UserProfileView(message, self.user_config, self.server, NeonSkill.profile_cache)
+            if message:
+                # Kept on the message so it is released with it; serialized messages only include type, data, context
+                try:
+                    message._profile_view = view
+                except AttributeError:
+                    pass
+        return view
+
+    def _get_preference_section(self, message, section: str) -> Optional[dict]:
+        """
+        Get a section of the message user's preferences
+        :param message: Message associated with request
+        :param section: profile section to get (i.e. "speech")
+        :return: dict preferences for section, None if it can't be resolved
+        """
+        # Called for every preference lookup, so check for a view and a resolved section before calling into the view
+        view = getattr(message, "_profile_view", None)
+        if view is None or view.user_config is not self.user_config or view.server != self.server:
+            view = self.get_profile_view(message)
+        try:
+            return view.resolved[section]
+        except KeyError:
+            return view.get_section(section)
 
     @property
     def location_timezone(self):
@@ -169,21 +290,9 @@ class NeonSkill(MycroftSkill):
         Returns a brands dictionary for the user
         Equivalent to self.user_config["speech"] for non-server use
         """
-        try:
-            nick = get_message_user(message) if message else None
-            if self.server:
-                if not message or not nick:
-                    LOG.warning("No message given!")
-                    return self.user_config['brands']
-
-                if message.context.get("nick_profiles"):
-                    return message.context["nick_profiles"][nick]["brands"]
-                else:
-                    LOG.error(f"Unable to get user settings! message={message.data}")
-            else:
-                return self.user_config['brands']
-        except Exception as x:
-            LOG.error(x)
+        section = self._get_preference_section(message, "brands")
+        if section is not None:
+            return section
         return {'ignored_brands': {},
                 'favorite_brands': {},
                 'specially_requested': {}}
@@ -193,20 +302,9 @@ class NeonSkill(MycroftSkill):
         Returns the user dictionary with name, email
         Equivalent to self.user_config["user"] for non-server use
         """
-        try:
-            nick = get_message_user(message) if message else None
-            if self.server:
-                if not message or not nick:
-                    LOG.warning("No message given!")
-                    return self.user_config['user']
-                if message.context.get("nick_profiles"):
-                    return message.context["nick_profiles"][nick]["user"]
-                else:
-                    LOG.error(f"Unable to get user settings! message={message.data}")
-            else:
-                return self.user_config['user']
-        except Exception as x:
-            LOG.error(x)
+        section = self._get_preference_section(message, "user")
+        if section is not None:
+            return section
         return {'first_name': '',
                 'middle_name': '',
                 'last_name': '',
@@ -229,20 +327,9 @@ class NeonSkill(MycroftSkill):
         Get the JSON data structure holding location information.
         Equivalent to self.user_config["location"] for non-server use
         """
-        try:
-            nick = get_message_user(message) if message else None
-            if self.server:
-                if not message or not nick:
-                    LOG.warning("No message given!")
-                    return self.user_config['location']
-                if message.context.get("nick_profiles"):
-                    return message.context["nick_profiles"][nick]["location"]
-                else:
-                    LOG.error(f"Unable to get user settings! message={message.data}")
-            else:
-                return self.user_config['location']
-        except Exception as x:
-            LOG.error(x)
+        section = self._get_preference_section(message, "location")
+        if section is not None:
+            return section
         return {'lat': 47.4799078,
                 'lng': -122.2034496,
                 'city': 'Renton',
@@ -257,21 +344,9 @@ class NeonSkill(MycroftSkill):
         Returns the units dictionary that contains time, date, measure formatting preferences
         Equivalent to self.user_config["units"] for non-server use
         """
-        try:
-            nick = get_message_user(message) if message else None
-            if self.server:
-                if not message or not nick:
-                    LOG.warning("No message given!")
-                    return self.user_config['units']
-
-                if message.context.get("nick_profiles"):
-                    return message.context["nick_profiles"][nick]["units"]
-                else:
-                    LOG.error(f"Unable to get user settings! message={message.data}")
-            else:
-                return self.user_config['units']
-        except Exception as x:
-            LOG.error(x)
+        section = self._get_preference_section(message, "units")
+        if section is not None:
+            return section
         return {'time': 12,
                 'date': 'MDY',
                 'measure': 'imperial'
@@ -282,21 +357,9 @@ class NeonSkill(MycroftSkill):
         Returns the speech dictionary that contains language and spoken response preferences
         Equivalent to self.user_config["speech"] for non-server use
         """
-        try:
-            nick = get_message_user(message) if message else None
-            if self.server:
-                if not message or not nick:
-                    LOG.warning("No message given!")
-                    return self.user_config['speech']
-
-                if message.context.get("nick_profiles"):
-                    return message.context["nick_profiles"][nick]["speech"]
-                else:
-                    LOG.error(f"Unable to get user settings! message={message.data}")
-            else:
-                return self.user_config['speech']
-        except Exception as x:
-            LOG.error(x)
+        section = self._get_preference_section(message, "speech")
+        if section is not None:
+            return section
         return {'stt_language': 'en',
                 'stt_region': 'US',
                 'alt_languages': ['en'],
@@ -317,21 +380,86 @@ class NeonSkill(MycroftSkill):
         :param message: Message associated with request
         :return: dict of skill preferences
         """
-        nick = get_message_user(message) if message else None
-        if self.server and nick:
-            try:
-                skill = self.skill_id
-                LOG.info(f"Get server prefs for skill={skill}")
-                user_overrides = message.context["nick_profiles"][nick]["skills"].get(self.skill_id, dict())
-                LOG.debug(user_overrides)
-                merged_settings = {**self.settings, **user_overrides}
-                if user_overrides.keys() != merged_settings.keys():
+        user_overrides = self._get_skill_overrides(message)
+        if user_overrides is None:
+            return self.settings
+        return {**self.settings, **user_overrides}
+
+    def preference_skill_overlay(self, message=None) -> MutableMapping:
+        """
+        Returns the skill settings configuration without copying it
+        Equivalent to self.settings for non-server
+        For servers, returns a ChainMap of the user's settings over this skill's settings; values set on the returned
+        mapping are not saved and do not modify either
+        :param message: Message associated with request
+        :return: mapping of skill preferences
+        """
+        user_overrides = self._get_skill_overrides(message)
+        if user_overrides is None:
+            return self.settings
+        return ChainMap(dict(), user_overrides, self.settings)
+
+    def _get_skill_overrides(self, message=None) -> Optional[dict]:
+        """
+        Get the message user's settings for this skill. If the user is missing any of this skill's settings keys, their
+        profile is updated later.
+        :param message: Message associated with request
+        :return: dict of the user's skill preferences, None if not running as a server or the user is unknown
+        """
+        if not self.server or not message:
+            return None
+        view = self.get_profile_view(message)
+        nick = view.nick
+        if not nick:
+            return None
+        try:
+            skills = view.get_section("skills")
+            if skills is None:
+                return None
+            user_overrides = skills.get(self.skill_id)
+            if nick not in self._checked_overrides or self._checked_overrides[nick] is not user_overrides:
+                if len(self._checked_overrides) >= 1024:
+                    self._checked_overrides.clear()
+                self._checked_overrides[nick] = user_overrides
+                if user_overrides is None or not self.settings.keys() <= user_overrides.keys():
                     LOG.info(f"New settings keys: user={nick}|skill={self.skill_id}|user={user_overrides}")
-                    self.update_skill_settings(merged_settings, message)
-                return merged_settings
+                    self._schedule_skill_settings_update(nick, message)
+            return user_overrides if user_overrides is not None else dict()
+        except Exception as e:
+            LOG.error(e)
+        return None
+
+    def _schedule_skill_settings_update(self, nick: str, message: Message):
+        """
+        Schedules adding this skill's current settings keys to a user's profile. Updates requested within
+        `skill_settings_update_delay` seconds are sent together.
+        :param nick: user to update
+        :param message: Message associated with request
+        """
+        # The update is sent from another thread; don't share the message with the handler that is using it
+        message = Message(message.msg_type, deepcopy(message.data), deepcopy(message.context))
+        with self._settings_update_lock:
+            self._pending_settings_updates[nick] = message
+            if not self._settings_update_timer:
+                self._settings_update_timer = threading.Timer(self.skill_settings_update_delay,
+                                                              self._send_skill_settings_updates)
+                self._settings_update_timer.daemon = True
+                self._settings_update_timer.start()
+
+    def _send_skill_settings_updates(self):
+        """
+        Sends scheduled skill settings updates
+        """
+        with self._settings_update_lock:
+            pending = self._pending_settings_updates
+            self._pending_settings_updates = dict()
+            self._settings_update_timer = None
+        for nick, message in pending.items():
+            try:
+                skills = self.get_profile_view(message).get_section("skills") or dict()
+                self.update_skill_settings({**self.settings, **skills.get(self.skill_id, dict())}, message)
             except Exception as e:
-                LOG.error(e)
-        return self.settings
+                LOG.error(f"Failed to update skill settings for {nick}: {e}")
 
     def build_user_dict(self, message=None) -> dict:
         """
@@ -348,8 +476,7 @@ class NeonSkill(MycroftSkill):
         return merged_dict
 
     def build_combined_skill_object(self, message=None) -> list:
-        user = self.get_utterance_user(message)
-        skill_dict = message.context["nick_profiles"][user]["skills"]
+        skill_dict = self._get_preference_section(message, "skills") or dict()
         skill_list = list(skill_dict.values())
         return skill_list
 
@@ -361,32 +488,85 @@ class NeonSkill(MycroftSkill):
         """
         if self.server:
             nick = get_message_user(message) if message else None
-            new_skills_prefs = new_preferences.pop("skills")
-            old_skills_prefs = message.context["nick_profiles"][nick]["skills"]
-            combined_skill_prefs = {**old_skills_prefs, **new_skills_prefs}
+            # Messages may only include a profile version if the profile is cached
+            old_preferences = self.get_profile_view(message).profile
+            if old_preferences is None:
+                LOG.error(f"Unable to get profile to update! user={nick}")
+                return
+            new_skills_prefs = new_preferences.pop("skills", dict())
             combined_changes = {k: v for dic in new_preferences.values() for k, v in dic.items()}
             if new_skills_prefs:
-                combined_changes["skill_settings"] = json.dumps(list(combined_skill_prefs.values()))
-                new_preferences["skills"] = combined_skill_prefs
-                LOG.debug(f"combined_skill_prefs={combined_skill_prefs}")
-            combined_changes["username"] = nick
-            self.socket_emit_to_server("update profile", ["skill", combined_changes,
-                                                          message.context["klat_data"]["request_id"]])
-            self.bus.emit(Message("neon.remove_cache_entry", {"nick": nick}))
-            old_preferences = message.context["nick_profiles"][nick]
-            message.context["nick_profiles"][nick] = {**old_preferences, **new_preferences}
+                new_preferences["skills"] = {**old_preferences.get("skills", dict()), **new_skills_prefs}
+                # Replaced with the serialized settings of all skills when the update is sent
+                combined_changes["skills"] = new_preferences["skills"]
+            new_profile = {**old_preferences, **new_preferences}
+            if message.context.get("nick_profiles"):
+                message.context["nick_profiles"][nick] = new_profile
+            if NeonSkill.profile_cache is not None:
+                NeonSkill.profile_cache.put(nick, new_profile, message.context.get("profile_version"))
+            message._profile_view = None
+            self._get_profile_updates().add(nick, combined_changes, message, self._send_profile_update)
         else:
-            for section, settings in new_preferences:
-                # section in user, brands, units, etc.
-                for key, val in settings:
-                    self.user_config.update_yaml_file(section, key, val, True)
-
-            self.user_config.update_yaml_file(final=True)
+            with self.user_config.transaction():
+                for section, settings in new_preferences.items():
+                    # section in user, brands, units, etc.
+                    for key, val in settings.items():
+                        self.user_config.update_yaml_file(section, key, val)
             modified = ["ngi_user_info"]
+            if message:
+                message._profile_view = None
             self.bus.emit(Message('check.yml.updates',
                                   {"modified": modified},
                                   {"origin": self.skill_id}))
 
+    def _send_profile_update(self, nick: str, changes: dict, message: Message):
+        """
+        Sends merged profile changes to the server
+        :param nick: user to update
+        :param changes: dict of changed profile values and, if any skill settings changed, the settings of all skills
+        :param message: most recent Message associated with the changes
+        """
+        skill_prefs = changes.pop("skills", None)
+        if skill_prefs:
+            changes["skill_settings"] = json.dumps(list(skill_prefs.values()))
+        changes["username"] = nick
+        self.socket_emit_to_server("update profile", ["skill", changes, message.context["klat_data"]["request_id"]])
+        self.bus.emit(Message("neon.remove_cache_entry", {"nick": nick}))
+
+    def _get_profile_updates(self) -> ProfileUpdateCoalescer:
+        """
+        Get the profile update coalescer shared by all skills in this process, creating it on first use
+        :return: shared ProfileUpdateCoalescer
+        """
+        with NeonSkill._profile_updates_lock:
+            if NeonSkill.profile_updates is None:
+                NeonSkill.profile_updates = ProfileUpdateCoalescer(window=self.profile_update_window)
+                atexit.register(NeonSkill.profile_updates.shutdown)
+            return NeonSkill.profile_updates
+
+    def flush_profile_updates(self):
+        """
+        Immediately sends any pending profile updates. Updates are otherwise sent `profile_update_window` seconds after
+        the first change or when a skill handler completes.
+        """
+        if NeonSkill.profile_updates is not None:
+            NeonSkill.profile_updates.flush()
+
+    @property
+    def profile_update_stats(self) -> dict:
+        """
+        Returns: dict of profile update counts `requested`, `sent`, and `saved` by merging updates for all skills in
+        this process
+        """
+        if NeonSkill.profile_updates is None:
+            return {"requested": 0, "sent": 0, "saved": 0}
+        return dict(NeonSkill.profile_updates.stats)
+
+    def default_shutdown(self):
+        # Other skills keep using the shared coalescer; send this skill's updates before it stops
+        self.flush_profile_updates()
+        super().default_shutdown()
+
     def update_skill_settings(self, new_preferences: dict, message: Message = None, skill_global=False):
         """
         Updates skill settings with the passed new_preferences
@@ -399,10 +579,10 @@ class NeonSkill(MycroftSkill):
             new_preferences["skill_id"] = self.skill_id
             self.update_profile({"skills": {self.skill_id: new_preferences}}, message)
         else:
-            for key, val in new_preferences.items():
-                self.settings[key] = val
-                self.ngi_settings.update_yaml_file(key, value=val, multiple=True)
-            self.ngi_settings.update_yaml_file(final=True)
+            with self.ngi_settings.transaction():
+                for key, val in new_preferences.items():
+                    self.settings[key] = val
+                    self.ngi_settings.update_yaml_file(key, value=val)
 
     def build_message(self, kind, utt, message, speaker=None):
         """
@@ -816,8 +996,9 @@ class NeonSkill(MycroftSkill):
         may have set
         :param prefix: (str) prefix to match
         """
-        os.makedirs(f"{self.configuration_available['dirVars']['ipcDir']}/signal", exist_ok=True)
-        for signal in os.listdir(self.configuration_available['dirVars']['ipcDir'] + '/signal'):
+        ipc_dir = self.local_config.snapshot['dirVars']['ipcDir']
+        os.makedirs(f"{ipc_dir}/signal", exist_ok=True)
+        for signal in os.listdir(ipc_dir + '/signal'):
             if str(signal).startswith(prefix) or f"_{prefix}_" in str(signal):
                 # LOG.info('Removing ' + str(signal))
                 # os.remove(self.configuration_available['dirVars']['ipcDir'] + '/signal/' + signal)
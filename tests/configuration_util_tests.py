@@ -22,8 +22,19 @@ import os
 import time
 import unittest
 
+from contextlib import suppress
+from unittest.mock import patch
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 from neon_utils.configuration_utils import *
+from neon_utils.configuration_utils import _dict_merge, _dict_make_equal_keys, _dict_update_keys, _freeze, \
+    _migrate_configs, _move_config_sections, _get_default_shared_config_file, _get_shared_key, _SHARED_HEADER, \
+    _SHARED_MAGIC, _get_config_cache_path
 
 ROOT_DIR = os.path.dirname(os.path.realpath(__file__))
 CONFIG_PATH = os.path.join(ROOT_DIR, "configuration")
@@ -34,12 +45,27 @@ TEST_DICT = {"section 1": {"key1": "val1",
                            "key_2": "val2"}}
 
 
+def _reload_config_worker(name, path, duration, results):
+    config = NGIConfig(name, path)
+    reloads = 0
+    errors = 0
+    stop_time = time.time() + duration
+    while time.time() < stop_time:
+        content = config._load_yaml_file()
+        if not content.get("user"):
+            errors += 1
+        reloads += 1
+    results.put((reloads, errors))
+
+
 class ConfigurationUtilTests(unittest.TestCase):
     def doCleanups(self) -> None:
         for file in glob(os.path.join(CONFIG_PATH, "*.lock")):
             os.remove(file)
         for file in glob(os.path.join(CONFIG_PATH, "*.tmp")):
             os.remove(file)
+        for file in glob(os.path.join(CONFIG_PATH, ".*.cache")):
+            os.remove(file)
         if os.path.exists(os.path.join(CONFIG_PATH, "old_user_info.yml")):
             os.remove(os.path.join(CONFIG_PATH, "old_user_info.yml"))
 
@@ -70,6 +96,547 @@ class ConfigurationUtilTests(unittest.TestCase):
         local_conf["prefFlags"]["devMode"] = False
         self.assertFalse(local_conf["prefFlags"]["devMode"])
 
+    def test_config_sidecar(self):
+        local_conf = NGIConfig("ngi_local_conf", CONFIG_PATH, True)
+        self.assertTrue(os.path.isfile(local_conf.sidecar_path))
+        self.assertNotEqual(os.path.dirname(local_conf.sidecar_path), CONFIG_PATH)
+        self.assertNotEqual(os.path.dirname(local_conf.lock.lock_file), CONFIG_PATH)
+        self.assertEqual(glob(os.path.join(CONFIG_PATH, ".ngi_local_conf.*")), [])
+        self.assertNotEqual(NGIConfig("ngi_user_info", CONFIG_PATH).sidecar_path, local_conf.sidecar_path)
+        with patch.object(local_conf.parser, "load", side_effect=AssertionError("unexpected parse")):
+            self.assertEqual(local_conf._load_yaml_file(), local_conf.content)
+        cached = NGIConfig("ngi_local_conf", CONFIG_PATH, True)
+        self.assertEqual(type(cached.content), dict)
+        self.assertIsInstance(cached.content["prefFlags"]["devMode"], bool)
+        self.assertEqual(cached.content, local_conf.content)
+
+    def test_config_sidecar_outdated(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        with open(ngi_user_info) as f:
+            new_contents = f.read().replace("Test User", "Sidecar User")
+        with open(ngi_user_info, "w") as f:
+            f.write(new_contents)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertEqual(user_conf.content["user"]["full_name"], "Sidecar User")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_sidecar_write_keeps_comments(self):
+        default_conf = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                                    "neon_utils", "default_configurations", "default_core_conf.yml")
+        test_conf = os.path.join(CONFIG_PATH, "comment_conf.yml")
+        shutil.copy(default_conf, test_conf)
+        NGIConfig("comment_conf", CONFIG_PATH, True)
+        config = NGIConfig("comment_conf", CONFIG_PATH, True)
+        self.assertNotIsInstance(config.content, CommentedMap)
+        config.update_yaml_file("prefFlags", "devMode", True)
+        with open(test_conf) as f:
+            contents = f.read()
+        self.assertIn("# generic, server, pi", contents)
+        self.assertTrue(NGIConfig("comment_conf", CONFIG_PATH, True)["prefFlags"]["devMode"])
+        os.remove(test_conf)
+
+    def test_config_transaction(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        with patch.object(user_conf, "_write_yaml_file", wraps=user_conf._write_yaml_file) as write:
+            with user_conf.transaction():
+                user_conf.update_yaml_file("user", "full_name", "Transaction User")
+                with user_conf.transaction():
+                    user_conf.update_yaml_file("user", "email", "test@neon.ai")
+                user_conf.update_yaml_file("new_section", "new_key", True)
+                write.assert_not_called()
+                self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["full_name"], "Test User")
+            write.assert_called_once()
+        from_disk = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertEqual(from_disk["user"]["full_name"], "Transaction User")
+        self.assertEqual(from_disk["user"]["email"], "test@neon.ai")
+        self.assertTrue(from_disk["new_section"]["new_key"])
+        self.assertFalse(os.path.exists(os.path.join(CONFIG_PATH, "ngi_user_info.tmp")))
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_transaction_rollback(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        with self.assertRaises(ValueError):
+            with user_conf.transaction():
+                user_conf.update_yaml_file("user", "full_name", "Transaction User")
+                raise ValueError
+        self.assertEqual(user_conf["user"]["full_name"], "Test User")
+        self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["full_name"], "Test User")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_transaction_interrupted(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        sibling = NGIConfig("ngi_user_info", CONFIG_PATH)
+        self.assertIs(sibling._content, user_conf._content)
+        with self.assertRaises(KeyboardInterrupt):
+            with user_conf.transaction():
+                user_conf.update_yaml_file("user", "full_name", "Transaction User")
+                raise KeyboardInterrupt
+        self.assertEqual(user_conf._transaction_depth, 0)
+        self.assertEqual(sibling["user"]["full_name"], "Test User")
+        self.assertEqual(user_conf.snapshot["user"]["full_name"], "Test User")
+
+        # Not left in transaction mode
+        user_conf.update_yaml_file("user", "full_name", "Written User")
+        self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["full_name"], "Written User")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_transaction_other_thread(self):
+        from threading import Thread, Event
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        started = Event()
+
+        def _update():
+            started.set()
+            user_conf.update_yaml_file("user", "email", "thread@neon.ai")
+
+        thread = Thread(target=_update)
+        with self.assertRaises(ValueError):
+            with user_conf.transaction():
+                user_conf.update_yaml_file("user", "full_name", "Transaction User")
+                thread.start()
+                started.wait()
+                time.sleep(0.1)
+                self.assertNotEqual(user_conf["user"]["email"], "thread@neon.ai")
+                raise ValueError
+        thread.join(5)
+        from_disk = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertEqual(from_disk["user"]["full_name"], "Test User")
+        self.assertEqual(from_disk["user"]["email"], "thread@neon.ai")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_write_unchanged(self):
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        with patch("os.replace") as replace:
+            user_conf.update_yaml_file("user", "full_name", user_conf["user"]["full_name"])
+            replace.assert_not_called()
+
+    def test_config_shared_read_lock(self):
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        other_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertIsNot(user_conf.lock, other_conf.lock)
+        with user_conf._read_lock():
+            other_conf._load_yaml_file()
+            other_conf.lock.timeout = 0.1
+            with self.assertRaises(Timeout):
+                other_conf.lock.acquire()
+        with other_conf.lock:
+            user_conf.lock.timeout = 0.1
+            with self.assertRaises(Timeout):
+                with user_conf._read_lock():
+                    pass
+        user_conf.lock.timeout = other_conf.lock.timeout = 10
+
+    def test_config_reload_stress(self):
+        from multiprocessing import Process, Queue
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        duration = 1.0
+        results = Queue()
+        readers = [Process(target=_reload_config_worker, args=("ngi_user_info", CONFIG_PATH, duration, results))
+                   for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        writes = 0
+        stop_time = time.time() + duration
+        while time.time() < stop_time:
+            user_conf.update_yaml_file("user", "full_name", f"Stress User {writes}")
+            writes += 1
+        counts = [results.get(timeout=30) for _ in readers]
+        for reader in readers:
+            reader.join()
+        shutil.move(old_user_info, ngi_user_info)
+        reloads = sum(count[0] for count in counts)
+        self.assertEqual(sum(count[1] for count in counts), 0)
+        self.assertGreater(reloads, 0)
+        self.assertGreater(writes, 0)
+        LOG.info(f"{reloads / duration} reloads/s across {len(readers)} processes with {writes} concurrent writes")
+
+    def test_config_subscribe(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        changes = list()
+        callback = lambda *args: changes.append(args)
+        old_name = user_conf["user"]["full_name"]
+        user_conf.subscribe("user.full_name", callback)
+        user_conf.subscribe("user", callback)
+        user_conf.subscribe("speech.tts_language", callback)
+
+        writer = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        writer.update_yaml_file("user", "full_name", "Subscribed User")
+        user_conf._loaded = 0
+        user_conf.check_reload()
+        self.assertEqual(len(changes), 2)
+        self.assertIn(("user.full_name", old_name, "Subscribed User"), changes)
+        self.assertIn("user", [change[0] for change in changes])
+
+        changes.clear()
+        user_conf.unsubscribe("user", callback)
+        writer.update_yaml_file("user", "full_name", "Another User")
+        user_conf._loaded = 0
+        user_conf.check_reload()
+        self.assertEqual(changes, [("user.full_name", "Subscribed User", "Another User")])
+        user_conf.unsubscribe("user.full_name", callback)
+        user_conf.unsubscribe("speech.tts_language", callback)
+        self.assertEqual(user_conf._subscriptions, dict())
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_snapshot(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        user_conf.update_keys({"speech": {"alt_languages": ["en"]}})
+        snapshot = user_conf.snapshot
+        self.assertIsInstance(snapshot, FrozenDict)
+        self.assertEqual(snapshot, user_conf.content)
+        with self.assertRaises(TypeError):
+            snapshot["user"]["full_name"] = "Changed"
+        with self.assertRaises(TypeError):
+            snapshot["speech"]["alt_languages"].append("fr")
+        self.assertIs(user_conf.snapshot, snapshot)
+
+        user_conf.update_yaml_file("user", "full_name", "Snapshot User")
+        new_snapshot = user_conf.snapshot
+        self.assertEqual(snapshot["user"]["full_name"], "Test User")
+        self.assertEqual(new_snapshot["user"]["full_name"], "Snapshot User")
+        self.assertIsNot(new_snapshot["user"], snapshot["user"])
+        self.assertIs(new_snapshot["speech"], snapshot["speech"])
+
+        user_conf.update_yaml_file("user", "first_name", "Pending", multiple=True)
+        self.assertEqual(user_conf.snapshot["user"]["first_name"], "Pending")
+        self.assertEqual(user_conf.snapshot, user_conf.content)
+        user_conf["location"] = {"city": "Snapshot City"}
+        self.assertEqual(user_conf.snapshot["location"], {"city": "Snapshot City"})
+        self.assertEqual(user_conf.snapshot, user_conf.content)
+        user_conf.write_changes()
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_shared_config_publisher(self):
+        shared_file = os.path.join(CONFIG_PATH, ".shared_config")
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        publisher = SharedConfigPublisher(shared_file)
+        try:
+            with self.assertRaises(RuntimeError):
+                SharedConfigPublisher(shared_file)
+            user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            user_conf.update_keys({"speech": {"alt_languages": ["en"]}})
+            publisher.add(user_conf)
+            reader = SharedConfigReader(shared_file)
+            generation = reader.generation
+            self.assertEqual(generation, publisher.generation)
+            view = reader.get("ngi_user_info", CONFIG_PATH)
+            self.assertEqual(set(view.keys()), set(user_conf.content.keys()))
+            self.assertEqual(view["user"], user_conf.content["user"])
+            with self.assertRaises(TypeError):
+                view["user"]["full_name"] = "Changed"
+            self.assertIsNone(reader.get("ngi_local_conf", CONFIG_PATH))
+
+            speech = view["speech"]
+            user_conf.update_yaml_file("user", "full_name", "Shared User", final=True)
+            publisher.update(user_conf)
+            self.assertGreater(reader.generation, generation)
+            self.assertEqual(view["user"]["full_name"], "Shared User")
+            self.assertIs(view["speech"], speech)
+            self.assertEqual(publisher.stats["sections_serialized"], len(user_conf.content) + 1)
+            reader.close()
+        finally:
+            publisher.shutdown()
+            os.remove(shared_file)
+            shutil.move(old_user_info, ngi_user_info)
+
+    def test_shared_config_publisher_unpublishable(self):
+        import datetime
+        shared_file = os.path.join(CONFIG_PATH, ".shared_config")
+        publisher = SharedConfigPublisher(shared_file)
+        try:
+            user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            publisher.add(user_conf)
+            reader = SharedConfigReader(shared_file)
+            self.assertIsNotNone(reader.get("ngi_user_info", CONFIG_PATH))
+
+            # Values that would change type in JSON aren't published, so readers fall back to the file
+            for value in (datetime.date(2021, 1, 1), {1: "one"}):
+                user_conf._content["dates"] = {"birthday": value}
+                user_conf._publish_snapshot()
+                publisher.update(user_conf)
+                self.assertIsNone(reader.get("ngi_user_info", CONFIG_PATH))
+                del user_conf._content["dates"]
+                user_conf._publish_snapshot()
+                publisher.update(user_conf)
+                self.assertEqual(reader.get("ngi_user_info", CONFIG_PATH)["user"], user_conf.content["user"])
+            self.assertEqual(publisher.stats["unpublishable"], 2)
+            reader.close()
+        finally:
+            publisher.shutdown()
+            os.remove(shared_file)
+
+    def test_shared_config_file_private(self):
+        shared_file = os.path.join(CONFIG_PATH, ".shared_config")
+        link = os.path.join(CONFIG_PATH, ".shared_config_link")
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": CONFIG_PATH}):
+            default_file = _get_default_shared_config_file()
+        self.assertEqual(default_file, os.path.join(CONFIG_PATH, "neon", "shared_config"))
+        self.assertEqual(os.stat(os.path.dirname(default_file)).st_mode & 0o777, 0o700)
+        os.rmdir(os.path.dirname(default_file))
+
+        publisher = SharedConfigPublisher(shared_file)
+        publisher.shutdown()
+        os.symlink(shared_file, link)
+        try:
+            self.assertEqual(os.stat(shared_file).st_mode & 0o777, 0o600)
+            with self.assertRaises(OSError):
+                SharedConfigPublisher(link)
+            self.assertEqual(SharedConfigReader(link).generation, 0)
+            os.chmod(shared_file, 0o644)
+            with self.assertRaises(PermissionError):
+                SharedConfigPublisher(shared_file)
+            self.assertEqual(SharedConfigReader(shared_file).generation, 0)
+        finally:
+            os.remove(link)
+            os.remove(shared_file)
+
+    def test_shared_config_reader_stalled_publish(self):
+        shared_file = os.path.join(CONFIG_PATH, ".shared_config")
+        publisher = SharedConfigPublisher(shared_file)
+        try:
+            publisher.add(NGIConfig("ngi_user_info", CONFIG_PATH))
+            reader = SharedConfigReader(shared_file)
+            self.assertIsNotNone(reader.get("ngi_user_info", CONFIG_PATH))
+            # Leave a publish in progress, as if the publisher stopped while publishing
+            _SHARED_HEADER.pack_into(publisher._map, 0, _SHARED_MAGIC, publisher.generation + 1, 0)
+            with patch("neon_utils.configuration_utils._SHARED_READ_TIMEOUT", 0.05):
+                self.assertIsNone(reader.read(_get_shared_key(CONFIG_PATH, "ngi_user_info")))
+            start = time.monotonic()
+            self.assertIsNone(reader.read(_get_shared_key(CONFIG_PATH, "ngi_user_info")))
+            self.assertLess(time.monotonic() - start, 0.05)
+            reader.close()
+        finally:
+            publisher.shutdown()
+            os.remove(shared_file)
+
+    def test_shared_config_reader(self):
+        shared_file = os.path.join(CONFIG_PATH, ".shared_config")
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        publisher = enable_shared_config_publisher(shared_file, ("ngi_user_info",), CONFIG_PATH, False)
+        try:
+            enable_shared_config_reader(shared_file)
+            user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            self.assertEqual(user_conf["user"]["full_name"], "Test User")
+            with patch("os.path.getmtime", side_effect=AssertionError("configuration file checked")):
+                for _ in range(10):
+                    self.assertEqual(user_conf["user"]["full_name"], "Test User")
+
+            called = []
+            user_conf.subscribe("user.full_name", lambda *args: called.append(args))
+            owner_conf = NGIConfig("ngi_user_info", CONFIG_PATH)
+            owner_conf._content["user"]["full_name"] = "Published User"
+            owner_conf._publish_snapshot()
+            self.assertEqual(user_conf["user"]["full_name"], "Published User")
+            self.assertEqual(called, [("user.full_name", "Test User", "Published User")])
+            self.assertEqual(user_conf._shared_entry_generation, publisher.generation)
+        finally:
+            disable_shared_config_reader()
+            disable_shared_config_publisher()
+            os.remove(shared_file)
+            shutil.move(old_user_info, ngi_user_info)
+
+    def test_frozen_dict_copies(self):
+        frozen = FrozenDict({"section": FrozenDict({"list": FrozenList([1, 2])})})
+        copied = deepcopy(frozen)
+        self.assertEqual(copied, frozen)
+        self.assertIs(type(copied), dict)
+        self.assertIs(type(copied["section"]["list"]), list)
+        copied["section"]["list"].append(3)
+        self.assertEqual(frozen["section"]["list"], [1, 2])
+        self.assertIs(type(pickle.loads(pickle.dumps(frozen))), dict)
+        stream = StringIO()
+        YAML().dump(frozen, stream)
+        self.assertEqual(YAML().load(stream.getvalue()), frozen)
+
+    def test_layered_config(self):
+        neon = _freeze({"websocket": {"host": "neon"}, "audioService": {"backend": "vlc"}, "gui": {"port": 1}})
+        mycroft = _freeze({"websocket": {"host": "mycroft", "port": 8181}, "Audio": {"backend": "simple", "x": 1}})
+        config = LayeredConfig(neon, mycroft, log_missing=True)
+        self.assertEqual(set(config.keys()), {"websocket", "audioService", "gui", "Audio"})
+        self.assertIs(config["websocket"], neon["websocket"])
+        with patch.object(LOG, "warning") as warning:
+            bus = config.section("websocket")
+            self.assertEqual(dict(bus), {"host": "neon", "port": 8181})
+            self.assertEqual(dict(bus), {"host": "neon", "port": 8181})
+            warning.assert_called_once()
+        self.assertIs(config.section("websocket"), bus)
+        self.assertEqual(config.section("audioService", "Audio").freeze(), {"backend": "vlc", "x": 1})
+        self.assertIsInstance(config.section("audioService", "Audio").freeze(), FrozenDict)
+
+        new_neon = _freeze({"websocket": {"host": "neon"}, "audioService": {"backend": "simple"}, "gui": {"port": 1}},
+                           neon)
+        new_config = LayeredConfig(new_neon, mycroft)
+        new_config.inherit_sections(config)
+        self.assertIs(new_config.section("websocket"), bus)
+        self.assertEqual(new_config.section("audioService", "Audio")["backend"], "simple")
+
+    def test_get_changed_keys(self):
+        old = {"a": {"b": 1, "c": {"d": 2}}, "e": 3, "f": 4}
+        new = {"a": {"b": 1, "c": {"d": 5}}, "e": 3, "g": 4}
+        self.assertEqual(set(get_changed_keys(old, new)), {"a.c.d", "f", "g"})
+        self.assertEqual(get_changed_keys(old, old), [])
+
+    def test_config_write_behind(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        writer = enable_write_behind(0.5)
+        try:
+            with patch.object(user_conf, "_write_yaml_file", wraps=user_conf._write_yaml_file) as write:
+                user_conf.update_yaml_file("user", "full_name", "Background User")
+                user_conf.update_keys({"new_section": {"new_key": True}})
+                user_conf["time_format"] = 24
+                write.assert_not_called()
+                self.assertEqual(get_write_behind_stats()["queue_depth"], 1)
+                self.assertEqual(user_conf["user"]["full_name"], "Background User")
+                timeout = time.time() + 5
+                while writer.queue_depth and time.time() < timeout:
+                    time.sleep(0.05)
+                time.sleep(0.1)
+                write.assert_called_once()
+            from_disk = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            self.assertEqual(from_disk["user"]["full_name"], "Background User")
+            self.assertTrue(from_disk["new_section"]["new_key"])
+            self.assertEqual(from_disk["time_format"], 24)
+            stats = get_write_behind_stats()
+            self.assertEqual(stats["requested"], 3)
+            self.assertEqual(stats["written"], 1)
+        finally:
+            disable_write_behind()
+            shutil.move(old_user_info, ngi_user_info)
+        self.assertEqual(get_write_behind_stats(), dict())
+
+    def test_config_write_behind_shutdown(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        enable_write_behind(60)
+        user_conf.update_yaml_file("user", "full_name", "Background User")
+        self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["full_name"], "Test User")
+        disable_write_behind()
+        self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["full_name"], "Background User")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_write_behind_merges_disk_changes(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        enable_write_behind(60)
+        try:
+            user_conf.update_yaml_file("user", "full_name", "Background User")
+            user_conf.update_yaml_file("user", "username", "background")
+
+            # Another process changes the file before the pending changes are written
+            other_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            with open(ngi_user_info) as f:
+                new_contents = f.read().replace("Test User", "Other User").replace("demo@neongecko.com",
+                                                                                    "other@neon.ai")
+            with open(ngi_user_info, "w") as f:
+                f.write(new_contents)
+            os.utime(ngi_user_info, (time.time() + 1, time.time() + 1))
+            self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["user"]["email"], "other@neon.ai")
+            self.assertIsNot(other_conf, user_conf)
+
+            user_conf.check_reload()
+            self.assertEqual(user_conf["user"]["full_name"], "Background User")
+            self.assertEqual(user_conf["user"]["username"], "background")
+            self.assertEqual(user_conf["user"]["email"], "other@neon.ai")
+            self.assertEqual(user_conf.snapshot["user"]["email"], "other@neon.ai")
+        finally:
+            disable_write_behind()
+        from_disk = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertEqual(from_disk["user"]["full_name"], "Background User")
+        self.assertEqual(from_disk["user"]["username"], "background")
+        self.assertEqual(from_disk["user"]["email"], "other@neon.ai")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def test_config_write_behind_merges_before_write(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        enable_write_behind(60)
+        try:
+            user_conf.update_yaml_file("user", "username", "background")
+            with open(ngi_user_info) as f:
+                new_contents = f.read().replace("demo@neongecko.com", "other@neon.ai")
+            with open(ngi_user_info, "w") as f:
+                f.write(new_contents)
+            os.utime(ngi_user_info, (time.time() + 1, time.time() + 1))
+        finally:
+            disable_write_behind()
+        from_disk = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        self.assertEqual(from_disk["user"]["username"], "background")
+        self.assertEqual(from_disk["user"]["email"], "other@neon.ai")
+        shutil.move(old_user_info, ngi_user_info)
+
+    def _test_config_watcher(self, use_inotify):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        watcher = enable_config_watcher(0.1, use_inotify)
+        try:
+            self.assertEqual(watcher.backend, "inotify" if use_inotify else "polling")
+            self.assertTrue(user_conf._watched)
+            self.assertEqual(user_conf.content["user"]["full_name"], 'Test User')
+            with patch("os.path.getmtime", side_effect=AssertionError("unexpected stat")):
+                self.assertEqual(user_conf["user"]["full_name"], 'Test User')
+
+            reloads = get_config_reload_stats().get("ngi_user_info", {}).get("count", 0)
+            with open(ngi_user_info) as f:
+                new_contents = f.read().replace("Test User", "Watched User")
+            with open(ngi_user_info, "w") as f:
+                f.write(new_contents)
+            timeout = time.time() + 5
+            while not user_conf._stale and time.time() < timeout:
+                time.sleep(0.05)
+            self.assertEqual(user_conf["user"]["full_name"], 'Watched User')
+            self.assertEqual(get_config_reload_stats()["ngi_user_info"]["count"], reloads + 1)
+            self.assertGreater(watcher.generation, 0)
+        finally:
+            disable_config_watcher()
+            shutil.move(old_user_info, ngi_user_info)
+        self.assertFalse(user_conf._watched)
+
+    def test_config_watcher_polling(self):
+        self._test_config_watcher(False)
+
+    @unittest.skipUnless(inotify_simple, "inotify_simple is not installed")
+    def test_config_watcher_inotify(self):
+        self._test_config_watcher(True)
+
     def test_make_equal_keys(self):
         old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
         ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
@@ -95,6 +662,58 @@ class ConfigurationUtilTests(unittest.TestCase):
         skill_settings.make_equal_by_keys(NGIConfig("skill_default", CONFIG_PATH).content, False)
         self.assertEqual(correct_settings, skill_settings.content)
 
+    def test_skill_settings_cache(self):
+        skill_dir = os.path.join(CONFIG_PATH, "test_skill")
+        os.makedirs(skill_dir)
+        settingsmeta = os.path.join(skill_dir, "settingsmeta.json")
+        settings_path = os.path.join(skill_dir, "settings.yml")
+        meta = {"skillMetadata": {"sections": [{"fields": [{"type": "label", "label": "Options"},
+                                                            {"name": "enabled", "value": "true"},
+                                                            {"name": "count", "value": 3}]}]}}
+        try:
+            with open(settingsmeta, "w") as f:
+                json.dump(meta, f)
+            cache = SkillSettingsCache(skill_dir)
+            defaults = cache.get_defaults()
+            self.assertEqual(defaults, {"__mycroft_skill_firstrun": True, "enabled": True, "count": 3})
+            self.assertFalse(cache.from_cache)
+            self.assertFalse(cache.is_reconciled(settings_path))
+            with open(settings_path, "w") as f:
+                f.write("enabled: true\ncount: 3\n")
+            cache.set_reconciled(settings_path)
+            # Skill directories may be read-only, so nothing is written there
+            self.assertEqual(cache.cache_path, _get_config_cache_path(skill_dir, "settingsmeta", "cache"))
+            self.assertTrue(os.path.isfile(cache.cache_path))
+            self.assertEqual(set(os.listdir(skill_dir)), {"settingsmeta.json", "settings.yml"})
+
+            cache = SkillSettingsCache(skill_dir)
+            self.assertEqual(cache.get_defaults(), defaults)
+            self.assertTrue(cache.from_cache)
+            self.assertTrue(cache.is_reconciled(settings_path))
+
+            # Touching settingsmeta doesn't invalidate cached defaults
+            os.utime(settingsmeta, (time.time() + 10, time.time() + 10))
+            cache = SkillSettingsCache(skill_dir)
+            self.assertEqual(cache.get_defaults(), defaults)
+            self.assertTrue(cache.from_cache)
+            self.assertTrue(cache.is_reconciled(settings_path))
+
+            # Changed settings need to be checked against defaults again
+            with open(settings_path, "a") as f:
+                f.write("extra: 1\n")
+            self.assertFalse(cache.is_reconciled(settings_path))
+
+            meta["skillMetadata"]["sections"][0]["fields"][2]["value"] = 4
+            with open(settingsmeta, "w") as f:
+                json.dump(meta, f)
+            cache = SkillSettingsCache(skill_dir)
+            self.assertEqual(cache.get_defaults()["count"], 4)
+            self.assertFalse(cache.from_cache)
+        finally:
+            shutil.rmtree(skill_dir)
+            with suppress(FileNotFoundError):
+                os.remove(_get_config_cache_path(skill_dir, "settingsmeta", "cache"))
+
     def test_update_keys(self):
         old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
         ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
@@ -209,6 +828,25 @@ class ConfigurationUtilTests(unittest.TestCase):
                                                 "key_2": "val2",
                                                 "key_3": "val3"})
 
+    def test_dict_change_counts(self):
+        to_update = deepcopy(TEST_DICT)
+        self.assertEqual(_dict_update_keys(to_update, TEST_DICT), 0)
+        self.assertEqual(_dict_update_keys(to_update, {"section 2": {"key_3": "val3"}, "section 3": {"a": 1}}), 3)
+        self.assertEqual(_dict_merge(to_update, {"section 1": {"key1": "val1", "key2": "new2"}}), 1)
+        self.assertEqual(_dict_make_equal_keys(to_update, to_update), 0)
+        self.assertEqual(_dict_make_equal_keys(to_update, TEST_DICT), 2)
+        self.assertEqual(to_update, {"section 1": {"key1": "val1", "key2": "new2"},
+                                     "section 2": {"key_1": "val1", "key_2": "val2"}})
+
+    def test_config_populate_no_change(self):
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+        with patch.object(user_conf, "_write_yaml_file") as write:
+            user_conf.populate({"user": {"full_name": "Someone Else"}}, True)
+            user_conf.update_keys({"user": {"full_name": "Someone Else"}})
+            user_conf.make_equal_by_keys(user_conf.content)
+            write.assert_not_called()
+        self.assertEqual(user_conf["user"]["full_name"], "Test User")
+
     def test_write_json(self):
         file_path = os.path.join(CONFIG_PATH, "test.json")
         write_to_json(TEST_DICT, file_path)
@@ -311,31 +949,74 @@ class ConfigurationUtilTests(unittest.TestCase):
         shutil.move(bak_user_info, ngi_user_info)
         shutil.move(bak_local_conf, ngi_local_conf)
 
+    def test_config_migrations(self):
+        bak_user_info = os.path.join(CONFIG_PATH, "bak_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        old_user_info = os.path.join(CONFIG_PATH, "dep_user_info.yml")
+        bak_local_conf = os.path.join(CONFIG_PATH, "bak_local_conf.yml")
+        ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        shutil.move(ngi_user_info, bak_user_info)
+        shutil.copy(old_user_info, ngi_user_info)
+        shutil.copy(ngi_local_conf, bak_local_conf)
+
+        user_conf = NGIConfig("ngi_user_info", CONFIG_PATH)
+        local_conf = NGIConfig("ngi_local_conf", CONFIG_PATH)
+        self.assertIn("listener", user_conf)
+        self.assertEqual(user_conf.get("schema_version"), None)
+        migrations = list()
+
+        def migration(user, local):
+            migrations.append((user, local))
+            _move_config_sections(user, local)
+
+        with patch.dict("neon_utils.configuration_utils._CONFIG_MIGRATIONS", {1: migration}):
+            _migrate_configs(user_conf, local_conf)
+            _migrate_configs(user_conf, local_conf)
+        self.assertEqual(migrations, [(user_conf, local_conf)])
+        self.assertNotIn("listener", user_conf)
+        self.assertIn("listener", local_conf)
+        self.assertEqual(NGIConfig("ngi_user_info", CONFIG_PATH, True)["schema_version"], 1)
+        self.assertEqual(NGIConfig("ngi_local_conf", CONFIG_PATH, True)["schema_version"], 1)
+
+        shutil.move(bak_user_info, ngi_user_info)
+        shutil.move(bak_local_conf, ngi_local_conf)
+
     def test_get_local_config_add_keys(self):
         old_local_conf = os.path.join(CONFIG_PATH, "old_local_conf.yml")
         ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
         shutil.copy(ngi_local_conf, old_local_conf)
+        shutil.copy(ngi_user_info, old_user_info)
         config = get_neon_local_config(CONFIG_PATH)
         local_config_keys = ["prefFlags", "interface", "devVars", "gestures", "audioService", "padatious", "websocket",
                              "gui", "hotwords", "listener", "skills", "session", "tts", "stt", "logs", "device"]
         self.assertTrue(all(k for k in local_config_keys if k in config))
         shutil.move(old_local_conf, ngi_local_conf)
+        shutil.move(old_user_info, ngi_user_info)
 
     def test_get_local_config_create(self):
         old_local_conf = os.path.join(CONFIG_PATH, "old_local_conf.yml")
         ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
         shutil.move(ngi_local_conf, old_local_conf)
+        shutil.copy(ngi_user_info, old_user_info)
         config = get_neon_local_config(CONFIG_PATH)
         self.assertTrue(os.path.isfile(ngi_local_conf))
         local_config_keys = ["prefFlags", "interface", "devVars", "gestures", "audioService", "padatious", "websocket",
                              "gui", "hotwords", "listener", "skills", "session", "tts", "stt", "logs", "device"]
         self.assertTrue(all(k for k in local_config_keys if k in config))
         shutil.move(old_local_conf, ngi_local_conf)
+        shutil.move(old_user_info, ngi_user_info)
 
     def test_user_config_keep_keys(self):
         bak_user_info = os.path.join(CONFIG_PATH, "bak_user_info.yml")
         ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        bak_local_conf = os.path.join(CONFIG_PATH, "bak_local_conf.yml")
+        ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
         shutil.move(ngi_user_info, bak_user_info)
+        shutil.copy(ngi_local_conf, bak_local_conf)
 
         user_conf = get_neon_user_config(CONFIG_PATH)
         user_conf.update_yaml_file("brands", "favorite_brands", {'neon': 1})
@@ -346,6 +1027,70 @@ class ConfigurationUtilTests(unittest.TestCase):
         self.assertEqual(user_conf["brands"]["favorite_brands"]['neon'], 1)
 
         shutil.move(bak_user_info, ngi_user_info)
+        shutil.move(bak_local_conf, ngi_local_conf)
+
+    def test_derived_config_cache(self):
+        bak_local_conf = os.path.join(CONFIG_PATH, "bak_local_conf.yml")
+        ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        bak_user_info = os.path.join(CONFIG_PATH, "bak_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_local_conf, bak_local_conf)
+        shutil.copy(ngi_user_info, bak_user_info)
+        clear_config_cache()
+        config = get_neon_local_config.snapshot(CONFIG_PATH)
+        stats = get_config_cache_stats()
+        self.assertIs(get_neon_local_config.snapshot(CONFIG_PATH), config)
+        self.assertEqual(get_config_cache_stats()["hits"], stats["hits"] + 1)
+        self.assertEqual(get_config_cache_stats()["misses"], stats["misses"])
+
+        local_conf = NGIConfig("ngi_local_conf", CONFIG_PATH)
+        local_conf.update_yaml_file("prefFlags", "devMode", not config["prefFlags"]["devMode"])
+        new_config = get_neon_local_config(CONFIG_PATH)
+        self.assertEqual(get_config_cache_stats()["misses"], stats["misses"] + 1)
+        self.assertNotEqual(new_config["prefFlags"]["devMode"], config["prefFlags"]["devMode"])
+
+        # Callers get their own mutable copy; snapshots are shared, so they can't be mutated
+        self.assertNotIsInstance(new_config, FrozenDict)
+        new_config["prefFlags"]["devMode"] = config["prefFlags"]["devMode"]
+        self.assertEqual(get_neon_local_config(CONFIG_PATH)["prefFlags"]["devMode"], not config["prefFlags"]["devMode"])
+        snapshot = get_neon_local_config.snapshot(CONFIG_PATH)
+        with self.assertRaises(TypeError):
+            snapshot["prefFlags"]["devMode"] = config["prefFlags"]["devMode"]
+        self.assertIs(get_neon_local_config.snapshot(CONFIG_PATH), snapshot)
+        shutil.move(bak_local_conf, ngi_local_conf)
+        shutil.move(bak_user_info, ngi_user_info)
+
+    def test_derived_config_cache_sources(self):
+        from neon_utils.configuration_utils import _get_mycroft_config_files, _get_config_cache_signature, \
+            _DEFAULT_CONFIG_DIR
+        mycroft_files = _get_mycroft_config_files()
+        self.assertIn(os.path.join(_DEFAULT_CONFIG_DIR, "mycroft.conf"), mycroft_files)
+        self.assertIn(os.path.expanduser("~/.mycroft/mycroft.conf"), mycroft_files)
+
+        clear_config_cache()
+        signature = _get_config_cache_signature()
+        with patch("neon_utils.configuration_utils.get_config_dir", side_effect=AssertionError("unexpected call")):
+            self.assertEqual(_get_config_cache_signature(), signature)
+        self.assertEqual(len(signature), 5 + len(mycroft_files))
+
+    def test_derived_config_cache_watcher_own_writes(self):
+        bak_local_conf = os.path.join(CONFIG_PATH, "bak_local_conf.yml")
+        ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        bak_user_info = os.path.join(CONFIG_PATH, "bak_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_local_conf, bak_local_conf)
+        shutil.copy(ngi_user_info, bak_user_info)
+        clear_config_cache()
+        # Poll rarely so the watcher can't have noticed the write yet
+        enable_config_watcher(60, False)
+        try:
+            dev_mode = get_neon_local_config(CONFIG_PATH)["prefFlags"]["devMode"]
+            NGIConfig("ngi_local_conf", CONFIG_PATH).update_yaml_file("prefFlags", "devMode", not dev_mode)
+            self.assertEqual(get_neon_local_config(CONFIG_PATH)["prefFlags"]["devMode"], not dev_mode)
+        finally:
+            disable_config_watcher()
+            shutil.move(bak_local_conf, ngi_local_conf)
+            shutil.move(bak_user_info, ngi_user_info)
 
     def test_get_lang_config(self):
         config = get_neon_lang_config()
@@ -400,6 +1145,16 @@ class ConfigurationUtilTests(unittest.TestCase):
         # self.assertIsInstance(mycroft_config["stt"], dict)
         # self.assertIsInstance(mycroft_config["tts"], dict)
 
+        # Each caller gets its own mutable copy
+        mycroft_config["lang"] = "xx-yy"
+        mycroft_config["gui_websocket"]["host"] = "changed"
+        new_config = get_mycroft_compatible_config()
+        self.assertNotEqual(new_config["lang"], "xx-yy")
+        self.assertNotEqual(new_config["gui_websocket"]["host"], "changed")
+        mycroft_only = get_mycroft_compatible_config(mycroft_only=True)
+        mycroft_only["lang"] = "xx-yy"
+        self.assertNotEqual(get_mycroft_compatible_config(mycroft_only=True)["lang"], "xx-yy")
+
     def test_config_cache(self):
         from neon_utils.configuration_utils import NGIConfig as NGIConf2
         bak_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.bak")
@@ -469,6 +1224,85 @@ class ConfigurationUtilTests(unittest.TestCase):
         self.assertIsInstance(config.content, dict)
         os.remove(os.path.join(CONFIG_PATH, "temp_conf.yml"))
 
+    def test_environment_probe_cache(self):
+        clear_environment_cache()
+        config_dir = get_config_dir()
+        with patch("neon_utils.configuration_utils.exists") as exists:
+            self.assertEqual(get_config_dir(), config_dir)
+            exists.assert_not_called()
+            sys.path.append("/tmp/neon_test_path")
+            try:
+                get_config_dir()
+                exists.assert_called()
+            finally:
+                sys.path.remove("/tmp/neon_test_path")
+
+    def test_environment_probe_cache_file(self):
+        cache_file = os.path.join(CONFIG_PATH, "environment_probes.json")
+        enable_environment_cache_file(cache_file)
+        try:
+            clear_environment_cache()
+            neon_core = is_neon_core()
+            self.assertTrue(os.path.isfile(cache_file))
+            with open(cache_file) as f:
+                self.assertEqual(json.load(f)["values"]["is_neon_core"], neon_core)
+            enable_environment_cache_file(cache_file)
+            from neon_utils.configuration_utils import _ENVIRONMENT_PROBES
+            _ENVIRONMENT_PROBES["values"].clear()
+            with patch("importlib.util.find_spec", side_effect=AssertionError("unexpected probe")):
+                self.assertEqual(is_neon_core(), neon_core)
+        finally:
+            disable_environment_cache_file()
+            os.remove(cache_file)
+
+    def test_warm_config_cache(self):
+        import gc
+        bak_user_info = os.path.join(CONFIG_PATH, "bak_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        bak_local_conf = os.path.join(CONFIG_PATH, "bak_local_conf.yml")
+        ngi_local_conf = os.path.join(CONFIG_PATH, "ngi_local_conf.yml")
+        shutil.copy(ngi_user_info, bak_user_info)
+        shutil.copy(ngi_local_conf, bak_local_conf)
+        timings = warm_config_cache(CONFIG_PATH)
+        self.assertEqual(gc.get_freeze_count(), 0)
+        self.assertIn("user", timings)
+        self.assertNotIn("speech", timings)
+        self.assertTrue(all(isinstance(t, float) for t in timings.values()))
+        self.assertIs(type(NGIConfig("ngi_local_conf", CONFIG_PATH)._content), dict)
+        stats = get_config_cache_stats()
+        get_neon_local_config(CONFIG_PATH)
+        self.assertEqual(get_config_cache_stats()["hits"], stats["hits"] + 1)
+        try:
+            timings = warm_config_cache(freeze_gc=True)
+            self.assertGreater(gc.get_freeze_count(), 0)
+        finally:
+            gc.unfreeze()
+        self.assertIn("speech", timings)
+        shutil.move(bak_user_info, ngi_user_info)
+        shutil.move(bak_local_conf, ngi_local_conf)
+
+    def test_config_threads_reset_after_fork(self):
+        old_user_info = os.path.join(CONFIG_PATH, "old_user_info.yml")
+        ngi_user_info = os.path.join(CONFIG_PATH, "ngi_user_info.yml")
+        shutil.copy(ngi_user_info, old_user_info)
+        enable_config_watcher(0.1, False)
+        enable_write_behind(60)
+        try:
+            user_conf = NGIConfig("ngi_user_info", CONFIG_PATH, True)
+            user_conf["location"] = {"city": "Parent City"}
+            pid = os.fork()
+            if pid == 0:
+                from neon_utils.configuration_utils import _CONFIG_WATCHER, _CONFIG_WRITER
+                os._exit(0 if _CONFIG_WATCHER is None and _CONFIG_WRITER is None and
+                         not user_conf._pending_write else 1)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.WEXITSTATUS(status), 0)
+            self.assertTrue(user_conf._pending_write)
+        finally:
+            disable_config_watcher()
+            disable_write_behind()
+            shutil.move(old_user_info, ngi_user_info)
+
     def test_is_neon_core(self):
         self.assertIsInstance(is_neon_core(), bool)
 
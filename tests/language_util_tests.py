@@ -20,6 +20,11 @@
 import unittest
 import sys
 import os
+import time
+
+from unittest.mock import patch
+from tempfile import mkdtemp
+from shutil import rmtree
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 from neon_utils.language_utils import *
@@ -28,6 +33,17 @@ texts = ["My name is neon",
          "O meu nome é jarbas"]
 
 
+class CountingTranslator(LanguageTranslator):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def translate(self, text, target=None, source=None):
+        self.requests.append((text, target, source))
+        time.sleep(0.001)
+        return "\n".join(f"{target}:{line}" for line in text.split("\n"))
+
+
 class LangUtilTests(unittest.TestCase):
     # TODO: This fails unit tests occasionally with 'tl' instead of 'en' DM
     # def test_lang_detect(self):
@@ -65,6 +81,301 @@ class LangUtilTests(unittest.TestCase):
     def test_google_create(self):
         TranslatorFactory().create("google")
 
+    def test_caching_translator(self):
+        cache_dir = mkdtemp()
+        cache_file = os.path.join(cache_dir, "translations.sqlite")
+        backend = CountingTranslator()
+        translator = CachingTranslator(backend, cache_file, max_size=2)
+        self.assertIsInstance(translator, LanguageTranslator)
+
+        self.assertEqual(translator.translate("hello  world ", "pt"), "pt:hello  world ")
+        self.assertEqual(translator.translate("hello world", "pt"), "pt:hello  world ")
+        self.assertEqual(translator.translate("hello world", "es", "en"), "es:hello world")
+        self.assertEqual(backend.requests, [("hello  world ", "pt", None), ("hello world", "es", "en")])
+        stats = translator.stats
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+        self.assertGreater(stats["seconds_saved"], 0)
+        self.assertGreater(stats["memory_bytes"], 0)
+        self.assertGreater(stats["disk_bytes"], 0)
+
+        # Evicted from memory, still on disk
+        translator.translate("one", "pt")
+        translator.translate("two", "pt")
+        self.assertEqual(translator.stats["memory_entries"], 2)
+        translator.translate("hello world", "pt")
+        self.assertEqual(translator.stats["disk_hits"], 1)
+        translator.close()
+
+        # Persisted between instances
+        backend = CountingTranslator()
+        translator = CachingTranslator(backend, cache_file)
+        self.assertEqual(translator.translate("one", "pt"), "pt:one")
+        self.assertEqual(backend.requests, [])
+
+        # Expired entries are requested again
+        translator = CachingTranslator(backend, cache_file, ttl=0.001)
+        time.sleep(0.01)
+        translator.translate("one", "pt")
+        self.assertEqual(len(backend.requests), 1)
+        translator.close()
+        rmtree(cache_dir)
+
+    def test_caching_translator_prune(self):
+        cache_dir = mkdtemp()
+        cache_file = os.path.join(cache_dir, "translations.sqlite")
+        backend = CountingTranslator()
+        translator = CachingTranslator(backend, cache_file, max_entries=3)
+        translator.prune_interval = 2
+        translator.translate_batch(["one", "two", "three", "four"], "pt")
+        self.assertEqual(translator._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0], 3)
+        self.assertIsNone(translator._db.execute("SELECT text FROM translations WHERE text='one'").fetchone())
+        translator.close()
+
+        # Expired and excess translations are removed when the database is opened
+        translator = CachingTranslator(backend, cache_file, max_entries=2)
+        self.assertEqual(translator._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0], 2)
+        translator._db.execute("UPDATE translations SET created = 0 WHERE text='four'")
+        self.assertEqual(translator.prune(), 1)
+        self.assertEqual(translator._db.execute("SELECT text FROM translations").fetchall(), [("three",)])
+        translator.close()
+        rmtree(cache_dir)
+
+    def test_caching_translator_warm(self):
+        cache_dir = mkdtemp()
+        dialog_file = os.path.join(cache_dir, "dialog.txt")
+        with open(dialog_file, "w") as f:
+            f.write("# comment\nfirst line\n\nsecond line\nfirst line\n")
+        backend = CountingTranslator()
+        translator = CachingTranslator(backend)
+        self.assertEqual(translator.warm(dialog_file, "pt"), 2)
+        self.assertEqual(translator.warm(dialog_file, "pt"), 0)
+        translator.translate("second line", "pt")
+        self.assertEqual(backend.requests, [("first line\nsecond line", "pt", None)])
+        rmtree(cache_dir)
+
+    def test_translate_batch(self):
+        backend = CountingTranslator()
+        backend.max_request_chars = 12
+        texts = ["one", "two", "one", "three\nfour", "five", "six", "seven"]
+        translations = ["pt:one", "pt:two", "pt:one", "pt:three\npt:four", "pt:five", "pt:six", "pt:seven"]
+        self.assertEqual(backend.translate_batch(texts, "pt"), translations)
+        self.assertEqual(sorted(backend.requests), sorted([("one\ntwo\nfive", "pt", None),
+                                                           ("three\nfour", "pt", None),
+                                                           ("six\nseven", "pt", None)]))
+        self.assertEqual(backend.translate_batch([], "pt"), [])
+
+        backend.requests = []
+        backend.batch_delimiter = None
+        self.assertEqual(backend.translate_batch(texts, "pt"), translations)
+        self.assertEqual(len(backend.requests), 6)
+
+    def test_translate_batch_unpacked_result(self):
+        class MergingTranslator(CountingTranslator):
+            def translate(self, text, target=None, source=None):
+                return super().translate(text, target, source).replace("\n", " ")
+
+        backend = MergingTranslator()
+        self.assertEqual(backend.translate_batch(["one", "two"], "pt", "en"), ["pt:one", "pt:two"])
+        self.assertEqual(backend.requests, [("one\ntwo", "pt", "en"), ("one", "pt", "en"), ("two", "pt", "en")])
+
+    def test_translate_batch_strips_results(self):
+        class PaddingTranslator(CountingTranslator):
+            def translate(self, text, target=None, source=None):
+                return " " + super().translate(text, target, source).replace("\n", " \n ") + " "
+
+        backend = PaddingTranslator()
+        self.assertEqual(backend.translate_batch(["one"], "pt"), ["pt:one"])
+        self.assertEqual(backend.translate_batch(["one", "two"], "pt"), ["pt:one", "pt:two"])
+        backend.batch_delimiter = None
+        self.assertEqual(backend.translate_batch(["one", "two"], "pt"), ["pt:one", "pt:two"])
+
+    def test_caching_translator_batch(self):
+        backend = CountingTranslator()
+        translator = CachingTranslator(backend)
+        translator.translate("one", "pt")
+        self.assertEqual(translator.translate_batch(["one", "two", " two", "three"], "pt"),
+                         ["pt:one", "pt:two", "pt:two", "pt:three"])
+        self.assertEqual(backend.requests, [("one", "pt", None), ("two\nthree", "pt", None)])
+        self.assertEqual(translator.stats["misses"], 3)
+        self.assertEqual(translator.stats["memory_hits"], 1)
+
+    def test_shared_backends(self):
+        clear_shared_language_backends()
+        detector = DetectorFactory.get_shared("fastlang")
+        self.assertIsInstance(detector, FastLangDetector)
+        self.assertIs(DetectorFactory.get_shared(), detector)
+        self.assertIsNot(DetectorFactory.get_shared("detect"), detector)
+
+        translator = TranslatorFactory.get_shared("google")
+        self.assertIsInstance(translator, GoogleTranslator)
+        self.assertIs(TranslatorFactory.get_shared("google"), translator)
+        cached = TranslatorFactory.get_shared("google", cache=True)
+        self.assertIsInstance(cached, CachingTranslator)
+        self.assertIs(TranslatorFactory.get_shared("google", cache=True), cached)
+
+        generation = get_shared_backends_generation()
+        clear_shared_language_backends()
+        self.assertEqual(get_shared_backends_generation(), generation + 1)
+        self.assertIsNot(DetectorFactory.get_shared(), detector)
+        self.assertIsNot(TranslatorFactory.get_shared("google"), translator)
+        # Callers still holding a removed translator can keep using it
+        self.assertIsNot(TranslatorFactory.get_shared("google", cache=True), cached)
+        cached._store({("GoogleTranslator", "", "pt", "one"): "pt:one"}, 0.0)
+        self.assertEqual(cached.translate("one", "pt"), "pt:one")
+        clear_shared_language_backends()
+
+    def test_get_boto3_client(self):
+        keys = {"aws_access_key_id": "id", "aws_secret_access_key": "secret", "region": "us-west-2"}
+        client = get_boto3_client("translate", keys)
+        self.assertIs(get_boto3_client("translate", dict(keys)), client)
+        self.assertIsNot(get_boto3_client("comprehend", keys), client)
+        self.assertIsNot(get_boto3_client("translate", {**keys, "aws_access_key_id": "other"}), client)
+        clear_shared_language_backends()
+
+    def test_cascade_detector(self):
+        class FixedDetector(LanguageDetector):
+            def __init__(self, probs):
+                super().__init__()
+                self.probs = probs
+                self.requests = []
+
+            def detect_probs(self, text):
+                self.requests.append(text)
+                return self.probs
+
+        local = FixedDetector({"en": 0.4, "nl": 0.3})
+        remote = FixedDetector({"de": 0.9})
+        detector = CascadeDetector([FastLangDetector(), local, remote], threshold=0.5, min_length=10)
+        self.assertEqual(detector.detect("play some music by the beatles"), "en")
+        self.assertEqual(local.requests, [])
+        self.assertEqual(detector.detect("play  some music by the beatles "), "en")
+        self.assertEqual(detector.detect("hi"), "de")
+        self.assertEqual(local.requests, ["hi"])
+        self.assertEqual(remote.requests, ["hi"])
+
+        stats = detector.stats
+        self.assertEqual(stats["detections"], 3)
+        self.assertEqual(stats["memo_hits"], 1)
+        self.assertEqual(stats["stages"]["FastLangDetector"]["accepted"], 1)
+        self.assertEqual(stats["stages"]["FastLangDetector"]["runs"], 2)
+        self.assertEqual(stats["stages"]["FastLangDetector"]["hit_ratio"], 0.5)
+        self.assertEqual(detector.stage_names, ["FastLangDetector", "FixedDetector", "FixedDetector_2"])
+        self.assertEqual(stats["stages"]["FixedDetector"]["runs"], 1)
+        self.assertEqual(stats["stages"]["FixedDetector"]["accepted"], 0)
+        self.assertEqual(stats["stages"]["FixedDetector_2"]["resolved_ratio"], 0.5)
+
+        failing = FixedDetector(None)
+        failing.detect_probs = lambda text: 1 / 0
+        detector = CascadeDetector([local, failing], threshold=0.5)
+        self.assertEqual(detector.detect_probs("some longer text"), {"en": 0.4, "nl": 0.3})
+        self.assertEqual(detector.stats["stages"]["FixedDetector_1"]["errors"], 1)
+        # Fallbacks aren't memoized
+        self.assertEqual(detector.detect_probs("some longer text"), {"en": 0.4, "nl": 0.3})
+        self.assertEqual(detector.stats["memo_hits"], 0)
+        self.assertEqual(detector.stats["stages"]["FixedDetector_1"]["errors"], 2)
+
+        empty = FixedDetector({})
+        detector = CascadeDetector([empty, local], threshold=0.5)
+        detector.detect_probs("some longer text")
+        detector.detect_probs("some longer text")
+        self.assertEqual(len(empty.requests), 2)
+        self.assertEqual(detector.stats["memo_hits"], 0)
+
+        confident = FixedDetector({"en": 0.9})
+        detector = CascadeDetector([confident], threshold=0.5)
+        detector.detect_probs("some longer text")
+        detector.detect_probs("some longer text")
+        self.assertEqual(len(confident.requests), 1)
+        self.assertEqual(detector.stats["memo_hits"], 1)
+
+    def test_cascade_create(self):
+        detector = DetectorFactory.create("cascade")
+        self.assertIsInstance(detector, CascadeDetector)
+        self.assertEqual(detector.detect(texts[0]), "en")
+        self.assertEqual(detector.detect(texts[1]), "pt")
+
+    def test_detect_probs_batch(self):
+        detector = FastLangDetector()
+        batch = texts * 3 + ["hi"]
+        result = detector.detect_probs_batch(batch, processes=2, chunk_size=2)
+        self.assertIsInstance(result, DetectionResult)
+        self.assertEqual(len(result), 7)
+        self.assertEqual(result.langs, ["en", "pt"] * 3 + [detector.default_language])
+        self.assertEqual(result.langs, detector.detect_batch(batch, processes=1))
+        self.assertEqual(len(result.probs[0]), len(result.languages))
+        self.assertEqual(result.probs[0][result.languages.index("en")], detector.detect_probs(texts[0])["en"])
+        self.assertEqual(result.probs[-1], [0.0] * len(result.languages))
+
+        langs, probs = result.to_numpy()
+        self.assertEqual(probs.shape, (7, len(result.languages)))
+        self.assertEqual([result.languages[idx] for idx in probs.argmax(axis=1)[:6]], list(langs[:6]))
+        self.assertEqual(detector.detect_probs_batch([]).to_numpy()[1].shape, (0, 0))
+
+        # Without spawn contexts (Python 3.6), batches are detected in this process
+        with patch("neon_utils.language_utils._SPAWN_POOL_SUPPORTED", False), \
+                patch("neon_utils.language_utils.ProcessPoolExecutor", side_effect=AssertionError("pool created")):
+            self.assertEqual(detector.detect_probs_batch(batch, processes=2, chunk_size=2).langs, result.langs)
+
+    def test_amazon_detect_batch(self):
+        class FakeComprehend:
+            def __init__(self):
+                self.requests = []
+
+            def batch_detect_dominant_language(self, TextList):
+                self.requests.append(TextList)
+                return {"ResultList": [{"Index": idx, "Languages": [{"LanguageCode": "en", "Score": 0.9}]}
+                                       for idx, text in enumerate(TextList) if text],
+                        "ErrorList": [{"Index": idx, "ErrorMessage": "empty"}
+                                      for idx, text in enumerate(TextList) if not text]}
+
+        detector = AmazonDetector()
+        detector.client = FakeComprehend()
+        batch = [f"text {i}" for i in range(30)] + [""]
+        result = detector.detect_probs_batch(batch)
+        self.assertEqual([len(request) for request in detector.client.requests], [25, 6])
+        self.assertEqual(result.langs, ["en"] * 30 + [detector.default_language])
+        self.assertEqual(result.languages, ["en"])
+
+    def test_cascade_detect_batch(self):
+        class SlowDetector(LanguageDetector):
+            def __init__(self):
+                super().__init__()
+                self.requests = []
+
+            def detect_probs(self, text):
+                self.requests.append(text)
+                return {"de": 0.9}
+
+        remote = SlowDetector()
+        detector = CascadeDetector(["fastlang", remote])
+        batch = ["play some music by the beatles", "hi", "play some  music by the beatles", "hi"]
+        self.assertEqual(detector.detect_batch(batch), ["en", "de", "en", "de"])
+        self.assertEqual(remote.requests, ["hi"])
+        self.assertEqual(detector.detect_batch(batch), ["en", "de", "en", "de"])
+        stats = detector.stats
+        self.assertEqual(stats["detections"], 8)
+        self.assertEqual(stats["memo_hits"], 6)
+        self.assertEqual(stats["stages"]["fastlang"]["runs"], 2)
+        self.assertEqual(stats["stages"]["SlowDetector"]["accepted"], 1)
+
+    def test_create_cached(self):
+        translator = TranslatorFactory.create("google", cache=True)
+        self.assertIsInstance(translator, CachingTranslator)
+        self.assertEqual(translator.backend, "GoogleTranslator")
+        self.assertIsNone(translator.cache_file)
+        translator.close()
+
+        cache_config = {"persist": True, "max_age_days": 1, "max_entries": 10}
+        with patch("neon_utils.language_utils.get_neon_lang_config",
+                   return_value={**get_neon_lang_config(), "translation_cache": cache_config}):
+            translator = TranslatorFactory.create("google", cache=True)
+        self.assertEqual(translator.cache_file, get_translation_cache_file())
+        self.assertEqual(translator.ttl, 24 * 3600)
+        self.assertEqual(translator.max_entries, 10)
+        translator.close()
+
 
 if __name__ == '__main__':
     unittest.main()
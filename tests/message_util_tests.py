@@ -19,6 +19,7 @@
 
 import sys
 import os
+import time
 import unittest
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
@@ -49,6 +50,96 @@ class MessageUtilTests(unittest.TestCase):
         with self.assertRaises(AttributeError):
             get_message_user("Nobody")
 
+    def test_user_profile_view_server(self):
+        profile = {"speech": {"tts_language": "en-us"}, "user": {"username": "testrunner"}}
+        message = Message("", {}, {"username": "testrunner", "nick_profiles": {"testrunner": profile}})
+        view = UserProfileView(message, server=True)
+        self.assertEqual(view.nick, "testrunner")
+        self.assertIs(view.get_section("speech", {}), profile["speech"])
+        # Every section comes from the same profile, so all of them are resolved together
+        self.assertEqual(view.resolved, profile)
+
+        # Sections are resolved once per view
+        message.context["nick_profiles"]["testrunner"] = {"speech": {"tts_language": "fr-fr"}}
+        self.assertIs(view.get_section("speech", {}), profile["speech"])
+        default = {"time": 12}
+        self.assertIs(view.get_section("units", default), default)
+
+        no_profiles = UserProfileView(Message("", {}, {"username": "testrunner"}), server=True)
+        self.assertIs(no_profiles.get_section("speech", default), default)
+        self.assertIsNone(no_profiles.profile)
+        self.assertIs(view.profile, profile)
+
+    def test_user_profile_view_local(self):
+        user_config = {"speech": {"tts_language": "en-us"}}
+        view = UserProfileView(Message("", {}, {"username": "testrunner"}), user_config)
+        self.assertIs(view.get_section("speech", {}), user_config["speech"])
+        self.assertIs(UserProfileView(None, user_config, True).get_section("speech", {}), user_config["speech"])
+        self.assertIsNone(UserProfileView(None, user_config).nick)
+
+    def test_profile_cache(self):
+        cache = ProfileCache(max_size=2, ttl=0.1)
+        cache.put("user1", {"speech": {}}, 1)
+        cache.put("user2", {"speech": {}})
+        self.assertIsNotNone(cache.get("user1"))
+        self.assertIsNotNone(cache.get("user1", 1))
+        self.assertIsNone(cache.get("user1", 2))
+
+        # Least recently used profile is evicted
+        cache.put("user3", {"speech": {}})
+        self.assertNotIn("user2", cache)
+        self.assertIn("user1", cache)
+        self.assertEqual(cache.stats["evicted"], 1)
+
+        cache.remove("user1")
+        self.assertIsNone(cache.get("user1"))
+        time.sleep(0.15)
+        self.assertIsNone(cache.get("user3"))
+        self.assertEqual(cache.stats["expired"], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_user_profile_view_cached_profile(self):
+        cache = ProfileCache()
+        profile = {"speech": {"tts_language": "en-us"}}
+        full = Message("", {}, {"username": "testrunner", "profile_version": 3,
+                                "nick_profiles": {"testrunner": profile}})
+        self.assertIs(UserProfileView(full, server=True, profile_cache=cache).get_section("speech"),
+                      profile["speech"])
+
+        slim = Message("", {}, {"username": "testrunner", "profile_version": 3})
+        self.assertIs(UserProfileView(slim, server=True, profile_cache=cache).get_section("speech"),
+                      profile["speech"])
+        outdated = Message("", {}, {"username": "testrunner", "profile_version": 4})
+        self.assertIsNone(UserProfileView(outdated, server=True, profile_cache=cache).get_section("speech"))
+        cache.remove("testrunner")
+        self.assertIsNone(UserProfileView(slim, server=True, profile_cache=cache).get_section("speech"))
+
+    def test_profile_update_coalescer(self):
+        sent = []
+        coalescer = ProfileUpdateCoalescer(lambda *args: sent.append(args), 0.2)
+        first = Message("first")
+        last = Message("last")
+        coalescer.add("user1", {"email": "a@neon.ai", "skills": {"skill_a": {"opt": 1}}}, first)
+        coalescer.add("user1", {"email": "b@neon.ai", "skills": {"skill_b": {"opt": 2}}}, last)
+        coalescer.add("user2", {"time": 24})
+        self.assertEqual(coalescer.queue_depth, 2)
+        self.assertEqual(sent, [])
+
+        coalescer.flush("user1")
+        self.assertEqual(sent, [("user1", {"email": "b@neon.ai", "skills": {"skill_a": {"opt": 1},
+                                                                           "skill_b": {"opt": 2}}}, last)])
+        time.sleep(0.4)
+        self.assertEqual(sent[1], ("user2", {"time": 24}, None))
+        self.assertEqual(coalescer.stats, {"requested": 3, "sent": 2, "saved": 1})
+
+        skill_sent = []
+        coalescer.add("user1", {"time": 12})
+        coalescer.add("user1", {"date": "DMY"}, send=lambda *args: skill_sent.append(args))
+        coalescer.flush()
+        self.assertEqual(skill_sent, [("user1", {"time": 12, "date": "DMY"}, None)])
+        self.assertEqual(len(sent), 2)
+        coalescer.shutdown()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2021 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import os
+import sys
+
+from types import ModuleType
+from mycroft_bus_client import Message
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+from test_objects import MycroftSkill
+
+
+def install_mycroft_stub() -> bool:
+    """
+    Registers stand-in mycroft modules providing the Message and MycroftSkill classes NeonSkill is built on, so
+    NeonSkill can be imported and tested without mycroft-core installed
+    Returns:
+        True if the stub was installed, False if mycroft is already importable
+    """
+    try:
+        import mycroft
+        return False
+    except ImportError:
+        pass
+    modules = {"mycroft": dict(),
+               "mycroft.messagebus": dict(),
+               "mycroft.messagebus.message": {"Message": Message, "dig_for_message": lambda: None},
+               "mycroft.skills": dict(),
+               "mycroft.skills.mycroft_skill": {"MycroftSkill": MycroftSkill},
+               "mycroft.skills.mycroft_skill.mycroft_skill": {"MycroftSkill": MycroftSkill}}
+    for name, attributes in modules.items():
+        module = ModuleType(name)
+        module.__dict__.update(attributes)
+        sys.modules[name] = module
+    return True
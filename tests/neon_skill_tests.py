@@ -0,0 +1,201 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2021 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import json
+import os
+import sys
+import unittest
+
+from collections import ChainMap
+from unittest.mock import Mock, patch
+from mycroft_bus_client import Message
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+from mycroft_stub import install_mycroft_stub
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_utils.language_utils import clear_shared_language_backends
+from neon_utils.message_utils import ProfileCache
+
+install_mycroft_stub()
+from neon_utils.skills.neon_skill import NeonSkill
+
+
+def _get_server_skill(settings: dict):
+    skill = NeonSkill("TestSkill", use_settings=False)
+    skill.server = True
+    skill.settings = settings
+    skill.skill_id = "test.skill"
+    skill.skill_settings_update_delay = 0.01
+    skill.update_skill_settings = Mock()
+    return skill
+
+
+def _get_message(skills: dict):
+    return Message("test", {}, {"username": "test_user",
+                                "nick_profiles": {"test_user": {"skills": skills}}})
+
+
+def _wait_for_settings_update(skill):
+    timer = skill._settings_update_timer
+    if timer:
+        timer.join(1)
+
+
+class NeonSkillPreferenceTests(unittest.TestCase):
+    def test_preference_skill(self):
+        skill = _get_server_skill({"a": 1, "b": 1})
+        message = _get_message({"test.skill": {"a": 2, "b": 3}})
+        settings = skill.preference_skill(message)
+        self.assertIsInstance(settings, dict)
+        self.assertEqual(settings, {"a": 2, "b": 3})
+        self.assertEqual(json.loads(json.dumps(settings)), settings)
+        settings["a"] = 4
+        self.assertEqual(skill.settings, {"a": 1, "b": 1})
+        self.assertEqual(message.context["nick_profiles"]["test_user"]["skills"]["test.skill"]["a"], 2)
+        _wait_for_settings_update(skill)
+        skill.update_skill_settings.assert_not_called()
+
+        skill.server = False
+        self.assertIs(skill.preference_skill(message), skill.settings)
+
+    def test_preference_skill_overlay(self):
+        skill = _get_server_skill({"a": 1, "b": 1})
+        message = _get_message({"test.skill": {"a": 2, "b": 1}})
+        overlay = skill.preference_skill_overlay(message)
+        self.assertIsInstance(overlay, ChainMap)
+        self.assertEqual(dict(overlay), {"a": 2, "b": 1})
+        overlay["b"] = 5
+        self.assertEqual(overlay["b"], 5)
+        self.assertEqual(skill.settings, {"a": 1, "b": 1})
+        self.assertEqual(message.context["nick_profiles"]["test_user"]["skills"]["test.skill"], {"a": 2, "b": 1})
+
+    def test_preference_skill_deferred_update(self):
+        skill = _get_server_skill({"a": 1, "b": 1})
+        message = _get_message({"test.skill": {"a": 2}})
+        self.assertEqual(skill.preference_skill(message), {"a": 2, "b": 1})
+        self.assertEqual(skill.preference_skill(message), {"a": 2, "b": 1})
+        skill.update_skill_settings.assert_not_called()
+        _wait_for_settings_update(skill)
+        skill.update_skill_settings.assert_called_once()
+        settings, update_message = skill.update_skill_settings.call_args[0]
+        self.assertEqual(settings, {"a": 2, "b": 1})
+        self.assertIsNot(update_message, message)
+        self.assertEqual(update_message.context, message.context)
+
+    def test_preference_skill_missing_skill(self):
+        skill = _get_server_skill({"a": 1, "b": 1})
+        message = _get_message({"other.skill": {"c": 1}})
+        for _ in range(3):
+            self.assertEqual(skill.preference_skill(_get_message({"other.skill": {"c": 1}})), {"a": 1, "b": 1})
+        _wait_for_settings_update(skill)
+        skill.update_skill_settings.assert_called_once()
+        self.assertEqual(skill.update_skill_settings.call_args[0][0], {"a": 1, "b": 1})
+
+        skill.update_skill_settings.reset_mock()
+        for _ in range(3):
+            skill.preference_skill(message)
+        _wait_for_settings_update(skill)
+        skill.update_skill_settings.assert_not_called()
+
+    def test_shared_language_backends(self):
+        skill = NeonSkill("TestSkill", use_settings=False)
+        with patch("neon_utils.skills.neon_skill.TranslatorFactory.get_shared", side_effect=lambda **_: Mock()), \
+                patch("neon_utils.skills.neon_skill.DetectorFactory.get_shared", side_effect=lambda: Mock()):
+            translator = skill.translator
+            detector = skill.lang_detector
+            self.assertIs(skill.translator, translator)
+            self.assertIs(skill.lang_detector, detector)
+            clear_shared_language_backends()
+            self.assertIsNot(skill.translator, translator)
+            self.assertIsNot(skill.lang_detector, detector)
+
+            custom = Mock()
+            skill.translator = custom
+            clear_shared_language_backends()
+            self.assertIs(skill.translator, custom)
+
+    def test_shared_profile_updates(self):
+        skills = [_get_server_skill({"a": 1}) for _ in range(2)]
+        skills[1].skill_id = "other.skill"
+        for skill in skills:
+            skill.bus = Mock()
+            skill.profile_update_window = 60
+        message = _get_message({"test.skill": {"a": 1}, "other.skill": {"a": 1}})
+        message.context["nick_profiles"]["test_user"]["units"] = {"time": 12}
+        message.context["klat_data"] = {"request_id": "test"}
+        NeonSkill.profile_updates = None
+        try:
+            skills[0].update_profile({"units": {"time": 24}}, message)
+            skills[1].update_profile({"skills": {"other.skill": {"a": 2}}}, message)
+            self.assertIs(skills[0].profile_updates, skills[1].profile_updates)
+            self.assertEqual(skills[0].profile_update_stats["saved"], 1)
+            skills[0].bus.emit.assert_not_called()
+            skills[1].bus.emit.assert_not_called()
+
+            NeonSkill._handle_handler_complete(message.forward("mycroft.skill.handler.complete"))
+            emitted = [call[0][0] for call in skills[1].bus.emit.call_args_list]
+            self.assertEqual([m.msg_type for m in emitted], ["css.emit", "neon.remove_cache_entry"])
+            changes = emitted[0].data["data"][1]
+            self.assertEqual(changes["time"], 24)
+            self.assertEqual(json.loads(changes["skill_settings"]), [{"a": 1}, {"a": 2}])
+            skills[0].bus.emit.assert_not_called()
+        finally:
+            NeonSkill.profile_updates.shutdown()
+            NeonSkill.profile_updates = None
+
+    def test_update_profile_cached_profile(self):
+        skill = _get_server_skill({"a": 1})
+        del skill.update_skill_settings
+        skill.bus = Mock()
+        skill.profile_update_window = 60
+        full = _get_message({"other.skill": {"b": 1}})
+        full.context["profile_version"] = 1
+        # Later messages for the same user only include the profile version
+        slim_context = {"username": "test_user", "profile_version": 1, "klat_data": {"request_id": "test"}}
+        slim = Message("test", {}, slim_context)
+        NeonSkill.profile_cache = ProfileCache()
+        NeonSkill.profile_updates = None
+        try:
+            self.assertEqual(skill.build_combined_skill_object(full), [{"b": 1}])
+            self.assertEqual(skill.build_combined_skill_object(slim), [{"b": 1}])
+
+            # Missing settings are added to the cached profile
+            self.assertEqual(skill.preference_skill(slim), {"a": 1})
+            _wait_for_settings_update(skill)
+            slim = Message("test", {}, slim_context)
+            self.assertEqual(skill.preference_skill(slim), {"a": 1, "skill_id": "test.skill"})
+            self.assertNotIn("nick_profiles", slim.context)
+
+            skill.update_profile({"skills": {"other.skill": {"b": 2}}}, slim)
+            self.assertEqual(skill.build_combined_skill_object(slim), [{"b": 2}, {"a": 1, "skill_id": "test.skill"}])
+            skill.flush_profile_updates()
+            emitted = [call[0][0] for call in skill.bus.emit.call_args_list]
+            self.assertEqual([m.msg_type for m in emitted], ["css.emit", "neon.remove_cache_entry"])
+            self.assertEqual(json.loads(emitted[0].data["data"][1]["skill_settings"]),
+                             [{"b": 2}, {"a": 1, "skill_id": "test.skill"}])
+        finally:
+            NeonSkill.profile_cache = None
+            if NeonSkill.profile_updates:
+                NeonSkill.profile_updates.shutdown()
+            NeonSkill.profile_updates = None
+
+
+if __name__ == '__main__':
+    unittest.main()